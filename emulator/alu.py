@@ -0,0 +1,130 @@
+from array import array
+
+# Precomputed result and flags tables for the 8-bit ALU operations.
+# The tables are built once and shared by every CPU instance. The large
+# ADC and SBC tables (128K entries each) are only built the first time
+# they are used, so importing the module stays cheap.
+#
+# Entries are packed as (F << 8) | result, where F uses the layout of the
+# flags register:
+# 7 6 5 4 3 2 1 0
+# Z N H C 0 0 0 0
+FLAG_Z = 0x80
+FLAG_N = 0x40
+FLAG_H = 0x20
+FLAG_C = 0x10
+
+# ADD/ADC A,n: indexed by (carry << 16) | (A << 8) | n
+#   Z - Set if result is zero.
+#   N - Reset.
+#   H - Set if carry from bit 3.
+#   C - Set if carry from bit 7.
+def build_adc_table():
+    table = array('H', bytes(2 * 0x20000))
+    for carry in range(0, 2):
+        for a in range(0, 256):
+            base = (carry << 16) | (a << 8)
+            for n in range(0, 256):
+                value = a + n + carry
+                result = value & 0xFF
+                flags = 0
+                if result == 0:
+                    flags |= FLAG_Z
+                if (a & 0xF) + (n & 0xF) + carry > 0xF:
+                    flags |= FLAG_H
+                if value > 0xFF:
+                    flags |= FLAG_C
+                table[base | n] = (flags << 8) | result
+    return table
+
+# SUB/SBC/CP A,n: indexed by (carry << 16) | (A << 8) | n
+#   Z - Set if result is zero.
+#   N - Set.
+#   H - Set if borrow from bit 4.
+#   C - Set if borrow (A < n).
+def build_sbc_table():
+    table = array('H', bytes(2 * 0x20000))
+    for carry in range(0, 2):
+        for a in range(0, 256):
+            base = (carry << 16) | (a << 8)
+            for n in range(0, 256):
+                value = a - n - carry
+                result = value & 0xFF
+                flags = FLAG_N
+                if result == 0:
+                    flags |= FLAG_Z
+                if (a & 0xF) - (n & 0xF) - carry < 0:
+                    flags |= FLAG_H
+                if value < 0:
+                    flags |= FLAG_C
+                table[base | n] = (flags << 8) | result
+    return table
+
+# AND/OR/XOR: flags indexed by the result
+#   Z - Set if result is zero.
+#   N - Reset.
+#   H - Set for AND, reset for OR/XOR.
+#   C - Reset.
+def build_logic_flags_table(half_carry):
+    table = array('B', bytes(256))
+    for result in range(0, 256):
+        flags = FLAG_H if half_carry else 0
+        if result == 0:
+            flags |= FLAG_Z
+        table[result] = flags
+    return table
+
+# INC n: indexed by n
+#   Z - Set if result is zero.
+#   N - Reset.
+#   H - Set if carry from bit 3.
+#   C - Not affected (not included, callers keep the old carry flag).
+def build_inc_table():
+    table = array('H', bytes(2 * 256))
+    for n in range(0, 256):
+        result = (n + 1) & 0xFF
+        flags = 0
+        if result == 0:
+            flags |= FLAG_Z
+        if (n & 0xF) == 0xF:
+            flags |= FLAG_H
+        table[n] = (flags << 8) | result
+    return table
+
+# DEC n: indexed by n
+#   Z - Set if result is zero.
+#   N - Set.
+#   H - Set if borrow from bit 4.
+#   C - Not affected (not included, callers keep the old carry flag).
+def build_dec_table():
+    table = array('H', bytes(2 * 256))
+    for n in range(0, 256):
+        result = (n - 1) & 0xFF
+        flags = FLAG_N
+        if result == 0:
+            flags |= FLAG_Z
+        if (n & 0xF) == 0:
+            flags |= FLAG_H
+        table[n] = (flags << 8) | result
+    return table
+
+LAZY_TABLES = {
+    'ADC': build_adc_table,
+    'SBC': build_sbc_table,
+}
+
+# Called for module attributes that don't exist yet: build the table and
+# keep it as a module global, so later lookups don't come back here
+def __getattr__(name):
+    build = LAZY_TABLES.get(name)
+    if build is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    table = build()
+    globals()[name] = table
+    return table
+
+AND_FLAGS = build_logic_flags_table(True)
+OR_FLAGS = build_logic_flags_table(False)
+XOR_FLAGS = OR_FLAGS
+INC = build_inc_table()
+DEC = build_dec_table()
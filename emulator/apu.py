@@ -0,0 +1,56 @@
+# Sound (APU) registers
+# FF10-FF14     NR10-NR14   Channel 1 (square with sweep)
+# FF16-FF19     NR21-NR24   Channel 2 (square)
+# FF1A-FF1E     NR30-NR34   Channel 3 (wave)
+# FF20-FF23     NR41-NR44   Channel 4 (noise)
+# FF24          NR50        Master volume
+# FF25          NR51        Panning
+# FF26          NR52        Sound on/off (bit 7), channel status (bits 0-3, read only)
+# FF30-FF3F                 Wave pattern RAM
+#
+# No sound is produced: the registers only hold what is written to them
+# and read back like the hardware does, with write only and unused bits
+# reading as 1. Turning the sound off clears FF10-FF25 and ignores writes
+# to them until it is turned on again. No channel is ever reported as on.
+APU_START = 0xFF10
+
+# Register name (None for unused addresses) and bits that read as 1, from
+# FF10 to FF3F
+APU_REGISTERS = (
+    ('NR10', 0x80), ('NR11', 0x3F), ('NR12', 0x00), ('NR13', 0xFF), ('NR14', 0xBF),
+    (None, 0xFF),   ('NR21', 0x3F), ('NR22', 0x00), ('NR23', 0xFF), ('NR24', 0xBF),
+    ('NR30', 0x7F), ('NR31', 0xFF), ('NR32', 0x9F), ('NR33', 0xFF), ('NR34', 0xBF),
+    (None, 0xFF),   ('NR41', 0xFF), ('NR42', 0x00), ('NR43', 0x00), ('NR44', 0xBF),
+    ('NR50', 0x00), ('NR51', 0x00), ('NR52', 0x70),
+) + ((None, 0xFF),) * 9 + tuple(('WAVE{}'.format(i), 0x00) for i in range(16))
+
+NR52 = 0xFF26 - APU_START
+WAVE = 0xFF30 - APU_START
+
+class APU():
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.registers = bytearray(len(APU_REGISTERS))
+        self.read_masks = bytes(mask for name, mask in APU_REGISTERS)
+        self.reset()
+
+    def reset(self):
+        self.registers[:] = bytes(len(self.registers))
+
+    def map_io(self, mmu):
+        for index, (name, mask) in enumerate(APU_REGISTERS):
+            mmu.register_io(APU_START + index, name, self.rb, self.wb)
+
+    def rb(self, addr):
+        index = (addr & 0x7F) - 0x10
+        return self.registers[index] | self.read_masks[index]
+
+    def wb(self, addr, value):
+        index = (addr & 0x7F) - 0x10
+        if index == NR52:
+            if not value & 0x80: # Power off
+                self.registers[:NR52] = bytes(NR52)
+            self.registers[NR52] = value & 0x80
+        elif index >= WAVE or self.registers[NR52] & 0x80:
+            self.registers[index] = value
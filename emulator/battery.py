@@ -0,0 +1,61 @@
+import mmap
+import os
+import threading
+
+# Battery backed cartridge RAM
+# The external RAM of cartridges with a battery is a shared memory mapping
+# of their .sav file, so every write lands in the OS page cache straight
+# away and survives the emulator crashing. Writes mark their page dirty and
+# a background thread flushes the dirty pages to disk every interval
+# seconds, so the emulation thread never waits on disk I/O.
+SAVE_INTERVAL = 1.0 # Seconds between flushes
+
+class BatteryRAM():
+
+    def __init__(self, path, size, interval=SAVE_INTERVAL):
+        self.path = path
+        self.size = size
+        self.interval = interval
+
+        # Existing saves are kept; a new or short file is padded with zeros
+        with open(path, 'a+b') as file:
+            if os.fstat(file.fileno()).st_size < size:
+                file.truncate(size)
+            self.data = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_WRITE)
+
+        # Dirty flag per flush page (flush offsets have to be aligned)
+        self.page_size = mmap.ALLOCATIONGRANULARITY
+        self.page_shift = self.page_size.bit_length() - 1
+        self.dirty = bytearray((size + self.page_size - 1) // self.page_size)
+
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = None
+        if interval:
+            self.thread = threading.Thread(target=self.run, name='battery-flush', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            self.flush()
+
+    # Write the dirty pages to disk. A page is marked clean before it is
+    # written, so a write that races with the flush marks it dirty again.
+    def flush(self):
+        with self.lock:
+            if self.data.closed:
+                return
+            dirty = self.dirty
+            for page in range(len(dirty)):
+                if dirty[page]:
+                    dirty[page] = 0
+                    offset = page << self.page_shift
+                    self.data.flush(offset, min(self.page_size, self.size - offset))
+
+    def close(self):
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+        with self.lock:
+            self.data.close()
@@ -0,0 +1,262 @@
+import warnings
+
+# Cartridge header and memory bank controllers (MBC)
+# 0134-0143     Title
+# 0147          Cartridge type (memory bank controller and extra hardware)
+# 0148          ROM size (32KB << n)
+# 0149          External RAM size
+#
+# Writes to 0000-7FFF go to the memory bank controller, which tells the MMU
+# which 16KB ROM banks are mapped at 0000-3FFF and 4000-7FFF and which 8KB
+# RAM bank is mapped at A000-BFFF. A bank switch only replaces the handlers
+# of the affected pages, the banks themselves are never copied.
+#
+# Cartridge types without a bank controller here (MBC2, MMM01, HuC1, ...)
+# are mapped as ROM only, with a warning, so their first 32KB still run.
+
+ROM_BANK_SIZE = 0x4000
+RAM_BANK_SIZE = 0x2000
+
+# External RAM size for each value of 0149
+RAM_SIZES = {
+    0x00: 0,
+    0x01: 0x0800, # 2KB
+    0x02: 0x2000, # 8KB
+    0x03: 0x8000, # 32KB (4 banks)
+    0x04: 0x20000, # 128KB (16 banks)
+    0x05: 0x10000, # 64KB (8 banks)
+}
+
+class Header():
+
+    def __init__(self, rom):
+        if len(rom) < 0x150: # No header (blank or test ROM)
+            rom = bytes(0x150)
+        self.title = bytes(rom[0x134:0x144]).split(b'\0')[0].decode('ascii', 'replace')
+        self.cartridge_type = rom[0x147]
+        self.rom_size = ROM_BANK_SIZE * 2 << rom[0x148]
+        self.ram_size = RAM_SIZES.get(rom[0x149], 0)
+
+        if self.cartridge_type not in CARTRIDGE_TYPES:
+            warnings.warn('Unsupported cartridge type 0x{:02x}, mapped as ROM only'.format(self.cartridge_type))
+        self.mbc, self.battery, self.rtc = CARTRIDGE_TYPES.get(self.cartridge_type, (ROMOnly, False, False))
+        self.rumble = self.cartridge_type in RUMBLE_TYPES
+
+# No memory bank controller: 32KB of ROM and, as it always was in this
+# emulator, 8KB of RAM mapped at A000-BFFF
+class ROMOnly():
+
+    def __init__(self, mmu, header):
+        self.mmu = mmu
+        self.header = header
+        self.rom_banks = max(2, len(mmu.rom) // ROM_BANK_SIZE)
+        self.ram_banks = (header.ram_size + RAM_BANK_SIZE - 1) // RAM_BANK_SIZE
+
+    def reset(self):
+        self.mmu.map_rom(0, 1)
+        self.mmu.map_eram(0)
+
+    # Write to 0000-7FFF
+    def wb(self, addr, val):
+        pass
+
+    # RAM bank mapped when RAM is enabled, None when it reads as 0xFF
+    def ram_bank(self, bank):
+        if not self.ram_banks:
+            return None
+        return bank % self.ram_banks
+
+# MBC1 (up to 2MB ROM, 32KB RAM)
+# 0000-1FFF     RAM enable (0x0A in the low nibble enables it)
+# 2000-3FFF     ROM bank, low 5 bits (0 selects 1)
+# 4000-5FFF     RAM bank, or ROM bank bits 5-6
+# 6000-7FFF     Banking mode: 0 maps bank 0 at 0000 and RAM bank 0,
+#               1 applies 4000-5FFF to 0000-3FFF and to the RAM bank too
+class MBC1(ROMOnly):
+
+    def reset(self):
+        self.ram_enabled = False
+        self.bank1 = 1
+        self.bank2 = 0
+        self.mode = 0
+        self.update_rom()
+        self.update_ram()
+
+    def wb(self, addr, val):
+        if addr < 0x2000:
+            self.ram_enabled = (val & 0x0F) == 0x0A
+            self.update_ram()
+        elif addr < 0x4000:
+            self.bank1 = (val & 0x1F) or 1
+            self.update_rom()
+        elif addr < 0x6000:
+            self.bank2 = val & 0x03
+            self.update_rom()
+            self.update_ram()
+        else:
+            self.mode = val & 0x01
+            self.update_rom()
+            self.update_ram()
+
+    def update_rom(self):
+        bank0 = (self.bank2 << 5) if self.mode else 0
+        bank1 = (self.bank2 << 5) | self.bank1
+        self.mmu.map_rom(bank0 % self.rom_banks, bank1 % self.rom_banks)
+
+    def update_ram(self):
+        if not self.ram_enabled:
+            self.mmu.map_eram(None)
+        else:
+            self.mmu.map_eram(self.ram_bank(self.bank2 if self.mode else 0))
+
+# MBC3 (up to 2MB ROM, 32KB RAM, real time clock)
+# 0000-1FFF     RAM and RTC enable (0x0A in the low nibble enables them)
+# 2000-3FFF     ROM bank, 7 bits (0 selects 1)
+# 4000-5FFF     RAM bank (0x00-0x03) or RTC register (0x08-0x0C)
+# 6000-7FFF     Writing 0x00 then 0x01 latches the clock into the RTC registers
+#
+# RTC registers: 0x08 seconds, 0x09 minutes, 0x0A hours, 0x0B day (low 8
+# bits), 0x0C day bit 8 (bit 0), halt (bit 6) and day overflow (bit 7).
+# The clock runs on emulated time, so it is deterministic and stops with
+# the emulator.
+RTC_CYCLES_PER_SECOND = 1048576 # M-cycles
+
+class MBC3(ROMOnly):
+
+    def reset(self):
+        self.ram_enabled = False
+        self.rom_bank = 1
+        self.ram_select = 0
+        self.latch_value = 0xFF
+        self.rtc_seconds = 0 # Seconds counted up to rtc_cycle
+        self.rtc_cycle = self.mmu.cpu.clock['M']
+        self.rtc_halt = 0
+        self.rtc_carry = 0
+        self.rtc_latched = [0] * 5
+        self.update_rom()
+        self.update_ram()
+
+    def wb(self, addr, val):
+        if addr < 0x2000:
+            self.ram_enabled = (val & 0x0F) == 0x0A
+            self.update_ram()
+        elif addr < 0x4000:
+            self.rom_bank = (val & 0x7F) or 1
+            self.update_rom()
+        elif addr < 0x6000:
+            self.ram_select = val
+            self.update_ram()
+        else:
+            if self.latch_value == 0x00 and val == 0x01:
+                self.rtc_latched = self.rtc_registers()
+            self.latch_value = val
+
+    def update_rom(self):
+        self.mmu.map_rom(0, self.rom_bank % self.rom_banks)
+
+    def update_ram(self):
+        if not self.ram_enabled:
+            self.mmu.map_eram(None)
+        elif 0x08 <= self.ram_select <= 0x0C and self.header.rtc:
+            self.mmu.map_eram_handlers(self.rb_rtc, self.wb_rtc)
+        elif self.ram_select <= 0x03:
+            self.mmu.map_eram(self.ram_bank(self.ram_select))
+        else:
+            self.mmu.map_eram(None)
+
+    # Seconds elapsed on the clock
+    def rtc_now(self):
+        if self.rtc_halt:
+            return self.rtc_seconds
+        elapsed = max(0, self.mmu.cpu.clock['M'] - self.rtc_cycle) # The CPU clock restarts on reset
+        return self.rtc_seconds + elapsed // RTC_CYCLES_PER_SECOND
+
+    def rtc_registers(self):
+        seconds = self.rtc_now()
+        days = seconds // 86400
+        if days > 0x1FF: # Day counter overflow, sticky until cleared
+            self.rtc_carry = 1
+            days &= 0x1FF
+        return [
+            seconds % 60,
+            seconds // 60 % 60,
+            seconds // 3600 % 24,
+            days & 0xFF,
+            (days >> 8) | (self.rtc_halt << 6) | (self.rtc_carry << 7),
+        ]
+
+    def rb_rtc(self, addr):
+        return self.rtc_latched[self.ram_select - 0x08]
+
+    def wb_rtc(self, addr, val):
+        registers = self.rtc_registers()
+        registers[self.ram_select - 0x08] = val
+        self.rtc_latched[self.ram_select - 0x08] = val
+        seconds, minutes, hours, day_low, day_high = registers
+        days = ((day_high & 0x01) << 8) | day_low
+        self.rtc_halt = (day_high >> 6) & 0x01
+        self.rtc_carry = (day_high >> 7) & 0x01
+        self.rtc_seconds = ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+        self.rtc_cycle = self.mmu.cpu.clock['M']
+
+# MBC5 (up to 8MB ROM, 128KB RAM)
+# 0000-1FFF     RAM enable (0x0A in the low nibble enables it)
+# 2000-2FFF     ROM bank, low 8 bits (bank 0 can be mapped at 4000-7FFF)
+# 3000-3FFF     ROM bank, bit 8
+# 4000-5FFF     RAM bank (bit 3 drives the motor on rumble cartridges)
+# 6000-7FFF     Unused
+class MBC5(ROMOnly):
+
+    def reset(self):
+        self.ram_enabled = False
+        self.rom_bank = 1
+        self.ram_select = 0
+        self.update_rom()
+        self.update_ram()
+
+    def wb(self, addr, val):
+        if addr < 0x2000:
+            self.ram_enabled = (val & 0x0F) == 0x0A
+            self.update_ram()
+        elif addr < 0x3000:
+            self.rom_bank = (self.rom_bank & 0x100) | val
+            self.update_rom()
+        elif addr < 0x4000:
+            self.rom_bank = ((val & 0x01) << 8) | (self.rom_bank & 0xFF)
+            self.update_rom()
+        elif addr < 0x6000:
+            self.ram_select = val & (0x07 if self.header.rumble else 0x0F)
+            self.update_ram()
+
+    def update_rom(self):
+        self.mmu.map_rom(0, self.rom_bank % self.rom_banks)
+
+    def update_ram(self):
+        if not self.ram_enabled:
+            self.mmu.map_eram(None)
+        else:
+            self.mmu.map_eram(self.ram_bank(self.ram_select))
+
+# Cartridge type -> (memory bank controller, battery, real time clock)
+CARTRIDGE_TYPES = {
+    0x00: (ROMOnly, False, False),
+    0x01: (MBC1, False, False),
+    0x02: (MBC1, False, False), # +RAM
+    0x03: (MBC1, True, False),  # +RAM+BATTERY
+    0x08: (ROMOnly, False, False), # +RAM
+    0x09: (ROMOnly, True, False),  # +RAM+BATTERY
+    0x0F: (MBC3, True, True),   # +TIMER+BATTERY
+    0x10: (MBC3, True, True),   # +TIMER+RAM+BATTERY
+    0x11: (MBC3, False, False),
+    0x12: (MBC3, False, False), # +RAM
+    0x13: (MBC3, True, False),  # +RAM+BATTERY
+    0x19: (MBC5, False, False),
+    0x1A: (MBC5, False, False), # +RAM
+    0x1B: (MBC5, True, False),  # +RAM+BATTERY
+    0x1C: (MBC5, False, False), # +RUMBLE
+    0x1D: (MBC5, False, False), # +RUMBLE+RAM
+    0x1E: (MBC5, True, False),  # +RUMBLE+RAM+BATTERY
+}
+
+# Rumble cartridges use bit 3 of the RAM bank register for the motor
+RUMBLE_TYPES = (0x1C, 0x1D, 0x1E)
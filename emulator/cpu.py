@@ -1,8 +1,20 @@
 
 from emulator.mmu import MMU
 from emulator.gpu import GPU
+from emulator.registers import Registers
+from emulator.translator import BlockTranslator, IDLE_UNSAFE_READS
+from emulator.scheduler import Scheduler
+from emulator.interrupts import Interrupts
+from emulator.timer import Timer
+from emulator.dma import DMA
+from emulator.joypad import Joypad
+from emulator.serial import Serial
+from emulator.apu import APU
+from emulator.battery import SAVE_INTERVAL
+from emulator.trace import TraceBuffer, TRACE_OFF, TRACE_INSTRUCTIONS
 from emulator import utils
-from emulator import graphics
+from emulator import alu
+from emulator.video import HeadlessFramebuffer
 
 class Z80():
     # Flags
@@ -17,23 +29,22 @@ class Z80():
     stop_mode = 0 # Halt CPU & LCD display until button pressed.
     halt_mode = 0 # Power down CPU until an interrupt occurs
 
-    # Interrupt enabled
-    interrup_enabled = 1
+    # Interrupt controller: IF, IE and IME (see emulator.interrupts)
+    interrupts = None
 
     # Time clock: The Z80 holds two types of clock (m and t)
-    clock = {'M': 0, 'T': 0}
-
-    registers = {
-        'A': 0, 'B':0, 'C': 0, 'D':0, 'E': 0, 'H':0, 'L':0, # 8-bit registers
-        'F': 0, # Flags register
-                # Zero (0x80): Set if the last operation produced a result of 0
-                # Operation (0x40): Set if the last operation was a subtraction
-                # Half-carry (0x20): Set if, in the result of the last operation, the lower half of the byte overflowed past 15
-                # Carry (0x10): Set if the last operation produced a result over 255 (for additions) or under 0 (for subtractions).
-
-        'PC': 0, 'SP': 0,                                          # 16-bit registers
-        'M': 0, 'T': 0,                                            # Clock for last instr
-    }
+    clock = None
+
+    # Register file (see emulator.registers.Registers)
+    # A, B, C, D, E, H, L: 8-bit registers
+    # F: Flags register
+    #   Zero (0x80): Set if the last operation produced a result of 0
+    #   Operation (0x40): Set if the last operation was a subtraction
+    #   Half-carry (0x20): Set if, in the result of the last operation, the lower half of the byte overflowed past 15
+    #   Carry (0x10): Set if the last operation produced a result over 255 (for additions) or under 0 (for subtractions).
+    # PC, SP: 16-bit registers
+    # M, T: Clock for last instr
+    registers = None
 
     # PC (Program Counter)
     # PC is initialized to 0x100 on power up.
@@ -53,46 +64,90 @@ class Z80():
 
     current_op = 0
 
-    def __init__(self, headless=False):
-        if not headless:
-            self.window = graphics.Window('Gameboy')
-        else:
-            self.window = None
-        self.GPU = GPU(self, self.window)
+    # Length of a frame in M-cycles (154 lines of 456 dots)
+    FRAME_CYCLES = 17556
+
+    # Reasons for run_cycles() and run_frame() to return
+    STOP_CYCLES = 0     # Cycle budget spent
+    STOP_FRAME = 1      # A new frame was completed
+    STOP_BREAKPOINT = 2 # PC reached a breakpoint
+
+    def __init__(self, headless=False, trace_level=TRACE_OFF, trace_size=65536, video=None, idle_skip=True):
+        self.registers = Registers()
+        self.clock = {'M': 0, 'T': 0}
+        self.scheduler = Scheduler() # Events timed on clock['M']
+        self.interrupts = Interrupts(self)
+        self.timer = Timer(self)
+        self.dma = DMA(self)
+        self.joypad = Joypad(self)
+        self.serial = Serial(self)
+        self.APU = APU(self)
+        self.run_end = 0             # clock['M'] the current run_cycles() stops at
+        self.breakpoints = set()
+
+        # Skip idle loops (see emulator.translator and idle_loop)
+        self.idle_skip = idle_skip
+        self.stats = {
+            'idle_skips': 0,    # Idle loops fast-forwarded
+            'idle_cycles': 0,   # M-cycles skipped in idle loops
+            'halt_cycles': 0,   # M-cycles skipped in HALT/STOP
+        }
+
+        # Tracing (see emulator.trace) swaps in the traced dispatch loops,
+        # so the normal ones never check whether tracing is on
+        self.trace_level = trace_level
+        self.trace = None
+        if trace_level != TRACE_OFF:
+            self.trace = TraceBuffer(trace_size)
+            self.dispatcher = self.dispatcher_traced
+            self.run_cycles = self.run_cycles_traced
+
+        # Video sink the GPU presents frames to (see emulator.video)
+        if video is None:
+            if headless:
+                video = HeadlessFramebuffer()
+            else:
+                from emulator import graphics # Only load pyglet when there is a window
+                video = graphics.Window('Gameboy', joypad=self.joypad)
+        self.video = video
         self.MMU = MMU(self)
+        self.GPU = GPU(self, self.video)
+        for component in (self.joypad, self.serial, self.interrupts, self.timer, self.APU, self.dma, self.GPU):
+            component.map_io(self.MMU)
+        self.translator = BlockTranslator(self)
 
     def get_16b_register(self, register_high, register_low):
-        return utils.bytes_to_16(self.registers[register_high], self.registers[register_low])
+        return utils.bytes_to_16(getattr(self.registers, register_high), getattr(self.registers, register_low))
 
     def set_16b_register(self, register_high, register_low, value):
-        self.registers[register_high] = value >> 8
-        self.registers[register_low] = value & 0xFF
+        setattr(self.registers, register_high, value >> 8)
+        setattr(self.registers, register_low, value & 0xFF)
 
     def rb_16b_register(self, register_high, register_low):
-        addr = utils.bytes_to_16(self.registers[register_high], self.registers[register_low])
+        addr = utils.bytes_to_16(getattr(self.registers, register_high), getattr(self.registers, register_low))
         return self.MMU.rb(addr)
 
     def wb_16b_register(self, register_high, register_low, value):
-        addr = utils.bytes_to_16(self.registers[register_high], self.registers[register_low])
+        addr = utils.bytes_to_16(getattr(self.registers, register_high), getattr(self.registers, register_low))
         self.MMU.wb(addr, value)
 
     def rw_16b_register(self, register_high, register_low):
-        addr = utils.bytes_to_16(self.registers[register_high], self.registers[register_low])
+        addr = utils.bytes_to_16(getattr(self.registers, register_high), getattr(self.registers, register_low))
         return self.MMU.rw(addr)
 
     def ww_16b_register(self, register_high, register_low, value):
-        addr = utils.bytes_to_16(self.registers[register_high], self.registers[register_low])
+        addr = utils.bytes_to_16(getattr(self.registers, register_high), getattr(self.registers, register_low))
         self.MMU.ww(addr, value)
 
     def push_16b_on_stack(self, value):
-        self.registers['SP'] -= 1 # Decrement Stack Pointer (SP)
-        self.MMU.wb(self.registers['SP'], value >> 8)
-        self.registers['SP'] -= 1 # Decrement Stack Pointer (SP)
-        self.MMU.wb(self.registers['SP'], value & 0xFF)
+        self.registers.SP -= 1 # Decrement Stack Pointer (SP)
+        self.MMU.wb(self.registers.SP, value >> 8)
+        self.registers.SP -= 1 # Decrement Stack Pointer (SP)
+        self.MMU.wb(self.registers.SP, value & 0xFF)
 
     def pop_16b_from_stack(self):
-        value = self.MMU.rw(self.registers['SP'])
-        self.registers['SP'] += 2 # Increment Stack Pointer (SP)
+        value = self.MMU.rw(self.registers.SP)
+        self.registers.SP += 2 # Increment Stack Pointer (SP)
         return value
 
     # Add n to A.
@@ -103,25 +158,11 @@ class Z80():
     #   C - Set if carry from bit 7.
     # Use with: n = A,B,C,D,E,H,L,(HL), #
     def op_add_an(self, value):
-        if utils.half_carry_8_bit(self.registers['A'], value):
-            half_carry = True
-        else:
-            half_carry = False
-        if utils.carry_8_bit(self.registers['A'], value):
-            carry = True
-        else:
-            carry = False
-        self.registers['A'] += value
-        self.registers['F'] = 0 # Clear flags
-        if self.registers['A'] == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        if half_carry: # H - Set if carry from bit 3.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
-        if carry: # C - Set if carry from bit 7.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
-        self.registers['A'] &= 255 # Mask to 8-bits
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        result = alu.ADC[(self.registers.A << 8) | value]
+        self.registers.A = result & 0xFF
+        self.registers.F = result >> 8
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # ADC A,n
     # Add n + Carry flag to A
@@ -133,9 +174,12 @@ class Z80():
     #   H - Set if carry from bit 3.
     #   C - Set if carry from bit 7.
     def op_adc_an(self, value):
-        carry_flag_value = utils.get_bit(self.registers['F'], self.FLAG_C)  # Get carry flag value
-        value += carry_flag_value
-        self.op_add_an(value)
+        carry_flag_value = (self.registers.F >> self.FLAG_C) & 1 # Get carry flag value
+        result = alu.ADC[(carry_flag_value << 16) | (self.registers.A << 8) | value]
+        self.registers.A = result & 0xFF
+        self.registers.F = result >> 8
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # SUB n
     # Subtract n from A
@@ -144,29 +188,14 @@ class Z80():
     # Flags affected:
     #   Z - Set if result is zero.
     #   N - Set.
-    #   H - Set if no borrow from bit 4.
-    #   C - Set if no borrow.
+    #   H - Set if borrow from bit 4.
+    #   C - Set if borrow.
     def op_sub_an(self, value):
-        if utils.half_borrow_8_bit(self.registers['A'], value):
-            half_borrow = True
-        else:
-            half_borrow = False
-        if utils.half_borrow_8_bit(self.registers['A'], value):
-            borrow = True
-        else:
-            borrow = False
-        self.registers['A'] -= value
-        self.registers['F'] = 0 # Clear flags
-        if self.registers['A'] == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) # Set
-        if half_borrow: # H - Set if borrow from bit 3.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
-        if borrow: # C - Set if borrow from bit 7.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
-        self.registers['A'] &= 255 # Mask to 8-bits
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        result = alu.SBC[(self.registers.A << 8) | value]
+        self.registers.A = result & 0xFF
+        self.registers.F = result >> 8
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # SBC A,n
     # Subtract n + Carry flag from A.
@@ -175,12 +204,15 @@ class Z80():
     # Flags affected:
     #   Z - Set if result is zero.
     #   N - Set.
-    #   H - Set if no borrow from bit 4.
-    #   C - Set if no borrow.
+    #   H - Set if borrow from bit 4.
+    #   C - Set if borrow.
     def op_sbc_an(self, value):
-        carry_flag_value = utils.get_bit(self.registers['F'], self.FLAG_C)  # Get carry flag value
-        value += carry_flag_value
-        self.op_sub_an(value)
+        carry_flag_value = (self.registers.F >> self.FLAG_C) & 1 # Get carry flag value
+        result = alu.SBC[(carry_flag_value << 16) | (self.registers.A << 8) | value]
+        self.registers.A = result & 0xFF
+        self.registers.F = result >> 8
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # AND n
     # Logically AND n with A, result in A.
@@ -192,16 +224,10 @@ class Z80():
     #   H - Set.
     #   C - Reset.
     def op_and_n(self, value):
-        self.registers['A'] = self.registers['A'] & value
-        if self.registers['A'] == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z) # Z - Set if bit b of register r is 0.
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Set.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) # C - Reset.
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.registers.A &= value
+        self.registers.F = alu.AND_FLAGS[self.registers.A]
+        self.registers.M = 2 # 8 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     # OR n
     # Logical OR n with register A, result in A.
@@ -213,16 +239,10 @@ class Z80():
     #   H - Reset.
     #   C - Reset.
     def op_or_n(self, value):
-        self.registers['A'] = self.registers['A'] | value
-        if self.registers['A'] == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z) # Z - Set if bit b of register r is 0.
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) # H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) # C - Reset.
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.registers.A |= value
+        self.registers.F = alu.OR_FLAGS[self.registers.A]
+        self.registers.M = 2 # 8 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     # XOR n
     # Logical exclusive OR n with register A, result in A.
@@ -234,12 +254,10 @@ class Z80():
     #   H - Reset.
     #   C - Reset.
     def op_xor_n(self, value):
-        self.registers['A'] = utils.bitwise_xor(self.registers['A'], value)
-        self.registers['F'] = 0x00 # Clear flags
-        if self.registers['A'] == 0: # Z - Set if result is zero.
-            self.registers['F'] |= 0x80
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.A ^= value
+        self.registers.F = alu.XOR_FLAGS[self.registers.A]
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # Test bit b in register r.
     # Use with:
@@ -251,24 +269,24 @@ class Z80():
     #   C - Not affected.
     def op_test_bit(self, value, bit):
         if not utils.test_bit(value, bit): # Z - Set if bit b of register r is 0.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z) # Z - Set if bit b of register r is 0.
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z) # Z - Set if bit b of register r is 0.
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Set.
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) # N - Reset.
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H) # H - Set.
+        self.registers.M = 2 # 8 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     def op_test_bit_hl(self, bit):
         value = self.rb_16b_register('H', 'L')
         if not utils.test_bit(value, bit): # Z - Set if bit b of register r is 0.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z) # Z - Set if bit b of register r is 0.
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z) # Z - Set if bit b of register r is 0.
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Set.
-        self.registers['M'] = 4 # 16 M-time taken
-        self.registers['T'] = 16 # 16 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) # N - Reset.
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H) # H - Set.
+        self.registers.M = 4 # 16 M-time taken
+        self.registers.T = 16 # 16 M-time taken
 
     # SET b,r
     # Set bit b in register r.
@@ -277,17 +295,16 @@ class Z80():
     # Flags affected:
     #   None
     def op_set_bit(self, register, bit):
-        self.register[register] = utils.set_bit(self.register[register], bit)
-        self.register['PC'] += 1
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        setattr(self.registers, register, utils.set_bit(getattr(self.registers, register), bit))
+        self.registers.M = 2 # 8 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
-    def op_set_bit_hl(self, register, bit):
+    def op_set_bit_hl(self, bit):
         value = self.rb_16b_register('H', 'L')
         value = utils.set_bit(value, bit)
-        self.wb_16b_register('H', 'L')
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.wb_16b_register('H', 'L', value)
+        self.registers.M = 4 # 16 M-time taken
+        self.registers.T = 16 # 16 M-time taken
 
     # RES b,r
     # Reset bit b in register r.
@@ -295,113 +312,73 @@ class Z80():
     #   b = 0 - 7, r = A,B,C,D,E,H,L,(HL)
     # Flags affected: None
     def op_reset_bit(self, register, bit):
-        self.register[register] = utils.reset_bit(self.register[register], bit)
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        setattr(self.registers, register, utils.reset_bit(getattr(self.registers, register), bit))
+        self.registers.M = 2 # 8 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
-    def op_reset_bit_hl(self, register, bit):
+    def op_reset_bit_hl(self, bit):
         value = self.rb_16b_register('H', 'L')
         value = utils.reset_bit(value, bit)
-        self.wb_16b_register('H', 'L')
-        self.registers['M'] = 2 # 8 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.wb_16b_register('H', 'L', value)
+        self.registers.M = 4 # 16 M-time taken
+        self.registers.T = 16 # 16 M-time taken
 
     def op_inc(self, register):
-        if utils.half_carry_8_bit(self.registers[register], 1):
-            half_carry = 1
-        else:
-            half_carry = 0
-        self.registers[register] += 1
-        self.registers[register] &= 255
-        if self.registers[register] == 0: # Z - Set if bit b of register r is 0.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z) # Z -  Set if result is zero.
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z) # Z -  Set if result is zero.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        if half_carry:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Set if half carry
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) # H - Set if half carry
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        result = alu.INC[getattr(self.registers, register)]
+        setattr(self.registers, register, result & 0xFF)
+        self.registers.F = (self.registers.F & 0x10) | (result >> 8) # C - Not affected.
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     def op_inc_hlm(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        value = self.MMU.rb(addr)
-        if utils.half_carry_8_bit(value, 1):
-            half_carry = 1
-        else:
-            half_carry = 0
-        value += 1
-        value &= 255
-        self.MMU.wb(addr, value)
-        if value == 0: # Z - Set if bit b of register r is 0.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z) # Z -  Set if result is zero.
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z) # Z -  Set if result is zero.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        if half_carry:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Set if half carry
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) # H - Set if half carry
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 12 M-time taken
+        addr = self.registers.HL
+        result = alu.INC[self.MMU.rb(addr)]
+        self.MMU.wb(addr, result & 0xFF)
+        self.registers.F = (self.registers.F & 0x10) | (result >> 8) # C - Not affected.
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 12 M-time taken
 
     def op_inc_16(self, register_high, register_low):
         value = self.get_16b_register(register_high, register_low)
         value += 1
         value &= 0xFFFF
         self.set_16b_register(register_high, register_low, value)
-        self.registers['M'] = 2 # 1 M-time taken
-        self.registers['T'] = 8 # 1 M-time taken
+        self.registers.M = 2 # 1 M-time taken
+        self.registers.T = 8 # 1 M-time taken
 
     def op_inc_16_one_register(self, register):
-        self.registers[register] += 1
-        self.registers[register] &= 0xFFFF
-        self.registers['M'] = 2 # 1 M-time taken
-        self.registers['T'] = 8 # 1 M-time taken
+        setattr(self.registers, register, (getattr(self.registers, register) + 1) & 0xFFFF)
+        self.registers.M = 2 # 1 M-time taken
+        self.registers.T = 8 # 1 M-time taken
 
     def op_dec(self, register):
-        borrow_bit_4 = utils.half_borrow_8_bit(self.registers[register], 1)
-        self.registers[register] -= 1
-        self.registers[register] &= 255
-        if self.registers[register] == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        if not borrow_bit_4:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
-        else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H)
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) #  N - Set.
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        result = alu.DEC[getattr(self.registers, register)]
+        setattr(self.registers, register, result & 0xFF)
+        self.registers.F = (self.registers.F & 0x10) | (result >> 8) # C - Not affected.
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     def op_dec_hl(self):
-        addr = self.registers['H'] << 8 + self.registers['L']
-        value = self.MMU.rb(addr)
-        value -= 1
-        value &= 255
-        self.MMU.wb(addr, value)
-        if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) #  N - Set.
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        addr = self.registers.HL
+        result = alu.DEC[self.MMU.rb(addr)]
+        self.MMU.wb(addr, result & 0xFF)
+        self.registers.F = (self.registers.F & 0x10) | (result >> 8) # C - Not affected.
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 12 M-time taken
 
     def op_dec_16(self, register_high, register_low):
-        value = self.registers[register_high] << 8 + self.registers[register_low]
+        value = (getattr(self.registers, register_high) << 8) | getattr(self.registers, register_low)
         value -= 1
         value &= 0xFFFF
         self.set_16b_register(register_high, register_low, value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     def op_dec_sp(self):
-        self.registers['SP'] -= 1
-        self.registers['SP'] &= 0xFFFF
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.SP -= 1
+        self.registers.SP &= 0xFFFF
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
    # CP n
     # Compare A with n. This is basically an A - n
@@ -410,20 +387,12 @@ class Z80():
     # Flags affected:
     #   Z - Set if result is zero. (Set if A = n.)
     #   N - Set. Substraction flag
-    #   H - Set if no borrow from bit 4.
-    #   C - Set for no borrow. (Set if A < n.)
+    #   H - Set if borrow from bit 4.
+    #   C - Set for borrow. (Set if A < n.)
     def op_cp_an(self, n):
-        result = self.registers['A'] - n
-        self.registers['F'] = 0x00 # Clear flags
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) # N - Set. Substraction flag
-        if result == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        if not utils.half_borrow_8_bit(self.registers['A'], n): # H - Set if no borrow from bit 4.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
-        if not utils.borrow_8_bit(self.registers['A'], n): # C - Set for no borrow. (Set if A < n.)
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.F = alu.SBC[(self.registers.A << 8) | n] >> 8
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # ADD HL,n
     # Add n to HL.
@@ -446,68 +415,68 @@ class Z80():
         hlm_value += value
         hlm_value &= 0xFFFF # Mask to 16-bits
         self.ww_16b_register('H', 'L', hlm_value)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) # N - Reset.
         if half_carry: # H - Set if carry from bit 11.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H)
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H)
         if carry: # C - Set if carry from bit 15.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C)
-        self.registers['M'] = 2 # 1 M-time taken
-        self.registers['T'] = 8 # 1 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C)
+        self.registers.M = 2 # 1 M-time taken
+        self.registers.T = 8 # 1 M-time taken
 
     def op_ld_r1r2(self, r_dst, r_src):
-        self.registers[r_dst] = self.registers[r_src]
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        setattr(self.registers, r_dst, getattr(self.registers, r_src))
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     def op_ld_r1hl(self, r_dst):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.registers[r_dst] = self.MMU.rb(addr) # Read from address
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = self.registers.HL
+        setattr(self.registers, r_dst, self.MMU.rb(addr)) # Read from address
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def op_ld_r1bc(self, r_dst):
-        addr = utils.bytes_to_16(self.registers['B'], self.registers['C'])
-        self.registers[r_dst] = self.MMU.rb(addr) # Read from address
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = self.registers.BC
+        setattr(self.registers, r_dst, self.MMU.rb(addr)) # Read from address
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def op_ld_r1de(self, r_dst):
-        self.registers[r_dst] = self.rb_16b_register('D', 'E') # Read from address
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        setattr(self.registers, r_dst, self.rb_16b_register('D', 'E')) # Read from address
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def op_ld_r1nn(self, r_dst):
-        addr = self.MMU.rw(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 2 # Advance PC
-        self.registers[r_dst] = self.MMU.rb(addr) # Read from address
-        self.registers['M'] = 4  # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        addr = self.MMU.rw(self.registers.PC) # Get address from instr
+        self.registers.PC += 2 # Advance PC
+        setattr(self.registers, r_dst, self.MMU.rb(addr)) # Read from address
+        self.registers.M = 4  # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     def op_ld_hlr2(self, r_src):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.MMU.wb(addr, self.registers[r_src])
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = self.registers.HL
+        self.MMU.wb(addr, getattr(self.registers, r_src))
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def op_pushnn(self, register1, register2):
-        self.registers['SP'] -= 1 # Decrement Stack Pointer (SP)
-        self.MMU.wb(self.registers['SP'], self.registers[register1])
-        self.registers['SP'] -= 1 # Decrement Stack Pointer (SP)
-        self.MMU.wb(self.registers['SP'], self.registers[register2])
-        self.registers['M'] = 4  # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.SP -= 1 # Decrement Stack Pointer (SP)
+        self.MMU.wb(self.registers.SP, getattr(self.registers, register1))
+        self.registers.SP -= 1 # Decrement Stack Pointer (SP)
+        self.MMU.wb(self.registers.SP, getattr(self.registers, register2))
+        self.registers.M = 4  # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     def op_popnn(self, register1, register2):
-        self.registers[register2] = self.MMU.rb(self.registers['SP'])
-        self.registers['SP'] += 1 # Increment Stack Pointer (SP)
-        self.registers[register1] = self.MMU.rb(self.registers['SP'])
-        self.registers['SP'] += 1 # Increment Stack Pointer (SP)
-        self.registers['M'] = 3  # 3 M-time taken
-        self.registers['T'] = 12 # 12 M-time taken
+        setattr(self.registers, register2, self.MMU.rb(self.registers.SP))
+        self.registers.SP += 1 # Increment Stack Pointer (SP)
+        setattr(self.registers, register1, self.MMU.rb(self.registers.SP))
+        self.registers.SP += 1 # Increment Stack Pointer (SP)
+        self.registers.M = 3  # 3 M-time taken
+        self.registers.T = 12 # 12 M-time taken
 
     # SWAP n
     # Add n to HL.
@@ -518,22 +487,22 @@ class Z80():
     #   H - Reset.
     #   C - Reset.
     def op_swapn(self, register):
-        self.register[register] = utils.swap_nibbles(self.register[register])
-        self.registers['F'] = 0x00
-        if self.registers[register] == 0:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        setattr(self.registers, register, utils.swap_nibbles(getattr(self.registers, register)))
+        self.registers.F = 0x00
+        if getattr(self.registers, register) == 0:
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def op_swaphlm(self):
         value = self.rb_16b_register('H', 'L')
         value = utils.swap_nibbles(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['F'] = 0x00
+        self.registers.F = 0x00
         if value == 0:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 2 M-time taken
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 2 M-time taken
 
     # RLC n
     # Rotate n left. Old bit 7 to Carry flag.
@@ -545,25 +514,25 @@ class Z80():
     #   C - Contains old bit 7 data.
     def op_rlc_common(self, value):
         old_bit_7_data = utils.get_bit(value, 7)
-        value = (value << 8) + old_bit_7_data # Rotate A left
+        value = (value << 1) + old_bit_7_data # Rotate A left
         value &= 255
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
         if old_bit_7_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
         return value
 
     def op_rlc_register(self, register):
-        self.registers[register] = self.op_rlc_common(self.registers[register])
+        setattr(self.registers, register, self.op_rlc_common(getattr(self.registers, register)))
 
     # RL n
     # Rotate n left through Carry flag.
@@ -574,44 +543,44 @@ class Z80():
     #   H - Reset.
     #   C - Contains old bit 7 data.
     def op_rl_common(self, value):
-        old_carry_flag = utils.get_bit(self.registers['F'], self.FLAG_C)
+        old_carry_flag = utils.get_bit(self.registers.F, self.FLAG_C)
         old_bit_7_data = utils.get_bit(value, 7)
         value = (value << 1) + old_carry_flag # Rotate A left through Carry flag.
         value &= 0xFF
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
         if old_bit_7_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 7 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 7 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 7 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 7 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
         return value
 
     def op_rla(self):
-        value = self.registers['A']
-        old_carry_flag = utils.get_bit(self.registers['F'], self.FLAG_C)
+        value = self.registers.A
+        old_carry_flag = utils.get_bit(self.registers.F, self.FLAG_C)
         old_bit_7_data = utils.get_bit(value, 7)
         value = (value << 1) + old_carry_flag # Rotate A left through Carry flag.
         value &= 0xFF
-        self.registers['A'] = value
-        self.registers['F'] = 0x00
+        self.registers.A = value
+        self.registers.F = 0x00
         if old_bit_7_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 7 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 7 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 7 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 7 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
         return value
 
     def op_rl_register(self, register):
-        self.registers[register] = self.op_rl_common(self.registers[register])
+        setattr(self.registers, register, self.op_rl_common(getattr(self.registers, register)))
 
     # RRC n
     # Rotate n right. Old bit 0 to Carry flag.
@@ -620,25 +589,27 @@ class Z80():
     #   N - Reset.
     #   H - Reset.
     #   C -  Contains old bit 0 data
-    def op_rrc_common(self):
+    def op_rrc_common(self, value):
         old_bit_0_data = utils.get_bit(value, 0)
-        value = value >> 1 + (old_bit_0_data << 7) # Rotate A right
+        value = (value >> 1) + (old_bit_0_data << 7) # Rotate A right
         value &= 255
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
         if old_bit_0_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
-        self.registers['M'] = 2 # 1 M-time taken
-        self.registers['T'] = 8 # 1 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
+        self.registers.M = 2 # 1 M-time taken
+        self.registers.T = 8 # 1 M-time taken
+
+        return value
 
     def op_rrc_register(self, register):
-        self.registers[register] = self.op_rl_common(self.registers[register])
+        setattr(self.registers, register, self.op_rrc_common(getattr(self.registers, register)))
 
     # RRA
     # Rotate A right through Carry flag.
@@ -647,26 +618,28 @@ class Z80():
     #   N - Reset.
     #   H - Reset.
     #   C - Contains old bit 0 data.
-    def op_rr_common(self):
+    def op_rr_common(self, value):
+        old_carry_flag = utils.get_bit(self.registers.F, self.FLAG_C)
         old_bit_0_data = utils.get_bit(value, 0)
-        old_bit_4_data = utils.get_bit(value, 4)
-        value = value >> 1 + (old_bit_4_data << 7) # Rotate A right through Carry flag.
+        value = (value >> 1) + (old_carry_flag << 7) # Rotate A right through Carry flag.
         value &= 255
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
-        if old_bit_7_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
+        if old_bit_0_data == 1:
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
-    def op_rrc_register(self, register):
-        self.registers[register] = self.op_rr_common(self.registers[register])
+        return value
+
+    def op_rr_register(self, register):
+        setattr(self.registers, register, self.op_rr_common(getattr(self.registers, register)))
 
     # SLA n
     # Shift n left into Carry. LSB of n set to 0.
@@ -676,25 +649,27 @@ class Z80():
     #   N - Reset.
     #   H - Reset.
     #   C - Contains old bit 7 data.
-    def op_sla_common(self):
+    def op_sla_common(self, value):
         old_bit_7_data = utils.get_bit(value, 7)
         value = value << 1
         value &= 255
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
         if old_bit_7_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
+
+        return value
 
     def op_sla_register(self, register):
-        self.registers[register] = self.op_sla_common(self.registers[register])
+        setattr(self.registers, register, self.op_sla_common(getattr(self.registers, register)))
 
     # SRA n
     # Shift n right into Carry. MSB doesn't change.
@@ -704,26 +679,28 @@ class Z80():
     #   N - Reset.
     #   H - Reset.
     #   C - Contains old bit 0 data.
-    def op_sra_common(self):
+    def op_sra_common(self, value):
         old_bit_7_data = utils.get_bit(value, 7)
         old_bit_0_data = utils.get_bit(value, 0)
         value = (old_bit_7_data << 7) + (value >> 1)
         value &= 255
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
         if old_bit_0_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
+
+        return value
 
     def op_sra_register(self, register):
-        self.registers[register] = self.op_sra_common(self.registers[register])
+        setattr(self.registers, register, self.op_sra_common(getattr(self.registers, register)))
 
     # SRL n
     # Shift n right into Carry. MSB set to 0.
@@ -733,25 +710,27 @@ class Z80():
     #   N - Reset.
     #   H - Reset.
     #   C - Contains old bit 0 data.
-    def op_srl_common(self):
+    def op_srl_common(self, value):
         old_bit_0_data = utils.get_bit(value, 0)
         value = value >> 1
         value &= 255
         if value == 0: # Z - Set if result is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) #  H - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) #  N - Reset.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) #  H - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) #  N - Reset.
         if old_bit_0_data == 1:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C) #  C - Contains old bit 0 data
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C) #  C - Contains old bit 0 data
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
+
+        return value
 
     def op_srl_register(self, register):
-        self.registers[register] = self.op_srl_common(self.registers[register])
+        setattr(self.registers, register, self.op_srl_common(getattr(self.registers, register)))
 
     # RST n
     # Push present address onto stack.
@@ -759,255 +738,255 @@ class Z80():
     # Use with:
     #   nn = 0x00,0x08,0x10,0x18,0x20,0x28,0x30,0x38
     def op_rst(self, value):
-        self.push_16b_on_stack(self.registers['PC']) # Push address of next instruction onto stack
-        self.registers['PC'] = value # Jump to address 0x0000 + n.
-        self.registers['M'] = 8 # 8 M-time taken
-        self.registers['T'] = 32 # 8 M-time taken
+        self.push_16b_on_stack(self.registers.PC) # Push address of next instruction onto stack
+        self.registers.PC = value # Jump to address 0x0000 + n.
+        self.registers.M = 8 # 8 M-time taken
+        self.registers.T = 32 # 8 M-time taken
 
     def add_aa(self):
-        self.op_add_an(self.registers['A'])
+        self.op_add_an(self.registers.A)
 
     def add_ab(self):
-        self.op_add_an(self.registers['B'])
+        self.op_add_an(self.registers.B)
 
     def add_ac(self):
-        self.op_add_an(self.registers['C'])
+        self.op_add_an(self.registers.C)
 
     def add_ad(self):
-        self.op_add_an(self.registers['D'])
+        self.op_add_an(self.registers.D)
 
     def add_ae(self):
-        self.op_add_an(self.registers['E'])
+        self.op_add_an(self.registers.E)
 
     def add_ah(self):
-        self.op_add_an(self.registers['H'])
+        self.op_add_an(self.registers.H)
 
     def add_al(self):
-        self.op_add_an(self.registers['L'])
+        self.op_add_an(self.registers.L)
 
     def add_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
         self.op_add_an(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def add_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.op_add_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def adc_aa(self):
-        self.op_adc_an(self.registers['A'])
+        self.op_adc_an(self.registers.A)
 
     def adc_ab(self):
-        self.op_adc_an(self.registers['B'])
+        self.op_adc_an(self.registers.B)
 
     def adc_ac(self):
-        self.op_adc_an(self.registers['C'])
+        self.op_adc_an(self.registers.C)
 
     def adc_ad(self):
-        self.op_adc_an(self.registers['D'])
+        self.op_adc_an(self.registers.D)
 
     def adc_ae(self):
-        self.op_adc_an(self.registers['E'])
+        self.op_adc_an(self.registers.E)
 
     def adc_ah(self):
-        self.op_adc_an(self.registers['H'])
+        self.op_adc_an(self.registers.H)
 
     def adc_al(self):
-        self.op_adc_an(self.registers['L'])
+        self.op_adc_an(self.registers.L)
 
     def adc_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
         self.op_adc_an(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def adc_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.op_adc_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def sub_aa(self):
-        self.op_sub_an(self.registers['A'])
+        self.op_sub_an(self.registers.A)
 
     def sub_ab(self):
-        self.op_sub_an(self.registers['B'])
+        self.op_sub_an(self.registers.B)
 
     def sub_ac(self):
-        self.op_sub_an(self.registers['C'])
+        self.op_sub_an(self.registers.C)
 
     def sub_ad(self):
-        self.op_sub_an(self.registers['D'])
+        self.op_sub_an(self.registers.D)
 
     def sub_ae(self):
-        self.op_sub_an(self.registers['E'])
+        self.op_sub_an(self.registers.E)
 
     def sub_ah(self):
-        self.op_sub_an(self.registers['H'])
+        self.op_sub_an(self.registers.H)
 
     def sub_al(self):
-        self.op_sub_an(self.registers['L'])
+        self.op_sub_an(self.registers.L)
 
     def sub_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
         self.op_sub_an(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def sub_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.op_sub_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def sbc_aa(self):
-        self.op_sbc_an(self.registers['A'])
+        self.op_sbc_an(self.registers.A)
 
     def sbc_ab(self):
-        self.op_sbc_an(self.registers['B'])
+        self.op_sbc_an(self.registers.B)
 
     def sbc_ac(self):
-        self.op_sbc_an(self.registers['C'])
+        self.op_sbc_an(self.registers.C)
 
     def sbc_ad(self):
-        self.op_sbc_an(self.registers['D'])
+        self.op_sbc_an(self.registers.D)
 
     def sbc_ae(self):
-        self.op_sbc_an(self.registers['E'])
+        self.op_sbc_an(self.registers.E)
 
     def sbc_ah(self):
-        self.op_sbc_an(self.registers['H'])
+        self.op_sbc_an(self.registers.H)
 
     def sbc_al(self):
-        self.op_sbc_an(self.registers['L'])
+        self.op_sbc_an(self.registers.L)
 
     def sbc_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
         self.op_sbc_an(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def sbc_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.op_sbc_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def and_aa(self):
-        self.op_and_n(self.registers['A'])
+        self.op_and_n(self.registers.A)
 
     def and_ab(self):
-        self.op_and_n(self.registers['B'])
+        self.op_and_n(self.registers.B)
 
     def and_ac(self):
-        self.op_and_n(self.registers['C'])
+        self.op_and_n(self.registers.C)
 
     def and_ad(self):
-        self.op_and_n(self.registers['D'])
+        self.op_and_n(self.registers.D)
 
     def and_ae(self):
-        self.op_and_n(self.registers['E'])
+        self.op_and_n(self.registers.E)
 
     def and_ah(self):
-        self.op_and_n(self.registers['H'])
+        self.op_and_n(self.registers.H)
 
     def and_al(self):
-        self.op_and_n(self.registers['L'])
+        self.op_and_n(self.registers.L)
 
     def and_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
         self.op_and_n(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def and_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.op_and_n(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def or_aa(self):
-        self.op_or_an(self.registers['A'])
+        self.op_or_n(self.registers.A)
 
     def or_ab(self):
-        self.op_or_an(self.registers['B'])
+        self.op_or_n(self.registers.B)
 
     def or_ac(self):
-        self.op_or_an(self.registers['C'])
+        self.op_or_n(self.registers.C)
 
     def or_ad(self):
-        self.op_or_an(self.registers['D'])
+        self.op_or_n(self.registers.D)
 
     def or_ae(self):
-        self.op_or_an(self.registers['E'])
+        self.op_or_n(self.registers.E)
 
     def or_ah(self):
-        self.op_or_an(self.registers['H'])
+        self.op_or_n(self.registers.H)
 
     def or_al(self):
-        self.op_or_an(self.registers['L'])
+        self.op_or_n(self.registers.L)
 
     def or_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
-        self.op_or_an(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.op_or_n(value)
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def or_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
-        self.op_or_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
+        self.op_or_n(value)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def xor_aa(self):
-        self.op_xor_n(self.registers['A'])
+        self.op_xor_n(self.registers.A)
 
     def xor_ab(self):
-        self.op_xor_n(self.registers['B'])
+        self.op_xor_n(self.registers.B)
 
     def xor_ac(self):
-        self.op_xor_n(self.registers['C'])
+        self.op_xor_n(self.registers.C)
 
     def xor_ad(self):
-        self.op_xor_n(self.registers['D'])
+        self.op_xor_n(self.registers.D)
 
     def xor_ae(self):
-        self.op_xor_n(self.registers['E'])
+        self.op_xor_n(self.registers.E)
 
     def xor_ah(self):
-        self.op_xor_n(self.registers['H'])
+        self.op_xor_n(self.registers.H)
 
     def xor_al(self):
-        self.op_xor_n(self.registers['L'])
+        self.op_xor_n(self.registers.L)
 
     def xor_ahl(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
+        addr = self.registers.HL
         value = self.MMU.rb(addr)
-        self.op_xor_a(value)
-        self.registers['M'] = 8 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.op_xor_n(value)
+        self.registers.M = 8 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def xor_an(self):
-        value = self.registers['PC']
-        self.registers['PC'] += 1
-        self.op_xor_a(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
+        self.op_xor_n(value)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def addhlbc(self):
         n = self.get_16b_register('B', 'C')
@@ -1022,7 +1001,7 @@ class Z80():
         self.op_add_hln(n)
 
     def addhlsp(self):
-        n = self.registers['SP']
+        n = self.registers.SP
         self.op_add_hln(n)
 
     # ADD SP,n
@@ -1034,9 +1013,9 @@ class Z80():
     #   H - Set or reset according to operation.
     #   C - Set or reset according to operation.
     def addspn():
-        n = utils.signed_8b(self.MMU.rb(self.registers['PC']))
-        self.registers['PC'] += 1
-        sp_value = self.registers['SP']
+        n = utils.signed_8b(self.MMU.rb(self.registers.PC))
+        self.registers.PC += 1
+        sp_value = self.registers.SP
         if utils.half_carry_16_bit(sp_value, n):
             half_carry = True
         else:
@@ -1047,600 +1026,600 @@ class Z80():
             carry = False
         sp_value += n
         sp_value &= 0xFFFF # Mask to 16-bits
-        self.registers['SP'] = sp_value
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z) # N - Reset.
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N) # N - Reset.
+        self.registers.SP = sp_value
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z) # N - Reset.
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N) # N - Reset.
         if half_carry: # H - Set if carry from bit 11.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H)
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H)
         if carry: # C - Set if carry from bit 15.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 16 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C)
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 16 M-time taken
 
     def bit0a(self):
-        self.op_test_bit(self.registers['A'], 0)
+        self.op_test_bit(self.registers.A, 0)
 
     def bit0b(self):
-        self.op_test_bit(self.registers['B'], 0)
+        self.op_test_bit(self.registers.B, 0)
 
     def bit0c(self):
-        self.op_test_bit(self.registers['C'], 0)
+        self.op_test_bit(self.registers.C, 0)
 
     def bit0d(self):
-        self.op_test_bit(self.registers['D'], 0)
+        self.op_test_bit(self.registers.D, 0)
 
     def bit0e(self):
-        self.op_test_bit(self.registers['E'], 0)
+        self.op_test_bit(self.registers.E, 0)
 
     def bit0h(self):
-        self.op_test_bit(self.registers['H'], 0)
+        self.op_test_bit(self.registers.H, 0)
 
     def bit0l(self):
-        self.op_test_bit(self.registers['L'], 0)
+        self.op_test_bit(self.registers.L, 0)
 
     def bit0hl(self):
         self.op_test_bit_hl(0)
 
     def bit1a(self):
-        self.op_test_bit(self.registers['A'], 1)
+        self.op_test_bit(self.registers.A, 1)
 
     def bit1b(self):
-        self.op_test_bit(self.registers['B'], 1)
+        self.op_test_bit(self.registers.B, 1)
 
     def bit1c(self):
-        self.op_test_bit(self.registers['C'], 1)
+        self.op_test_bit(self.registers.C, 1)
 
     def bit1d(self):
-        self.op_test_bit(self.registers['D'], 1)
+        self.op_test_bit(self.registers.D, 1)
 
     def bit1e(self):
-        self.op_test_bit(self.registers['E'], 1)
+        self.op_test_bit(self.registers.E, 1)
 
     def bit1h(self):
-        self.op_test_bit(self.registers['H'], 1)
+        self.op_test_bit(self.registers.H, 1)
 
     def bit1l(self):
-        self.op_test_bit(self.registers['L'], 1)
+        self.op_test_bit(self.registers.L, 1)
 
     def bit1hl(self):
         self.op_test_bit_hl(1)
 
     def bit2a(self):
-        self.op_test_bit(self.registers['A'], 2)
+        self.op_test_bit(self.registers.A, 2)
 
     def bit2b(self):
-        self.op_test_bit(self.registers['B'], 2)
+        self.op_test_bit(self.registers.B, 2)
 
     def bit2c(self):
-        self.op_test_bit(self.registers['C'], 2)
+        self.op_test_bit(self.registers.C, 2)
 
     def bit2d(self):
-        self.op_test_bit(self.registers['D'], 2)
+        self.op_test_bit(self.registers.D, 2)
 
     def bit2e(self):
-        self.op_test_bit(self.registers['E'], 2)
+        self.op_test_bit(self.registers.E, 2)
 
     def bit2h(self):
-        self.op_test_bit(self.registers['H'], 2)
+        self.op_test_bit(self.registers.H, 2)
 
     def bit2l(self):
-        self.op_test_bit(self.registers['L'], 2)
+        self.op_test_bit(self.registers.L, 2)
 
     def bit2hl(self):
         self.op_test_bit_hl(2)
 
     def bit3a(self):
-        self.op_test_bit(self.registers['A'], 3)
+        self.op_test_bit(self.registers.A, 3)
 
     def bit3b(self):
-        self.op_test_bit(self.registers['B'], 3)
+        self.op_test_bit(self.registers.B, 3)
 
     def bit3c(self):
-        self.op_test_bit(self.registers['C'], 3)
+        self.op_test_bit(self.registers.C, 3)
 
     def bit3d(self):
-        self.op_test_bit(self.registers['D'], 3)
+        self.op_test_bit(self.registers.D, 3)
 
     def bit3e(self):
-        self.op_test_bit(self.registers['E'], 3)
+        self.op_test_bit(self.registers.E, 3)
 
     def bit3h(self):
-        self.op_test_bit(self.registers['H'], 3)
+        self.op_test_bit(self.registers.H, 3)
 
     def bit3l(self):
-        self.op_test_bit(self.registers['L'], 3)
+        self.op_test_bit(self.registers.L, 3)
 
     def bit3hl(self):
         self.op_test_bit_hl(3)
 
     def bit4a(self):
-        self.op_test_bit(self.registers['A'], 4)
+        self.op_test_bit(self.registers.A, 4)
 
     def bit4b(self):
-        self.op_test_bit(self.registers['B'], 4)
+        self.op_test_bit(self.registers.B, 4)
 
     def bit4c(self):
-        self.op_test_bit(self.registers['C'], 4)
+        self.op_test_bit(self.registers.C, 4)
 
     def bit4d(self):
-        self.op_test_bit(self.registers['D'], 4)
+        self.op_test_bit(self.registers.D, 4)
 
     def bit4e(self):
-        self.op_test_bit(self.registers['E'], 4)
+        self.op_test_bit(self.registers.E, 4)
 
     def bit4h(self):
-        self.op_test_bit(self.registers['H'], 4)
+        self.op_test_bit(self.registers.H, 4)
 
     def bit4l(self):
-        self.op_test_bit(self.registers['L'], 4)
+        self.op_test_bit(self.registers.L, 4)
 
     def bit4hl(self):
         self.op_test_bit_hl(4)
 
     def bit5a(self):
-        self.op_test_bit(self.registers['A'], 5)
+        self.op_test_bit(self.registers.A, 5)
 
     def bit5b(self):
-        self.op_test_bit(self.registers['B'], 5)
+        self.op_test_bit(self.registers.B, 5)
 
     def bit5c(self):
-        self.op_test_bit(self.registers['C'], 5)
+        self.op_test_bit(self.registers.C, 5)
 
     def bit5d(self):
-        self.op_test_bit(self.registers['D'], 5)
+        self.op_test_bit(self.registers.D, 5)
 
     def bit5e(self):
-        self.op_test_bit(self.registers['E'], 5)
+        self.op_test_bit(self.registers.E, 5)
 
     def bit5h(self):
-        self.op_test_bit(self.registers['H'], 5)
+        self.op_test_bit(self.registers.H, 5)
 
     def bit5l(self):
-        self.op_test_bit(self.registers['L'], 5)
+        self.op_test_bit(self.registers.L, 5)
 
     def bit5hl(self):
         self.op_test_bit_hl(5)
 
     def bit6a(self):
-        self.op_test_bit(self.registers['A'], 6)
+        self.op_test_bit(self.registers.A, 6)
 
     def bit6b(self):
-        self.op_test_bit(self.registers['B'], 6)
+        self.op_test_bit(self.registers.B, 6)
 
     def bit6c(self):
-        self.op_test_bit(self.registers['C'], 6)
+        self.op_test_bit(self.registers.C, 6)
 
     def bit6d(self):
-        self.op_test_bit(self.registers['D'], 6)
+        self.op_test_bit(self.registers.D, 6)
 
     def bit6e(self):
-        self.op_test_bit(self.registers['E'], 6)
+        self.op_test_bit(self.registers.E, 6)
 
     def bit6h(self):
-        self.op_test_bit(self.registers['H'], 6)
+        self.op_test_bit(self.registers.H, 6)
 
     def bit6l(self):
-        self.op_test_bit(self.registers['L'], 6)
+        self.op_test_bit(self.registers.L, 6)
 
     def bit6hl(self):
         self.op_test_bit_hl(6)
 
     def bit7a(self):
-        self.op_test_bit(self.registers['A'], 7)
+        self.op_test_bit(self.registers.A, 7)
 
     def bit7b(self):
-        self.op_test_bit(self.registers['B'], 7)
+        self.op_test_bit(self.registers.B, 7)
 
     def bit7c(self):
-        self.op_test_bit(self.registers['C'], 7)
+        self.op_test_bit(self.registers.C, 7)
 
     def bit7d(self):
-        self.op_test_bit(self.registers['D'], 7)
+        self.op_test_bit(self.registers.D, 7)
 
     def bit7e(self):
-        self.op_test_bit(self.registers['E'], 7)
+        self.op_test_bit(self.registers.E, 7)
 
     def bit7h(self):
-        self.op_test_bit(self.registers['H'], 7)
+        self.op_test_bit(self.registers.H, 7)
 
     def bit7l(self):
-        self.op_test_bit(self.registers['L'], 7)
+        self.op_test_bit(self.registers.L, 7)
 
     def bit7hl(self):
         self.op_test_bit_hl(7)
 
     def setbit0a(self):
-        self.op_set_bit(self.registers['A'], 0)
+        self.op_set_bit('A', 0)
 
     def setbit0b(self):
-        self.op_set_bit(self.registers['B'], 0)
+        self.op_set_bit('B', 0)
 
     def setbit0c(self):
-        self.op_set_bit(self.registers['C'], 0)
+        self.op_set_bit('C', 0)
 
     def setbit0d(self):
-        self.op_set_bit(self.registers['D'], 0)
+        self.op_set_bit('D', 0)
 
     def setbit0e(self):
-        self.op_set_bit(self.registers['E'], 0)
+        self.op_set_bit('E', 0)
 
     def setbit0h(self):
-        self.op_set_bit(self.registers['H'], 0)
+        self.op_set_bit('H', 0)
 
     def setbit0l(self):
-        self.op_set_bit(self.registers['L'], 0)
+        self.op_set_bit('L', 0)
 
     def setbit0hl(self):
         self.op_set_bit_hl(0)
 
     def setbit1a(self):
-        self.op_set_bit(self.registers['A'], 1)
+        self.op_set_bit('A', 1)
 
     def setbit1b(self):
-        self.op_set_bit(self.registers['B'], 1)
+        self.op_set_bit('B', 1)
 
     def setbit1c(self):
-        self.op_set_bit(self.registers['C'], 1)
+        self.op_set_bit('C', 1)
 
     def setbit1d(self):
-        self.op_set_bit(self.registers['D'], 1)
+        self.op_set_bit('D', 1)
 
     def setbit1e(self):
-        self.op_set_bit(self.registers['E'], 1)
+        self.op_set_bit('E', 1)
 
     def setbit1h(self):
-        self.op_set_bit(self.registers['H'], 1)
+        self.op_set_bit('H', 1)
 
     def setbit1l(self):
-        self.op_set_bit(self.registers['L'], 1)
+        self.op_set_bit('L', 1)
 
     def setbit1hl(self):
         self.op_set_bit_hl(1)
 
     def setbit2a(self):
-        self.op_set_bit(self.registers['A'], 2)
+        self.op_set_bit('A', 2)
 
     def setbit2b(self):
-        self.op_set_bit(self.registers['B'], 2)
+        self.op_set_bit('B', 2)
 
     def setbit2c(self):
-        self.op_set_bit(self.registers['C'], 2)
+        self.op_set_bit('C', 2)
 
     def setbit2d(self):
-        self.op_set_bit(self.registers['D'], 2)
+        self.op_set_bit('D', 2)
 
     def setbit2e(self):
-        self.op_set_bit(self.registers['E'], 2)
+        self.op_set_bit('E', 2)
 
     def setbit2h(self):
-        self.op_set_bit(self.registers['H'], 2)
+        self.op_set_bit('H', 2)
 
     def setbit2l(self):
-        self.op_set_bit(self.registers['L'], 2)
+        self.op_set_bit('L', 2)
 
     def setbit2hl(self):
         self.op_set_bit_hl(2)
 
     def setbit3a(self):
-        self.op_set_bit(self.registers['A'], 3)
+        self.op_set_bit('A', 3)
 
     def setbit3b(self):
-        self.op_set_bit(self.registers['B'], 3)
+        self.op_set_bit('B', 3)
 
     def setbit3c(self):
-        self.op_set_bit(self.registers['C'], 3)
+        self.op_set_bit('C', 3)
 
     def setbit3d(self):
-        self.op_set_bit(self.registers['D'], 3)
+        self.op_set_bit('D', 3)
 
     def setbit3e(self):
-        self.op_set_bit(self.registers['E'], 3)
+        self.op_set_bit('E', 3)
 
     def setbit3h(self):
-        self.op_set_bit(self.registers['H'], 3)
+        self.op_set_bit('H', 3)
 
     def setbit3l(self):
-        self.op_set_bit(self.registers['L'], 3)
+        self.op_set_bit('L', 3)
 
     def setbit3hl(self):
         self.op_set_bit_hl(3)
 
     def setbit4a(self):
-        self.op_set_bit(self.registers['A'], 4)
+        self.op_set_bit('A', 4)
 
     def setbit4b(self):
-        self.op_set_bit(self.registers['B'], 4)
+        self.op_set_bit('B', 4)
 
     def setbit4c(self):
-        self.op_set_bit(self.registers['C'], 4)
+        self.op_set_bit('C', 4)
 
     def setbit4d(self):
-        self.op_set_bit(self.registers['D'], 4)
+        self.op_set_bit('D', 4)
 
     def setbit4e(self):
-        self.op_set_bit(self.registers['E'], 4)
+        self.op_set_bit('E', 4)
 
     def setbit4h(self):
-        self.op_set_bit(self.registers['H'], 4)
+        self.op_set_bit('H', 4)
 
     def setbit4l(self):
-        self.op_set_bit(self.registers['L'], 4)
+        self.op_set_bit('L', 4)
 
     def setbit4hl(self):
         self.op_set_bit_hl(4)
 
     def setbit5a(self):
-        self.op_set_bit(self.registers['A'], 5)
+        self.op_set_bit('A', 5)
 
     def setbit5b(self):
-        self.op_set_bit(self.registers['B'], 5)
+        self.op_set_bit('B', 5)
 
     def setbit5c(self):
-        self.op_set_bit(self.registers['C'], 5)
+        self.op_set_bit('C', 5)
 
     def setbit5d(self):
-        self.op_set_bit(self.registers['D'], 5)
+        self.op_set_bit('D', 5)
 
     def setbit5e(self):
-        self.op_set_bit(self.registers['E'], 5)
+        self.op_set_bit('E', 5)
 
     def setbit5h(self):
-        self.op_set_bit(self.registers['H'], 5)
+        self.op_set_bit('H', 5)
 
     def setbit5l(self):
-        self.op_set_bit(self.registers['L'], 5)
+        self.op_set_bit('L', 5)
 
     def setbit5hl(self):
         self.op_set_bit_hl(5)
 
     def setbit6a(self):
-        self.op_set_bit(self.registers['A'], 6)
+        self.op_set_bit('A', 6)
 
     def setbit6b(self):
-        self.op_set_bit(self.registers['B'], 6)
+        self.op_set_bit('B', 6)
 
     def setbit6c(self):
-        self.op_set_bit(self.registers['C'], 6)
+        self.op_set_bit('C', 6)
 
     def setbit6d(self):
-        self.op_set_bit(self.registers['D'], 6)
+        self.op_set_bit('D', 6)
 
     def setbit6e(self):
-        self.op_set_bit(self.registers['E'], 6)
+        self.op_set_bit('E', 6)
 
     def setbit6h(self):
-        self.op_set_bit(self.registers['H'], 6)
+        self.op_set_bit('H', 6)
 
     def setbit6l(self):
-        self.op_set_bit(self.registers['L'], 6)
+        self.op_set_bit('L', 6)
 
     def setbit6hl(self):
         self.op_set_bit_hl(6)
 
     def setbit7a(self):
-        self.op_set_bit(self.registers['A'], 7)
+        self.op_set_bit('A', 7)
 
     def setbit7b(self):
-        self.op_set_bit(self.registers['B'], 7)
+        self.op_set_bit('B', 7)
 
     def setbit7c(self):
-        self.op_set_bit(self.registers['C'], 7)
+        self.op_set_bit('C', 7)
 
     def setbit7d(self):
-        self.op_set_bit(self.registers['D'], 7)
+        self.op_set_bit('D', 7)
 
     def setbit7e(self):
-        self.op_set_bit(self.registers['E'], 7)
+        self.op_set_bit('E', 7)
 
     def setbit7h(self):
-        self.op_set_bit(self.registers['H'], 7)
+        self.op_set_bit('H', 7)
 
     def setbit7l(self):
-        self.op_set_bit(self.registers['L'], 7)
+        self.op_set_bit('L', 7)
 
     def setbit7hl(self):
         self.op_set_bit_hl(7)
 
     def resbit0a(self):
-        self.op_reset_bit(self.registers['A'], 0)
+        self.op_reset_bit('A', 0)
 
     def resbit0b(self):
-        self.op_reset_bit(self.registers['B'], 0)
+        self.op_reset_bit('B', 0)
 
     def resbit0c(self):
-        self.op_reset_bit(self.registers['C'], 0)
+        self.op_reset_bit('C', 0)
 
     def resbit0d(self):
-        self.op_reset_bit(self.registers['D'], 0)
+        self.op_reset_bit('D', 0)
 
     def resbit0e(self):
-        self.op_reset_bit(self.registers['E'], 0)
+        self.op_reset_bit('E', 0)
 
     def resbit0h(self):
-        self.op_reset_bit(self.registers['H'], 0)
+        self.op_reset_bit('H', 0)
 
     def resbit0l(self):
-        self.op_reset_bit(self.registers['L'], 0)
+        self.op_reset_bit('L', 0)
 
     def resbit0hl(self):
         self.op_reset_bit_hl(0)
 
     def resbit1a(self):
-        self.op_reset_bit(self.registers['A'], 1)
+        self.op_reset_bit('A', 1)
 
     def resbit1b(self):
-        self.op_reset_bit(self.registers['B'], 1)
+        self.op_reset_bit('B', 1)
 
     def resbit1c(self):
-        self.op_reset_bit(self.registers['C'], 1)
+        self.op_reset_bit('C', 1)
 
     def resbit1d(self):
-        self.op_reset_bit(self.registers['D'], 1)
+        self.op_reset_bit('D', 1)
 
     def resbit1e(self):
-        self.op_reset_bit(self.registers['E'], 1)
+        self.op_reset_bit('E', 1)
 
     def resbit1h(self):
-        self.op_reset_bit(self.registers['H'], 1)
+        self.op_reset_bit('H', 1)
 
     def resbit1l(self):
-        self.op_reset_bit(self.registers['L'], 1)
+        self.op_reset_bit('L', 1)
 
     def resbit1hl(self):
         self.op_reset_bit_hl(1)
 
     def resbit2a(self):
-        self.op_reset_bit(self.registers['A'], 2)
+        self.op_reset_bit('A', 2)
 
     def resbit2b(self):
-        self.op_reset_bit(self.registers['B'], 2)
+        self.op_reset_bit('B', 2)
 
     def resbit2c(self):
-        self.op_reset_bit(self.registers['C'], 2)
+        self.op_reset_bit('C', 2)
 
     def resbit2d(self):
-        self.op_reset_bit(self.registers['D'], 2)
+        self.op_reset_bit('D', 2)
 
     def resbit2e(self):
-        self.op_reset_bit(self.registers['E'], 2)
+        self.op_reset_bit('E', 2)
 
     def resbit2h(self):
-        self.op_reset_bit(self.registers['H'], 2)
+        self.op_reset_bit('H', 2)
 
     def resbit2l(self):
-        self.op_reset_bit(self.registers['L'], 2)
+        self.op_reset_bit('L', 2)
 
     def resbit2hl(self):
         self.op_reset_bit_hl(2)
 
     def resbit3a(self):
-        self.op_reset_bit(self.registers['A'], 3)
+        self.op_reset_bit('A', 3)
 
     def resbit3b(self):
-        self.op_reset_bit(self.registers['B'], 3)
+        self.op_reset_bit('B', 3)
 
     def resbit3c(self):
-        self.op_reset_bit(self.registers['C'], 3)
+        self.op_reset_bit('C', 3)
 
     def resbit3d(self):
-        self.op_reset_bit(self.registers['D'], 3)
+        self.op_reset_bit('D', 3)
 
     def resbit3e(self):
-        self.op_reset_bit(self.registers['E'], 3)
+        self.op_reset_bit('E', 3)
 
     def resbit3h(self):
-        self.op_reset_bit(self.registers['H'], 3)
+        self.op_reset_bit('H', 3)
 
     def resbit3l(self):
-        self.op_reset_bit(self.registers['L'], 3)
+        self.op_reset_bit('L', 3)
 
     def resbit3hl(self):
         self.op_reset_bit_hl(3)
 
     def resbit4a(self):
-        self.op_reset_bit(self.registers['A'], 4)
+        self.op_reset_bit('A', 4)
 
     def resbit4b(self):
-        self.op_reset_bit(self.registers['B'], 4)
+        self.op_reset_bit('B', 4)
 
     def resbit4c(self):
-        self.op_reset_bit(self.registers['C'], 4)
+        self.op_reset_bit('C', 4)
 
     def resbit4d(self):
-        self.op_reset_bit(self.registers['D'], 4)
+        self.op_reset_bit('D', 4)
 
     def resbit4e(self):
-        self.op_reset_bit(self.registers['E'], 4)
+        self.op_reset_bit('E', 4)
 
     def resbit4h(self):
-        self.op_reset_bit(self.registers['H'], 4)
+        self.op_reset_bit('H', 4)
 
     def resbit4l(self):
-        self.op_reset_bit(self.registers['L'], 4)
+        self.op_reset_bit('L', 4)
 
     def resbit4hl(self):
         self.op_reset_bit_hl(4)
 
     def resbit5a(self):
-        self.op_reset_bit(self.registers['A'], 5)
+        self.op_reset_bit('A', 5)
 
     def resbit5b(self):
-        self.op_reset_bit(self.registers['B'], 5)
+        self.op_reset_bit('B', 5)
 
     def resbit5c(self):
-        self.op_reset_bit(self.registers['C'], 5)
+        self.op_reset_bit('C', 5)
 
     def resbit5d(self):
-        self.op_reset_bit(self.registers['D'], 5)
+        self.op_reset_bit('D', 5)
 
     def resbit5e(self):
-        self.op_reset_bit(self.registers['E'], 5)
+        self.op_reset_bit('E', 5)
 
     def resbit5h(self):
-        self.op_reset_bit(self.registers['H'], 5)
+        self.op_reset_bit('H', 5)
 
     def resbit5l(self):
-        self.op_reset_bit(self.registers['L'], 5)
+        self.op_reset_bit('L', 5)
 
     def resbit5hl(self):
         self.op_reset_bit_hl(5)
 
     def resbit6a(self):
-        self.op_reset_bit(self.registers['A'], 6)
+        self.op_reset_bit('A', 6)
 
     def resbit6b(self):
-        self.op_reset_bit(self.registers['B'], 6)
+        self.op_reset_bit('B', 6)
 
     def resbit6c(self):
-        self.op_reset_bit(self.registers['C'], 6)
+        self.op_reset_bit('C', 6)
 
     def resbit6d(self):
-        self.op_reset_bit(self.registers['D'], 6)
+        self.op_reset_bit('D', 6)
 
     def resbit6e(self):
-        self.op_reset_bit(self.registers['E'], 6)
+        self.op_reset_bit('E', 6)
 
     def resbit6h(self):
-        self.op_reset_bit(self.registers['H'], 6)
+        self.op_reset_bit('H', 6)
 
     def resbit6l(self):
-        self.op_reset_bit(self.registers['L'], 6)
+        self.op_reset_bit('L', 6)
 
     def resbit6hl(self):
         self.op_reset_bit_hl(6)
 
     def resbit7a(self):
-        self.op_reset_bit(self.registers['A'], 7)
+        self.op_reset_bit('A', 7)
 
     def resbit7b(self):
-        self.op_reset_bit(self.registers['B'], 7)
+        self.op_reset_bit('B', 7)
 
     def resbit7c(self):
-        self.op_reset_bit(self.registers['C'], 7)
+        self.op_reset_bit('C', 7)
 
     def resbit7d(self):
-        self.op_reset_bit(self.registers['D'], 7)
+        self.op_reset_bit('D', 7)
 
     def resbit7e(self):
-        self.op_reset_bit(self.registers['E'], 7)
+        self.op_reset_bit('E', 7)
 
     def resbit7h(self):
-        self.op_reset_bit(self.registers['H'], 7)
+        self.op_reset_bit('H', 7)
 
     def resbit7l(self):
-        self.op_reset_bit(self.registers['L'], 7)
+        self.op_reset_bit('L', 7)
 
     def resbit7hl(self):
         self.op_reset_bit_hl(7)
 
     # No operation
     def nop(self):
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # PUSH nn
     # Push register pair nn onto stack. Decrement Stack Pointer (SP) twice.
@@ -1678,11 +1657,11 @@ class Z80():
     #   n = BC,DE,HL,SP
     #   nn = 16 bit immediate value
     def ldnnn(self):
-        addr = self.MMU.rw(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 2 # Advance PC
-        self.registers['A'] = self.MMU.rb(addr) # Read from address
-        self.registers['M'] = 3  # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        addr = self.MMU.rw(self.registers.PC) # Get address from instr
+        self.registers.PC += 2 # Advance PC
+        self.registers.A = self.MMU.rb(addr) # Read from address
+        self.registers.M = 3  # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # LD n,nn
     # Put value nn into n
@@ -1690,11 +1669,11 @@ class Z80():
     #   n = BC,DE,HL,SP
     #   nn = 16 bit immediate value
     def ldbcnn(self):
-        self.registers['C'] = self.MMU.rb(self.registers['PC']) # Read from address
-        self.registers['B'] = self.MMU.rb(self.registers['PC']+1) # Read from address
-        self.registers['PC'] += 2 # Advance PC
-        self.registers['M'] = 3  # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        self.registers.C = self.MMU.rb(self.registers.PC) # Read from address
+        self.registers.B = self.MMU.rb(self.registers.PC+1) # Read from address
+        self.registers.PC += 2 # Advance PC
+        self.registers.M = 3  # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # LD n,nn
     # Put value nn into n
@@ -1702,11 +1681,11 @@ class Z80():
     #   n = BC,DE,HL,SP
     #   nn = 16 bit immediate value
     def lddenn(self):
-        self.registers['E'] = self.MMU.rb(self.registers['PC']) # Read from address
-        self.registers['D'] = self.MMU.rb(self.registers['PC']+1) # Read from address
-        self.registers['PC'] += 2 # Advance PC
-        self.registers['M'] = 3  # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        self.registers.E = self.MMU.rb(self.registers.PC) # Read from address
+        self.registers.D = self.MMU.rb(self.registers.PC+1) # Read from address
+        self.registers.PC += 2 # Advance PC
+        self.registers.M = 3  # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # LD n,nn
     # Put value nn into n
@@ -1714,11 +1693,11 @@ class Z80():
     #   n = BC,DE,HL,SP
     #   nn = 16 bit immediate value
     def ldhlnn(self):
-        self.registers['L'] = self.MMU.rb(self.registers['PC']) # Read from address
-        self.registers['H'] = self.MMU.rb(self.registers['PC']+1) # Read from address
-        self.registers['PC'] += 2 # Advance PC
-        self.registers['M'] = 3  # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        self.registers.L = self.MMU.rb(self.registers.PC) # Read from address
+        self.registers.H = self.MMU.rb(self.registers.PC+1) # Read from address
+        self.registers.PC += 2 # Advance PC
+        self.registers.M = 3  # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # LD n,nn
     # Put value nn into n
@@ -1726,58 +1705,58 @@ class Z80():
     #   n = BC,DE,HL,SP
     #   nn = 16 bit immediate value
     def ldspnn(self):
-        self.registers['SP'] = self.MMU.rw(self.registers['PC']) # Read from address
-        self.registers['PC'] += 2 # Advance PC
-        self.registers['M'] = 3  # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        self.registers.SP = self.MMU.rw(self.registers.PC) # Read from address
+        self.registers.PC += 2 # Advance PC
+        self.registers.M = 3  # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # LD A,(HL-)
     # Put value at address HL into A
     # Decrement HL
     def ldahlminus(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.registers['A']= self.MMU.rb(addr) # Put value at address HL into A
-        addr -= 1 # Decrement HL.
-        self.registers['H'] = addr >> 8
-        self.registers['L'] = addr & 0x00FF
-        self.registers['M'] = 2  # 8 M-time taken
-        self.registers['T'] = 8  # 8 M-time taken
+        addr = self.registers.HL
+        self.registers.A= self.MMU.rb(addr) # Put value at address HL into A
+        addr = (addr - 1) & 0xFFFF # Decrement HL (wraps around)
+        self.registers.H = addr >> 8
+        self.registers.L = addr & 0x00FF
+        self.registers.M = 2  # 8 M-time taken
+        self.registers.T = 8  # 8 M-time taken
 
     # LD (HL-),A
     # Put A into memory address HL
     # Decrement HL
     def ldhlminusa(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.MMU.wb(addr, self.registers['A']) # Put A into memory address HL
-        addr -= 1 # Decrement HL.
-        self.registers['H'] = addr >> 8
-        self.registers['L'] = addr & 0x00FF
-        self.registers['M'] = 2  # 8 M-time taken
-        self.registers['T'] = 8  # 8 M-time taken
+        addr = self.registers.HL
+        self.MMU.wb(addr, self.registers.A) # Put A into memory address HL
+        addr = (addr - 1) & 0xFFFF # Decrement HL (wraps around)
+        self.registers.H = addr >> 8
+        self.registers.L = addr & 0x00FF
+        self.registers.M = 2  # 8 M-time taken
+        self.registers.T = 8  # 8 M-time taken
 
     # LD A,(HL+)
     # Put value at address HL into A
     # Increment HL
     def ldahlplus(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.registers['A']= self.MMU.rb(addr) # Put value at address HL into A
-        addr += 1 # Increment HL.
-        self.registers['H'] = addr >> 8
-        self.registers['L'] = addr & 0x00FF
-        self.registers['M'] = 2  # 8 M-time taken
-        self.registers['T'] = 8  # 8 M-time taken
+        addr = self.registers.HL
+        self.registers.A= self.MMU.rb(addr) # Put value at address HL into A
+        addr = (addr + 1) & 0xFFFF # Increment HL (wraps around)
+        self.registers.H = addr >> 8
+        self.registers.L = addr & 0x00FF
+        self.registers.M = 2  # 8 M-time taken
+        self.registers.T = 8  # 8 M-time taken
 
     # LD (HL+),A
     # Put A into memory address HL
     # Increment HL
     def ldhlplusa(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.MMU.wb(addr, self.registers['A']) # Put A into memory address HL
-        addr += 1 # Increment HL.
-        self.registers['H'] = addr >> 8
-        self.registers['L'] = addr & 0x00FF
-        self.registers['M'] = 2  # 8 M-time taken
-        self.registers['T'] = 8  # 8 M-time taken
+        addr = self.registers.HL
+        self.MMU.wb(addr, self.registers.A) # Put A into memory address HL
+        addr = (addr + 1) & 0xFFFF # Increment HL (wraps around)
+        self.registers.H = addr >> 8
+        self.registers.L = addr & 0x00FF
+        self.registers.M = 2  # 8 M-time taken
+        self.registers.T = 8  # 8 M-time taken
 
     # LD A,n
     # Put value n into A.
@@ -1785,10 +1764,10 @@ class Z80():
     #   n = A,B,C,D,E,H,L,(BC),(DE),(HL),(nn),#
     #   nn = two byte immediate value. (LS byte first.)
     def ldad8(self):
-        self.registers['A'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.A = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD nn,n
     # Put value nn into n.
@@ -1796,10 +1775,10 @@ class Z80():
     #   n = B,C,D,E,H,L,BC,DE,HL,SP
     #   nn = 8 bit immediate value
     def ldbd8(self):
-        self.registers['B'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.B = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD nn,n
     # Put value nn into n.
@@ -1807,10 +1786,10 @@ class Z80():
     #   n = B,C,D,E,H,L,BC,DE,HL,SP
     #   nn = 8 bit immediate value
     def ldcd8(self):
-        self.registers['C'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.C = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD nn,n
     # Put value nn into n.
@@ -1818,10 +1797,10 @@ class Z80():
     #   n = B,C,D,E,H,L,BC,DE,HL,SP
     #   nn = 8 bit immediate value
     def lddd8(self):
-        self.registers['D'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.D = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD nn,n
     # Put value nn into n.
@@ -1829,10 +1808,10 @@ class Z80():
     #   n = B,C,D,E,H,L,BC,DE,HL,SP
     #   nn = 8 bit immediate value
     def lded8(self):
-        self.registers['E'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.E = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD nn,n
     # Put value nn into n.
@@ -1840,10 +1819,10 @@ class Z80():
     #   n = B,C,D,E,H,L,BC,DE,HL,SP
     #   nn = 8 bit immediate value
     def ldhd8(self):
-        self.registers['H'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.H = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD nn,n
     # Put value nn into n.
@@ -1851,65 +1830,65 @@ class Z80():
     #   n = B,C,D,E,H,L,BC,DE,HL,SP
     #   nn = 8 bit immediate value
     def ldld8(self):
-        self.registers['L'] = self.MMU.rb(self.registers['PC']) # Get address from instr
-        self.registers['PC'] += 1 # Advance PC
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.L = self.MMU.rb(self.registers.PC) # Get address from instr
+        self.registers.PC += 1 # Advance PC
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD (C),A
     # Put A into address $FF00 + register C
     def ldff00ca(self):
-        addr = 0xFF00 + self.registers['C']
-        self.MMU.wb(addr, self.registers['A'])
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = 0xFF00 + self.registers.C
+        self.MMU.wb(addr, self.registers.A)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD A,(C) = LD A,($FF00+C)
     # Put value at address $FF00 + register C into A
     def ldaff00c(self):
-        addr = 0xFF00 + self.registers['C']
-        self.registers['A'] = self.MMU.rb(addr)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = 0xFF00 + self.registers.C
+        self.registers.A = self.MMU.rb(addr)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD (FF00+n),A
     # Put A into address $FF00 + n
     def ldff00na(self):
-        n = self.MMU.rb(self.registers['PC'])
-        self.registers['PC'] += 1
+        n = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         addr = 0xFF00 + n
-        self.MMU.wb(addr, self.registers['A'])
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.MMU.wb(addr, self.registers.A)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD A,(FF00+n)
     # Put value at address $FF00 + n into A
     def ldaff00n(self):
-        n = self.MMU.rb(self.registers['PC'])
-        self.registers['PC'] += 1
+        n = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         addr = 0xFF00 + n
-        self.registers['A'] = self.MMU.rb(addr)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        self.registers.A = self.MMU.rb(addr)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     # LD (nn),SP
     # Put Stack Pointer (SP) at address n.
     # Use with:
     #     nn = two byte immediate address.
     def ldnnsp(self):
-        addr = self.MMU.rw(self.registers['PC'])
-        self.MMU.ww(addr, self.registers['SP'])
-        self.registers['PC'] += 2
-        self.registers['M'] = 5 # 5 M-time taken
-        self.registers['T'] = 20 # 5 M-time taken
+        addr = self.MMU.rw(self.registers.PC)
+        self.MMU.ww(addr, self.registers.SP)
+        self.registers.PC += 2
+        self.registers.M = 5 # 5 M-time taken
+        self.registers.T = 20 # 5 M-time taken
 
     # LD SP,HL
     # Put HL into Stack Pointer (SP).
     def ldsphl(self):
-        value = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.registers['SP'] = value
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        value = self.registers.HL
+        self.registers.SP = value
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     # LD HL,SP+n
     # Put SP + n effective address into HL.
@@ -1920,53 +1899,53 @@ class Z80():
     #   H - Set or reset according to operation.
     #   C - Set or reset according to operation.
     def ldhlspplusn(self):
-        n = self.MMU.rb(self.registers['PC'])
-        self.registers['PC'] += 1
-        addr = self.registers['SP'] + n
-        carry = utils.half_carry_16_bit(self.registers['SP'], n)
-        half_carry = utils.carry_16_bit(self.registers['SP'], n)
-        self.ww_16b_register(self.registers['H'], self.registers['L'], addr)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_N)
+        n = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
+        addr = self.registers.SP + n
+        carry = utils.half_carry_16_bit(self.registers.SP, n)
+        half_carry = utils.carry_16_bit(self.registers.SP, n)
+        self.ww_16b_register(self.registers.H, self.registers.L, addr)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_N)
         if half_carry:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H)
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H)
         if carry:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C)
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # LD n,A
     # Put value nn into n
     # Use with:
     #   n = A,B,C,D,E,H,L,(BC),(DE),(HL),(nn
     def ldbca(self):
-        addr = utils.bytes_to_16(self.registers['B'], self.registers['C'])
-        self.MMU.wb(addr, self.registers['A'])
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = self.registers.BC
+        self.MMU.wb(addr, self.registers.A)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def lddea(self):
-        addr = utils.bytes_to_16(self.registers['D'], self.registers['E'])
-        self.MMU.wb(addr, self.registers['A'])
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = self.registers.DE
+        self.MMU.wb(addr, self.registers.A)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def ldhla(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        self.MMU.wb(addr, self.registers['A'])
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
+        addr = self.registers.HL
+        self.MMU.wb(addr, self.registers.A)
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
 
     def ldnna(self):
-        addr = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.MMU.wb(addr, self.registers['A'])
-        self.registers['M'] = 4  # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        addr = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.MMU.wb(addr, self.registers.A)
+        self.registers.M = 4  # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # LD r1,r2
     # Put value r2 into r1.
@@ -2171,12 +2150,12 @@ class Z80():
         self.op_ld_hlr2('L')
 
     def ldhln(self):
-        addr = utils.bytes_to_16(self.registers['H'], self.registers['L'])
-        n = self.MMU.rb(self.registers['PC'])
-        self.registers['PC'] += 1
+        addr = self.registers.HL
+        n = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.MMU.wb(addr, n)
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # Increment register n.
     # Put value nn into n.
@@ -2209,7 +2188,7 @@ class Z80():
         self.op_inc('L')
 
     def inchlm(self):
-        self.op_inc_hl()
+        self.op_inc_hlm()
 
     # Increment register nn.
     # Put value nn into n.
@@ -2238,15 +2217,15 @@ class Z80():
     #   cc = NC, Jump if C flag is reset.
     #   cc = C, Jump if C flag is set.
     def jrnz(self):
-        param = utils.signed_8b(self.MMU.rb(self.registers['PC']))
-        self.registers['PC'] += 1
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
-        if not utils.test_bit(self.registers['F'], self.FLAG_Z):
-            self.registers['PC'] += param
-            self.registers['PC'] &= 0xFFFF
-            self.registers['M'] += 1 # 1 extra M-time taken
-            self.registers['T'] += 4 # 1 extra M-time taken
+        param = utils.signed_8b(self.MMU.rb(self.registers.PC))
+        self.registers.PC += 1
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
+        if not utils.test_bit(self.registers.F, self.FLAG_Z):
+            self.registers.PC += param
+            self.registers.PC &= 0xFFFF
+            self.registers.M += 1 # 1 extra M-time taken
+            self.registers.T += 4 # 1 extra M-time taken
 
     # JR cc,n
     # If following condition is true then add n to current address and jump to it:
@@ -2257,15 +2236,15 @@ class Z80():
     #   cc = NC, Jump if C flag is reset.
     #   cc = C, Jump if C flag is set.
     def jrz(self):
-        param = utils.signed_8b(self.MMU.rb(self.registers['PC']))
-        self.registers['PC'] += 1
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
-        if utils.test_bit(self.registers['F'], self.FLAG_Z):
-            self.registers['PC'] += param
-            self.registers['PC'] &= 0xFFFF
-            self.registers['M'] += 1 # 1 extra M-time taken
-            self.registers['T'] += 4 # 1 extra M-time taken
+        param = utils.signed_8b(self.MMU.rb(self.registers.PC))
+        self.registers.PC += 1
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
+        if utils.test_bit(self.registers.F, self.FLAG_Z):
+            self.registers.PC += param
+            self.registers.PC &= 0xFFFF
+            self.registers.M += 1 # 1 extra M-time taken
+            self.registers.T += 4 # 1 extra M-time taken
 
     # JR cc,n
     # If following condition is true then add n to current address and jump to it:
@@ -2276,14 +2255,14 @@ class Z80():
     #   cc = NC, Jump if C flag is reset.
     #   cc = C, Jump if C flag is set.
     def jrnc(self):
-        param = self.MMU.rb(self.registers['PC'])
-        self.registers['PC'] += 1
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
-        if not utils.test_bit(self.registers['F'], self.FLAG_C):
-            self.registers['PC'] += param
-            self.registers['M'] += 1 # 1 extra M-time taken
-            self.registers['T'] += 4 # 1 extra M-time taken
+        param = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
+        if not utils.test_bit(self.registers.F, self.FLAG_C):
+            self.registers.PC += param
+            self.registers.M += 1 # 1 extra M-time taken
+            self.registers.T += 4 # 1 extra M-time taken
 
     # JR cc,n
     # If following condition is true then add n to current address and jump to it:
@@ -2294,38 +2273,38 @@ class Z80():
     #   cc = NC, Jump if C flag is reset.
     #   cc = C, Jump if C flag is set.
     def jrc(self):
-        param = utils.signed_8b(self.MMU.rb(self.registers['PC']))
-        self.registers['PC'] += 1
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 2 M-time taken
-        if utils.test_bit(self.registers['F'], self.FLAG_C):
-            self.registers['PC'] += param
-            self.registers['M'] += 1 # 1 extra M-time taken
-            self.registers['T'] += 4 # 1 extra M-time taken
+        param = utils.signed_8b(self.MMU.rb(self.registers.PC))
+        self.registers.PC += 1
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 2 M-time taken
+        if utils.test_bit(self.registers.F, self.FLAG_C):
+            self.registers.PC += param
+            self.registers.M += 1 # 1 extra M-time taken
+            self.registers.T += 4 # 1 extra M-time taken
 
     # JR n
     # Add n to current address and jump to it.
     # Use with:
     #   n = one byte signed immediate value
     def jrr8(self):
-        param = utils.signed_8b(self.MMU.rb(self.registers['PC']))
-        self.registers['PC'] += 1
-        self.registers['PC'] += param
-        self.registers['PC'] &= 0xFFFF
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        param = utils.signed_8b(self.MMU.rb(self.registers.PC))
+        self.registers.PC += 1
+        self.registers.PC += param
+        self.registers.PC &= 0xFFFF
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # JP nn
     # Jump to address nn
     # Use with:
     #   nn = two byte immediate value. (LS byte first.)
     def jpnn(self):
-        param = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.registers['PC'] = param
-        self.registers['PC'] &= 0xFFFF
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 12 M-time taken
+        param = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.registers.PC = param
+        self.registers.PC &= 0xFFFF
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 12 M-time taken
 
     # JP cc,nn
     # Jump to address n if following condition is true:
@@ -2336,52 +2315,52 @@ class Z80():
     # Use with:
     #   nn = two byte immediate value. (LS byte first.)
     def jpnznn(self):
-        param = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
-        if not utils.get_bit(self.registers['F'], self.FLAG_Z):
-            self.registers['PC'] = param
-            self.registers['M'] = 1 # 1 M-time taken
-            self.registers['T'] = 4 # 1 M-time taken
+        param = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
+        if not utils.get_bit(self.registers.F, self.FLAG_Z):
+            self.registers.PC = param
+            self.registers.M = 1 # 1 M-time taken
+            self.registers.T = 4 # 1 M-time taken
 
     def jpznn(self):
-        param = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
-        if utils.get_bit(self.registers['F'], self.FLAG_Z):
-            self.registers['PC'] = param
-            self.registers['M'] += 1 # 1 M-time taken
-            self.registers['T'] += 4 # 1 M-time taken
+        param = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
+        if utils.get_bit(self.registers.F, self.FLAG_Z):
+            self.registers.PC = param
+            self.registers.M += 1 # 1 M-time taken
+            self.registers.T += 4 # 1 M-time taken
 
     def jpncnn(self):
-        param = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
-        if not utils.get_bit(self.registers['F'], self.FLAG_C):
-            self.registers['PC'] = param
-            self.registers['M'] += 1 # 1 M-time taken
-            self.registers['T'] += 4 # 1 M-time taken
+        param = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
+        if not utils.get_bit(self.registers.F, self.FLAG_C):
+            self.registers.PC = param
+            self.registers.M += 1 # 1 M-time taken
+            self.registers.T += 4 # 1 M-time taken
 
     def jpcnn(self):
-        param = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
-        if utils.get_bit(self.registers['F'], self.FLAG_C):
-            self.registers['PC'] = param
-            self.registers['M'] += 1 # 1 M-time taken
-            self.registers['T'] += 4 # 1 M-time taken
+        param = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
+        if utils.get_bit(self.registers.F, self.FLAG_C):
+            self.registers.PC = param
+            self.registers.M += 1 # 1 M-time taken
+            self.registers.T += 4 # 1 M-time taken
 
     # JP (HL)
     # Jump to address contained in HL.
     def jphlm(self):
         param = self.rw_16b_register('H', 'L')
-        self.registers['PC'] = param
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.PC = param
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # DEC n
     # Decrement register n.
@@ -2390,7 +2369,7 @@ class Z80():
     # Flags affected:
     #   Z - Set if result is zero.
     #   N - Set.
-    #   H - Set if no borrow from bit 4.
+    #   H - Set if borrow from bit 4.
     #   C - Not affected.
     def deca(self):
         self.op_dec('A')
@@ -2442,42 +2421,41 @@ class Z80():
     # Flags affected:
     #   Z - Set if result is zero.
     #   N - Set.
-    #   H - Set if no borrow from bit 4.
+    #   H - Set if borrow from bit 4.
     #   C - Not affected.
     def cpa(self):
-        self.op_cp_an(self.registers['A'])
+        self.op_cp_an(self.registers.A)
 
     def cpb(self):
-        self.op_cp_an(self.registers['B'])
+        self.op_cp_an(self.registers.B)
 
     def cpc(self):
-        self.op_cp_an(self.registers['C'])
+        self.op_cp_an(self.registers.C)
 
     def cpd(self):
-        self.op_cp_an(self.registers['D'])
+        self.op_cp_an(self.registers.D)
 
     def cpe(self):
-        self.op_cp_an(self.registers['E'])
+        self.op_cp_an(self.registers.E)
 
     def cph(self):
-        self.op_cp_an(self.registers['H'])
+        self.op_cp_an(self.registers.H)
 
     def cpl(self):
-        self.op_cp_an(self.registers['L'])
+        self.op_cp_an(self.registers.L)
 
     def cphl(self):
-        value = self.MMU.rb(utils.bytes_to_16(self.registers['H'],
-            self.registers['L']))
+        value = self.MMU.rb(self.registers.HL)
         self.op_cp_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     def cpn(self):
-        value = self.MMU.rb(self.registers['PC'])
-        self.registers['PC'] += 1
+        value = self.MMU.rb(self.registers.PC)
+        self.registers.PC += 1
         self.op_cp_an(value)
-        self.registers['M'] = 2 # 2 M-time taken
-        self.registers['T'] = 8 # 8 M-time taken
+        self.registers.M = 2 # 2 M-time taken
+        self.registers.T = 8 # 8 M-time taken
 
     # RLC A
     # Rotate A left. Old bit 7 to Carry flag.
@@ -2488,8 +2466,8 @@ class Z80():
     #   C - Contains old bit 7 data
     def rlca(self):
         self.op_rlc_register('A')
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # RLC n
     # Rotate n left. Old bit 7 to Carry flag.
@@ -2523,8 +2501,8 @@ class Z80():
         value = self.rb_16b_register('H', 'L')
         value = self.op_rlc_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # RLA
     # Rotate A left through Carry flag.
@@ -2535,8 +2513,8 @@ class Z80():
     #   C - Contains old bit 7 data
     def rla(self):
         self.op_rla()
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # RL n
     # Rotate n left through Carry flag.
@@ -2570,8 +2548,8 @@ class Z80():
         value = self.rb_16b_register('H', 'L')
         value = self.op_rl_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # RRCA
     # Rotate A right. Old bit 0 to Carry flag.
@@ -2581,9 +2559,9 @@ class Z80():
     #   H - Reset.
     #   C -  Contains old bit 0 data
     def rrca(self):
-        self.op_rrc_register['A']
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.op_rrc_register('A')
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # RRC n
     # Rotate n right. Old bit 0 to Carry flag.
@@ -2594,32 +2572,32 @@ class Z80():
     #   H - Reset.
     #   C -  Contains old bit 0 data
     def rrcna(self):
-        self.op_rrc_register['A']
+        self.op_rrc_register('A')
 
     def rrcnb(self):
-        self.op_rrc_register['B']
+        self.op_rrc_register('B')
 
     def rrcnc(self):
-        self.op_rrc_register['C']
+        self.op_rrc_register('C')
 
     def rrcnd(self):
-        self.op_rrc_register['D']
+        self.op_rrc_register('D')
 
     def rrcne(self):
-        self.op_rrc_register['E']
+        self.op_rrc_register('E')
 
     def rrcnh(self):
-        self.op_rrc_register['H']
+        self.op_rrc_register('H')
 
     def rrcnl(self):
-        self.op_rrc_register['L']
+        self.op_rrc_register('L')
 
     def rrcnhl(self):
         value = self.rb_16b_register('H', 'L')
-        value = self.op_rl_common(value)
+        value = self.op_rrc_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # RRA
     # Rotate A right through Carry flag.
@@ -2629,9 +2607,9 @@ class Z80():
     #   H - Reset.
     #   C - Contains old bit 0 data.
     def rra(self):
-        self.op_rr_register['A']
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.op_rr_register('A')
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # RR n
     # Rotate n right through Carry flag.
@@ -2642,32 +2620,32 @@ class Z80():
     #   H - Reset.
     #   C - Contains old bit 0 data.
     def rrna(self):
-        self.op_rr_register['A']
+        self.op_rr_register('A')
 
     def rrnb(self):
-        self.op_rr_register['B']
+        self.op_rr_register('B')
 
     def rrnc(self):
-        self.op_rr_register['C']
+        self.op_rr_register('C')
 
     def rrnd(self):
-        self.op_rr_register['D']
+        self.op_rr_register('D')
 
     def rrne(self):
-        self.op_rr_register['E']
+        self.op_rr_register('E')
 
     def rrnh(self):
-        self.op_rr_register['H']
+        self.op_rr_register('H')
 
     def rrnl(self):
-        self.op_rr_register['L']
+        self.op_rr_register('L')
 
     def rrnhl(self):
         value = self.rb_16b_register('H', 'L')
         value = self.op_rr_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # SLA n
     # Shift n left into Carry. LSB of n set to 0.
@@ -2678,32 +2656,32 @@ class Z80():
     #   H - Reset.
     #   Contains old bit 7 data.
     def slaa(self):
-        self.op_sla_register['A']
+        self.op_sla_register('A')
 
     def slab(self):
-        self.op_sla_register['B']
+        self.op_sla_register('B')
 
     def slac(self):
-        self.op_sla_register['C']
+        self.op_sla_register('C')
 
     def slad(self):
-        self.op_sla_register['D']
+        self.op_sla_register('D')
 
     def slae(self):
-        self.op_sla_register['E']
+        self.op_sla_register('E')
 
     def slah(self):
-        self.op_sla_register['H']
+        self.op_sla_register('H')
 
     def slal(self):
-        self.op_sla_register['L']
+        self.op_sla_register('L')
 
     def slahl(self):
         value = self.rb_16b_register('H', 'L')
         value = self.op_sla_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # SRA n
     # Shift n right into Carry. MSB doesn't change.
@@ -2714,32 +2692,32 @@ class Z80():
     #   H - Reset.
     #   C - Contains old bit 0 data.
     def sraa(self):
-        self.op_sra_register['A']
+        self.op_sra_register('A')
 
     def srab(self):
-        self.op_sra_register['B']
+        self.op_sra_register('B')
 
     def srac(self):
-        self.op_sra_register['C']
+        self.op_sra_register('C')
 
     def srad(self):
-        self.op_sra_register['D']
+        self.op_sra_register('D')
 
     def srae(self):
-        self.op_sra_register['E']
+        self.op_sra_register('E')
 
     def srah(self):
-        self.op_sra_register['H']
+        self.op_sra_register('H')
 
     def sral(self):
-        self.op_sra_register['L']
+        self.op_sra_register('L')
 
     def srahl(self):
         value = self.rb_16b_register('H', 'L')
         value = self.op_sra_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # SRL n
     # Shift n right into Carry. MSB set to 0.
@@ -2750,44 +2728,44 @@ class Z80():
     #   H - Reset.
     #   C - Contains old bit 0 data.
     def srla(self):
-        self.op_srl_register['A']
+        self.op_srl_register('A')
 
     def srlb(self):
-        self.op_srl_register['B']
+        self.op_srl_register('B')
 
     def srlc(self):
-        self.op_srl_register['C']
+        self.op_srl_register('C')
 
     def srld(self):
-        self.op_srl_register['D']
+        self.op_srl_register('D')
 
     def srle(self):
-        self.op_srl_register['E']
+        self.op_srl_register('E')
 
     def srlh(self):
-        self.op_srl_register['H']
+        self.op_srl_register('H')
 
     def srll(self):
-        self.op_srl_register['L']
+        self.op_srl_register('L')
 
     def srlhl(self):
         value = self.rb_16b_register('H', 'L')
         value = self.op_srl_common(value)
         self.wb_16b_register('H', 'L', value)
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     # CALL nn
     # Push address of next instruction onto stack and then jump to address nn.
     # Use with:
     #   nn = two byte immediate value. (LS byte first.)
     def callnn(self):
-        addr = self.MMU.rw(self.registers['PC'])
-        self.registers['PC'] += 2
-        self.push_16b_on_stack(self.registers['PC']) # Push address of next instruction onto stack
-        self.registers['PC'] = addr # jump to address nn
-        self.registers['M'] = 3 # 3 M-time taken
-        self.registers['T'] = 12 # 3 M-time taken
+        addr = self.MMU.rw(self.registers.PC)
+        self.registers.PC += 2
+        self.push_16b_on_stack(self.registers.PC) # Push address of next instruction onto stack
+        self.registers.PC = addr # jump to address nn
+        self.registers.M = 3 # 3 M-time taken
+        self.registers.T = 12 # 3 M-time taken
 
     # CALL cc,nn
     # Call address n if following condition is true:
@@ -2798,44 +2776,44 @@ class Z80():
     # Use with:
     #   nn = two byte immediate value. (LS byte first.)
     def callnznn(self):
-        if not utils.get_bit(self.registers['F'], self.FLAG_Z):
+        if not utils.get_bit(self.registers.F, self.FLAG_Z):
             self.callnn()
-            self.registers['M'] = 6
-            self.registers['M'] = 24
+            self.registers.M = 6
+            self.registers.M = 24
         else:
-            self.registers['PC'] += 2
-            self.registers['M'] = 3
-            self.registers['T'] = 12
+            self.registers.PC += 2
+            self.registers.M = 3
+            self.registers.T = 12
 
     def callznn(self):
-        if utils.get_bit(self.registers['F'], self.FLAG_Z):
+        if utils.get_bit(self.registers.F, self.FLAG_Z):
             self.callnn()
-            self.registers['M'] = 6
-            self.registers['T'] = 24
+            self.registers.M = 6
+            self.registers.T = 24
         else:
-            self.registers['PC'] += 2
-            self.registers['M'] = 3
-            self.registers['T'] = 12
+            self.registers.PC += 2
+            self.registers.M = 3
+            self.registers.T = 12
 
     def callncnn(self):
-        if not utils.get_bit(self.registers['F'], self.FLAG_C):
+        if not utils.get_bit(self.registers.F, self.FLAG_C):
             self.callnn()
-            self.registers['M'] = 6
-            self.registers['T'] = 24
+            self.registers.M = 6
+            self.registers.T = 24
         else:
-            self.registers['PC'] += 2
-            self.registers['M'] = 3
-            self.registers['T'] = 12
+            self.registers.PC += 2
+            self.registers.M = 3
+            self.registers.T = 12
 
     def callcnn(self):
-        if utils.get_bit(self.registers['F'], self.FLAG_C):
+        if utils.get_bit(self.registers.F, self.FLAG_C):
             self.callnn()
-            self.registers['M'] = 6
-            self.registers['T'] = 24
+            self.registers.M = 6
+            self.registers.T = 24
         else:
-            self.registers['PC'] += 2
-            self.registers['M'] = 3
-            self.registers['T'] = 12
+            self.registers.PC += 2
+            self.registers.M = 3
+            self.registers.T = 12
 
     def rst00(self):
         self.op_rst(0x00)
@@ -2863,51 +2841,52 @@ class Z80():
 
     def ret(self):
         addr = self.pop_16b_from_stack()
-        self.registers['PC'] = addr
-        self.registers['M'] = 4 # 4 M-time taken
-        self.registers['T'] = 16 # 4 M-time taken
+        self.registers.PC = addr
+        self.registers.M = 4 # 4 M-time taken
+        self.registers.T = 16 # 4 M-time taken
 
     def retnz(self):
-        if not utils.get_bit(self.registers['F'], self.FLAG_Z):
+        if not utils.get_bit(self.registers.F, self.FLAG_Z):
             self.ret()
-            self.registers['M'] = 5 # 5 M-time taken
-            self.registers['T'] = 20 # 5 M-time taken
+            self.registers.M = 5 # 5 M-time taken
+            self.registers.T = 20 # 5 M-time taken
         else:
-            self.registers['M'] = 2 # 2 M-time taken
-            self.registers['T'] = 8 # 2 M-time taken
+            self.registers.M = 2 # 2 M-time taken
+            self.registers.T = 8 # 2 M-time taken
 
     def retz(self):
-        if utils.get_bit(self.registers['F'], self.FLAG_Z):
+        if utils.get_bit(self.registers.F, self.FLAG_Z):
             self.ret()
-            self.registers['M'] = 5 # 5 M-time taken
-            self.registers['T'] = 20 # 5 M-time taken
+            self.registers.M = 5 # 5 M-time taken
+            self.registers.T = 20 # 5 M-time taken
         else:
-            self.registers['M'] = 2 # 2 M-time taken
-            self.registers['T'] = 8 # 2 M-time taken
+            self.registers.M = 2 # 2 M-time taken
+            self.registers.T = 8 # 2 M-time taken
 
     def retnc(self):
-        if not utils.get_bit(self.registers['F'], self.FLAG_C):
+        if not utils.get_bit(self.registers.F, self.FLAG_C):
             self.ret()
-            self.registers['M'] = 5 # 5 M-time taken
-            self.registers['T'] = 20 # 5 M-time taken
+            self.registers.M = 5 # 5 M-time taken
+            self.registers.T = 20 # 5 M-time taken
         else:
-            self.registers['M'] = 2 # 2 M-time taken
-            self.registers['T'] = 8 # 2 M-time taken
+            self.registers.M = 2 # 2 M-time taken
+            self.registers.T = 8 # 2 M-time taken
 
     def retc(self):
-        if utils.get_bit(self.registers['F'], self.FLAG_C):
+        if utils.get_bit(self.registers.F, self.FLAG_C):
             self.ret()
-            self.registers['M'] = 5 # 5 M-time taken
-            self.registers['T'] = 20 # 5 M-time taken
+            self.registers.M = 5 # 5 M-time taken
+            self.registers.T = 20 # 5 M-time taken
         else:
-            self.registers['M'] = 2 # 2 M-time taken
-            self.registers['T'] = 8 # 2 M-time taken
+            self.registers.M = 2 # 2 M-time taken
+            self.registers.T = 8 # 2 M-time taken
 
     # RETI
-    # Pop two bytes from stack & jump to that address then enable interrupts.
+    # Pop two bytes from stack & jump to that address then enable interrupts
+    # (immediately, unlike EI).
     def reti(self):
         self.ret()
-        self.interrup_enabled = True
+        self.interrupts.enable()
 
     def swapa(self):
         self.op_swapn('A')
@@ -2944,13 +2923,13 @@ class Z80():
     #   H - Reset.
     #   C - Set or reset according to operation.
     def daa(self):
-        if self.registers['A'] == 0: #  Z - Set if register A is zero.
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_Z)
+        if self.registers.A == 0: #  Z - Set if register A is zero.
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_Z)
         else:
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_Z)
-        self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_H) # H - Reset.
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_Z)
+        self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_H) # H - Reset.
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # CPL
     # Complement A register. (Flip all bits.)
@@ -2960,11 +2939,11 @@ class Z80():
     #   H - Set.
     #   C - Not affected
     def cpl(self):
-        self.registers['A'] = utils.flip_bits_8b(self.registers['A'])
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) # N - Set.
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Set.
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.A = utils.flip_bits_8b(self.registers.A)
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_N) # N - Set.
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H) # H - Set.
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # CCF
     # Complement carry flag.
@@ -2976,14 +2955,14 @@ class Z80():
     #   H - Reset.
     #   C - Complemented.
     def ccf(self):
-        if utils.get_bit(self.registers['F'], self.FLAG_C): # C - Complemented.
-            self.registers['F'] = utils.reset_bit(self.registers['F'], self.FLAG_C)
+        if utils.get_bit(self.registers.F, self.FLAG_C): # C - Complemented.
+            self.registers.F = utils.reset_bit(self.registers.F, self.FLAG_C)
         else:
-            self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_C)
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Reset.
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+            self.registers.F = utils.set_bit(self.registers.F, self.FLAG_C)
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_N) # N - Reset.
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H) # H - Reset.
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # SCF
     # Set Carry flag.
@@ -2993,44 +2972,82 @@ class Z80():
     #   H - Reset.
     #   C - Set.
     def scf(self):
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_N) # N - Reset.
-        self.registers['F'] = utils.set_bit(self.registers['F'], self.FLAG_H) # H - Reset.
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_N) # N - Reset.
+        self.registers.F = utils.set_bit(self.registers.F, self.FLAG_H) # H - Reset.
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # STOP
     # Halt CPU & LCD display until button pressed.
+    # Like HALT, the CPU stays on the STOP instruction (running it again)
+    # and the clock skips forward to the next scheduled event (see
+    # halt_cycles), until a joypad input line goes low, see wake_stop().
+    # Only the CPU is stopped: the timer and LCD keep running.
     def stop(self):
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
+        if self.joypad.lines() != 0x0F: # A selected button is held, STOP ends at once
+            self.stop_mode = 0
+            self.registers.PC = (self.registers.PC + 1) & 0xFFFF
+            return
         self.stop_mode = 1
-        self.registers['PC'] += 1
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.PC -= 1
+        self.registers.M += self.halt_cycles() # + time stopped
+        self.registers.T = self.registers.M * 4
 
     # HALT
     # Power down CPU until an interrupt occurs. Use this
     # when ever possible to reduce energy consumption.
+    # Nothing runs while halted, so instead of executing idle cycles the
+    # clock skips forward to the next scheduled event (see halt_cycles).
+    # The CPU stays on the HALT instruction (running it again) until an
+    # interrupt is pending, see wake().
     def halt(self):
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
+        if self.interrupts.pending: # Already pending, HALT ends at once
+            return
         self.halt_mode = 1
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.registers.PC -= 1
+        self.registers.M += self.halt_cycles() # + time halted
+        self.registers.T = self.registers.M * 4
+
+    # An interrupt is pending: leave HALT, continuing after the instruction.
+    # The interrupt is serviced next if IME is set.
+    def wake(self):
+        self.halt_mode = 0
+        self.registers.PC = (self.registers.PC + 1) & 0xFFFF
+
+    # A button was pressed: leave STOP, continuing after the instruction
+    # (STOP is two bytes long)
+    def wake_stop(self):
+        self.stop_mode = 0
+        self.registers.PC = (self.registers.PC + 2) & 0xFFFF
+
+    # Cycles a HALT/STOP issued now lasts: until the next scheduled event,
+    # but not beyond the end of the current run_cycles() call. Outside
+    # run_cycles() (single stepping) nothing is skipped.
+    def halt_cycles(self):
+        end = min(self.scheduler.next_event, self.run_end)
+        cycles = max(end - (self.clock['M'] + 1), 0)
+        self.stats['halt_cycles'] += cycles
+        return cycles
 
     # DI
-    # This instruction disables interrupts but not
-    # immediately. Interrupts are disabled after
-    # instruction after DI is executed.
+    # This instruction disables interrupts immediately.
     def di(self):
-        self.interrup_enabled = 0
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.interrupts.disable()
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     # EI
     # Enable interrupts. This intruction enables interrupts
-    # immediately. Interrupts are enabled after
+    # but not immediately. Interrupts are enabled after
     # instruction after EI is executed.
     def ei(self):
-        self.interrup_enabled = 1
-        self.registers['M'] = 1 # 1 M-time taken
-        self.registers['T'] = 4 # 1 M-time taken
+        self.interrupts.enable_delayed()
+        self.registers.M = 1 # 1 M-time taken
+        self.registers.T = 4 # 1 M-time taken
 
     MAP = {
         0x00: nop,
@@ -3248,6 +3265,7 @@ class Z80():
         0xD6: sub_an,
         0xD7: rst10,
         0xD8: retc,
+        0xD9: reti,
         0xDA: jpcnn,
         0xDC: callcnn,
         0xDE: sbc_an,
@@ -3287,6 +3305,14 @@ class Z80():
         0x05: rlcl,
         0x06: rlchl,
         0x07: rlca,
+        0x08: rrcnb,
+        0x09: rrcnc,
+        0x0A: rrcnd,
+        0x0B: rrcne,
+        0x0C: rrcnh,
+        0x0D: rrcnl,
+        0x0E: rrcnhl,
+        0x0F: rrcna,
         0x10: rlnb,
         0x11: rlnc,
         0x12: rlnd,
@@ -3310,7 +3336,7 @@ class Z80():
         0x24: slah,
         0x25: slal,
         0x26: slahl,
-        0x27: sraa,
+        0x27: slaa,
         0x28: srab,
         0x29: srac,
         0x2A: srad,
@@ -3327,14 +3353,14 @@ class Z80():
         0x35: swapl,
         0x36: swaphlm,
         0x37: swapa,
-        0x38: srab,
-        0x39: srac,
-        0x3A: srad,
-        0x3B: srae,
-        0x3C: srah,
-        0x3D: sral,
-        0x3E: srahl,
-        0x3F: sraa,
+        0x38: srlb,
+        0x39: srlc,
+        0x3A: srld,
+        0x3B: srle,
+        0x3C: srlh,
+        0x3D: srll,
+        0x3E: srlhl,
+        0x3F: srla,
         0x40: bit0b,
         0x41: bit0c,
         0x42: bit0d,
@@ -3530,28 +3556,39 @@ class Z80():
     }
 
     def reset(self):
-        self.registers['A'] = 0
-        self.registers['B'] = 0
-        self.registers['C'] = 0
-        self.registers['D'] = 0
-        self.registers['E'] = 0
-        self.registers['H'] = 0
-        self.registers['L'] = 0
-        self.registers['F'] = 0
-
-        self.registers['SP'] = 0
-        self.registers['PC'] = 0 # Start execution at 0
-
+        self.registers.A = 0
+        self.registers.B = 0
+        self.registers.C = 0
+        self.registers.D = 0
+        self.registers.E = 0
+        self.registers.H = 0
+        self.registers.L = 0
+        self.registers.F = 0
+
+        self.registers.SP = 0
+        self.registers.PC = 0 # Start execution at 0
+
+        self.halt_mode = 0
+        self.stop_mode = 0
+        self.interrupts.reset()
+
+        self.scheduler.rebase(self.clock['M']) # Keep pending events in step with the clock
+        self.run_end = 0
         self.clock['M'] = 0
         self.clock['T'] = 0
+        self.timer.reset()
+        self.dma.reset()
+        self.joypad.reset()
+        self.serial.reset()
+        self.APU.reset()
 
     def dispatcher(self):
-        op = self.MMU.rb(self.registers['PC'])      # Fetch instruction
-        current_pc = self.registers['PC']
-        self.registers['PC'] += 1                   # Increment Program counter
+        op = self.MMU.rb(self.registers.PC)      # Fetch instruction
+        current_pc = self.registers.PC
+        self.registers.PC += 1                   # Increment Program counter
         if op == 0xCB:
-            op = self.MMU.rb(self.registers['PC'])  # Fetch CB instruction
-            self.registers['PC'] += 1               # Increment Program counter
+            op = self.MMU.rb(self.registers.PC)  # Fetch CB instruction
+            self.registers.PC += 1               # Increment Program counter
             self.CB_MAP[op](self)                   # Dispatch
             self.current_op = (0xCB << 8) + op
             self.current_op_name = self.CB_MAP[op].__name__
@@ -3559,13 +3596,145 @@ class Z80():
             self.MAP[op](self)                      # Dispatch
             self.current_op = op
             self.current_op_name = self.MAP[op].__name__
-        print(hex(current_pc), hex(op), self.current_op_name)
-        self.registers['PC'] &= 0xFFFF              # Mask PC to 16 bits
-        self.clock['T'] += self.registers['T']      # Add time to CPU clock
-        self.clock['M'] += self.registers['M']
-
-        frame_number = self.GPU.ppu_step()
-        return current_pc, op, frame_number
-
-    def load_rom(self, filename):
-        self.MMU.load(filename)
+        self.registers.PC &= 0xFFFF              # Mask PC to 16 bits
+        self.clock['T'] += self.registers.T      # Add time to CPU clock
+        self.clock['M'] += self.registers.M
+
+        if self.clock['M'] >= self.scheduler.next_event:
+            self.scheduler.run_due(self.clock['M'])
+        return current_pc, op, self.GPU.frame_number
+
+    # dispatcher() recording each instruction into the trace buffer
+    def dispatcher_traced(self):
+        pc = self.registers.PC
+        op = self.MMU.rb(pc)
+        if op == 0xCB:
+            op = (0xCB << 8) + self.MMU.rb((pc + 1) & 0xFFFF)
+        self.trace.record(pc, op, self.registers, self.clock['M'])
+        return Z80.dispatcher(self)
+
+    # Execute the basic block starting at PC, translating it on first use
+    # (see emulator.translator). Code that can't be translated is run
+    # through the interpreter one instruction at a time.
+    def execute_block(self):
+        block = self.translator.lookup(self.registers.PC)
+        if block is None:
+            return self.dispatcher()[2]
+        block(self, self.registers, self.clock, self.scheduler)
+        return self.GPU.frame_number
+
+    # Run for (at least) the given number of M-cycles. Returns one of the
+    # STOP_* reasons. The machine only stops between blocks, so the budget
+    # can be exceeded by the length of the last block run, and a breakpoint
+    # is checked before each block (blocks are cut at breakpoints).
+    def run_cycles(self, cycles, stop_on_frame=False):
+        registers = self.registers
+        clock = self.clock
+        GPU = self.GPU
+        scheduler = self.scheduler
+        lookup = self.translator.lookup
+        dispatcher = self.dispatcher
+        breakpoints = self.breakpoints
+        frame_number = GPU.frame_number
+        end = clock['M'] + cycles
+        self.run_end = end
+
+        try:
+            while clock['M'] < end:
+                block = lookup(registers.PC)
+                if block is None:
+                    dispatcher()
+                else:
+                    block(self, registers, clock, scheduler)
+                if stop_on_frame and GPU.frame_number != frame_number:
+                    return self.STOP_FRAME
+                if registers.PC in breakpoints:
+                    return self.STOP_BREAKPOINT
+            return self.STOP_CYCLES
+        finally: # HALT outside a run must not skip to this run's end
+            self.run_end = 0
+
+    # run_cycles() recording into the trace buffer. Blocks are not
+    # translated when tracing every instruction.
+    def run_cycles_traced(self, cycles, stop_on_frame=False):
+        registers = self.registers
+        clock = self.clock
+        GPU = self.GPU
+        scheduler = self.scheduler
+        lookup = self.translator.lookup
+        dispatcher = self.dispatcher_traced
+        record = self.trace.record
+        per_instruction = self.trace_level >= TRACE_INSTRUCTIONS
+        breakpoints = self.breakpoints
+        frame_number = GPU.frame_number
+        end = clock['M'] + cycles
+        self.run_end = end
+
+        try:
+            while clock['M'] < end:
+                block = None if per_instruction else lookup(registers.PC)
+                if block is None:
+                    dispatcher()
+                else:
+                    record(registers.PC, block.instructions[0][1], registers, clock['M'])
+                    block(self, registers, clock, scheduler)
+                if stop_on_frame and GPU.frame_number != frame_number:
+                    return self.STOP_FRAME
+                if registers.PC in breakpoints:
+                    return self.STOP_BREAKPOINT
+            return self.STOP_CYCLES
+        finally: # HALT outside a run must not skip to this run's end
+            self.run_end = 0
+
+    # Run until the current frame is completed. The frame length bounds the
+    # run when no frame is completed (e.g. LCD off).
+    def run_frame(self):
+        return self.run_cycles(self.FRAME_CYCLES, stop_on_frame=True)
+
+    # Called by a translated idle loop candidate (see emulator.translator)
+    # after an iteration that branched back to its start. entry are the
+    # registers, start the clock and next_event the scheduler's next event
+    # at the start of the iteration. If no event ran and the registers
+    # didn't change, the loop will spin unchanged until the next event, so
+    # the clock skips the whole iterations that would run before it
+    # (bounded by the end of the current run_cycles() call, as with HALT).
+    # Skipping whole iterations keeps the loop in the same phase with the
+    # events as when it is executed.
+    def idle_loop(self, block, entry, start, next_event):
+        registers = self.registers
+        clock = self.clock
+        now = clock['M']
+        if now >= next_event:
+            return
+        if entry != (registers.A, registers.F, registers.B, registers.C, registers.D, registers.E, registers.H, registers.L, registers.SP):
+            return
+        for read in block.idle_reads:
+            addr = 0xFF00 + registers.C if read == 'C' else getattr(registers, read)
+            if addr in IDLE_UNSAFE_READS:
+                return
+        period = now - start
+        cycles = (min(self.scheduler.next_event, self.run_end) - now) // period * period
+        if cycles <= 0:
+            return
+        clock['M'] += cycles
+        clock['T'] += cycles * 4
+        self.stats['idle_skips'] += 1
+        self.stats['idle_cycles'] += cycles
+        if clock['M'] >= self.scheduler.next_event:
+            self.scheduler.run_due(clock['M'])
+
+    def set_idle_skip(self, enabled):
+        self.idle_skip = enabled
+        self.translator.flush()
+
+    def add_breakpoint(self, addr):
+        self.breakpoints.add(addr)
+        self.translator.flush()
+
+    def remove_breakpoint(self, addr):
+        self.breakpoints.discard(addr)
+        self.translator.flush()
+
+    def load_rom(self, filename, save_path=None, save_interval=SAVE_INTERVAL):
+        self.MMU.load(filename, save_path, save_interval)
+        self.translator.flush()
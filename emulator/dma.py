@@ -0,0 +1,43 @@
+# OAM DMA
+# FF46  DMA     DMA Transfer and Start Address (R/W)
+#               Writing XX copies XX00-XX9F to OAM (FE00-FE9F)
+#
+# The hardware copies one byte per M-cycle for 160 cycles, during which
+# the CPU can't use OAM (games wait in HRAM meanwhile). Here the 160 bytes
+# are copied at once with a single slice assignment, and OAM is locked
+# until the 'dma' event marks the end of the transfer.
+DMA_LENGTH = 0xA0
+DMA_CYCLES = 160 # M-cycles
+
+class DMA():
+    active = False
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.reset()
+
+    def reset(self):
+        self.cpu.scheduler.cancel('dma')
+        if self.active:
+            self.finish(self.cpu.clock['M'])
+        self.source = 0
+
+    def map_io(self, mmu):
+        mmu.register_io(0xFF46, 'DMA', self.rb, self.wb)
+
+    def rb(self, addr):
+        return self.source
+
+    def wb(self, addr, value):
+        cpu = self.cpu
+        self.source = value
+        cpu.MMU.oam[:] = cpu.MMU.dma_source(value << 8, DMA_LENGTH)
+        cpu.GPU.reload_oam()
+
+        self.active = True
+        cpu.MMU.lock_oam(True)
+        cpu.scheduler.schedule('dma', cpu.clock['M'] + DMA_CYCLES, self.finish)
+
+    def finish(self, cycle):
+        self.active = False
+        self.cpu.MMU.lock_oam(False)
@@ -1,6 +1,6 @@
 from random import randint
-from emulator.graphics import Pixel
-from emulator import utils
+import numpy as np
+from emulator.interrupts import INT_VBLANK, INT_STAT
 
 # 160x144 LCD
 # 4 shades of gray
@@ -63,21 +63,102 @@ from emulator import utils
 #    0          V-Blank
 # FFFF  IE      Interrupt Enable (R/W)
 #    0          V-Blank
+# Bit-plane lookup table: the 8 pixel bits of a tile row byte, leftmost
+# pixel (bit 7) first. A tile row decodes to LUT[low] | (LUT[high] << 1).
+TILE_ROW_LUT = np.array([[(byte >> (7 - x)) & 1 for x in range(8)] for byte in range(256)], dtype=np.uint8)
+
+# Shades of gray as packed RGBA pixels (R in the lowest byte)
+SHADES = np.array([0x00FFFFFF,  # White
+                   0x00C0C0C0,  # Light gray
+                   0x00606060,  # Dark gray
+                   0x00000000], # Black
+                  dtype='<u4')
+
+# Palette register value -> packed RGBA pixel for each of the 4 colours
+#    6-7            Color for 11
+#    4-5            Color for 10
+#    2-3            Color for 01
+#    0-1            Color for 00
+PALETTE_LUT = SHADES[[[(value >> (i * 2)) & 0x3 for i in range(4)] for value in range(256)]]
+
+# Tile cache index of each tile number in the map, for each tile data
+# area (LCDC bit 4). 0x8000 numbers tiles 0-255; 0x8800 numbers them
+# -128-127 from 0x9000, which are tiles 256-383 then 128-255 of the cache.
+TILE_INDEX = (np.concatenate((np.arange(256, 384), np.arange(128, 256))),
+              np.arange(256))
+
+# Sprites (objects)
+# FE00-FE9F OAM     40 sprites x 4 bytes
+#    0              Y position + 16
+#    1              X position + 8
+#    2              Tile number (0x8000-0x8FFF, bit 0 ignored for 8x16)
+#    3              Flags
+#      7            Behind background colours 1-3
+#      6            Y flip
+#      5            X flip
+#      4            Palette (0: OBP0, 1: OBP1)
+# FF40 LCDC
+#    2              Sprite size (0: 8x8, 1: 8x16)
+# FF48 OBP0 Object palette 0 (R/W), colour 0 is transparent
+# FF49 OBP1 Object palette 1 (R/W)
+OAM_ENTRY = np.dtype([('y', np.uint8), ('x', np.uint8), ('tile', np.uint8), ('flags', np.uint8)])
+SPRITES_PER_LINE = 10
+
 class GPU():
 
     PIXEL_FIFO = []
-    TILE_SET = []
-    BG_PALETTE = []
+
+    # Decoded tiles (384 x 8 x 8 colour indexes), refreshed from VRAM for
+    # the tiles flagged in tile_dirty (one byte per tile) before use
+    tile_cache = None
+    tile_dirty = None
+    tiles_dirty = False
+    bgp = 0
+    bg_palette = None # Row of PALETTE_LUT for bgp
+    obp0 = 0
+    obp1 = 0
+    obj_palettes = None # Rows of PALETTE_LUT for obp0 and obp1
     SCRN = []
 
+    # OAM as a structured array of 40 entries (a view on MMU.oam). The
+    # sprites drawn on each line are worked out for the whole screen at
+    # once, only after OAM or the sprite size changed:
+    #   sprite_order    Sprite numbers in drawing priority (lowest X
+    #                   first, then lowest sprite number)
+    #   sprite_lines    144 x 40 flags, True where the sprite in that
+    #                   position of sprite_order is one of the (at most
+    #                   10) sprites of the line
+    oam = None
+    sprites_dirty = True
+    sprite_height = 8
+    sprite_order = None
+    sprite_lines = None
+
+    # LCD registers, and the render state derived from them when they are
+    # written (so scanlines never decode registers)
+    lcdc = 0
     lcd_display_enabled = 0
     window_enabled = 0
     obj_enabled = 0
     bg_enabled = 0
-    bg_map = 0
-    bg_tile = 0
+    bg_map_base = 0x1800     # VRAM offset of the background map
+    window_map_base = 0x1800 # VRAM offset of the window map
+    tile_index = None        # Row of TILE_INDEX for the tile data area
+    stat = 0                 # STAT interrupt enables (bits 3-6)
+    stat_line = False        # STAT interrupt line, requests on rising edges
+    lyc = 0
     scy = 0
     scx = 0
+    bg_tile_x = None         # Background map column of each pixel for scx
+    bg_pixel_x = None        # Column of each pixel in its tile for scx
+    wy = 0
+    wx = 0
+    window_x = -7            # Screen x of the window's first column (WX - 7)
+    window_start = 0         # First screen x covered by the window
+    window_tile_x = None     # Window map column of each pixel from window_start
+    window_pixel_x = None    # Column of each pixel in its tile from window_start
+    window_on = False        # Window enabled and inside the screen horizontally
+    window_line = 0          # Internal line counter: window lines drawn this frame
 
     MODE_HBLANK = 0
     MODE_VBLANK = 1
@@ -85,37 +166,77 @@ class GPU():
     MODE_PIXEL_TRANSFER = 3
     mode = MODE_OAM
 
-    modeclock = 0
+    # Length of each mode in M-cycles (VBlank: per line)
     MODE_TIMES = {
-        MODE_HBLANK: 20,
+        MODE_HBLANK: 51,
         MODE_VBLANK: 114,
-        MODE_OAM: 80,
+        MODE_OAM: 20,
         MODE_PIXEL_TRANSFER: 43
     }
 
     line = 0
     frame_number = 0
 
-    def __init__(self, cpu, window):
+    SCREEN_WIDTH = 160
+    SCREEN_HEIGHT = 144
+
+    # Screen x coordinate of each pixel in a scanline
+    SCREEN_X = np.arange(SCREEN_WIDTH)
+    SCREEN_Y = np.arange(SCREEN_HEIGHT)
+    BLANK_LINE = np.zeros(SCREEN_WIDTH, dtype=np.uint8)
+
+    # Framebuffer of packed RGBA pixels, one row per scanline. Rows are
+    # stored in the order the video sink wants them (see emulator.video):
+    # bottom row first for GL unless top_down. screen is a top-down view.
+    framebuffer = None
+    screen = None
+    top_down = True
+
+    # VRAM as a NumPy array (a view on MMU.vram, not a copy)
+    vram = None
+
+    def __init__(self, cpu, video):
         self.cpu = cpu
-        self.window = window
+        self.video = video
+        self.top_down = video.top_down
         self.reset()
 
     def reset(self):
+        self.cpu.scheduler.cancel('ppu')
+        self.lcdc = 0
         self.lcd_display_enabled = 0
         self.window_enabled = 0
         self.obj_enabled = 0
         self.bg_enabled = 0
+        self.bg_map_base = 0x1800
+        self.window_map_base = 0x1800
+        self.tile_index = TILE_INDEX[0]
+        self.stat = 0
+        self.stat_line = False
+        self.lyc = 0
         self.mode = self.MODE_OAM
-        self.bg_map = 0
-        self.bg_tile = 0
         self.scy = 0
-        self.scx = 0
+        self.wb_scx(0xFF43, 0)
+        self.wy = 0
+        self.wb_wx(0xFF4B, 0)
+        self.window_line = 0
         self.line = 0
-        self.TILE_SET = [[[0,0,0,0,0,0,0,0] for x in range(8)] for y in range(384)] # 384 x (8x8)
-        self.BG_PALETTE = [Pixel(255, 255, 255, 0) for _ in range(0, 4)]
+        self.tile_cache = np.zeros((384, 8, 8), dtype=np.uint8)
+        self.bgp = 0
+        self.bg_palette = PALETTE_LUT[0]
+        self.obp0 = 0
+        self.obp1 = 0
+        self.obj_palettes = PALETTE_LUT[[0, 0]]
+        self.oam = np.frombuffer(self.cpu.MMU.oam, dtype=OAM_ENTRY)
+        self.sprite_height = 8
+        self.sprites_dirty = True
         self.PIXEL_FIFO = []
         self.SCRN = [255] * 4 * 160 * 144
+        self.framebuffer = np.full((self.SCREEN_HEIGHT, self.SCREEN_WIDTH), SHADES[0], dtype='<u4')
+        self.screen = self.framebuffer if self.top_down else self.framebuffer[::-1]
+        self.vram = np.frombuffer(self.cpu.MMU.vram, dtype=np.uint8)
+        self.tile_dirty = bytearray(b'\x01' * 384)
+        self.tiles_dirty = True
 
     def get_tile_from_addr(self, addr):
         tile = (addr >> 4) & 0x1FF
@@ -125,76 +246,189 @@ class GPU():
         row = (addr >> 1) & 0x07
         return row
 
-    def wb(self, addr, value):
-        if addr == 0xFF40:  # LCD Control
-            self.bg_enabled = utils.get_bit(value, 0)
-            self.bg_map = utils.get_bit(value, 3)
-            self.bg_tile = utils.get_bit(value, 4)
-            self.lcd_display_enabled = utils.get_bit(value, 7)
-            print("BG Enabled", self.bg_enabled)
-        elif addr == 0xFF42: # Scroll Y
-            self.scy = value
-        elif addr == 0xFF43: # Scroll X
-            self.scx = value
-        elif addr == 0xFF47: # Background palette mapping
-            for i in range(0, 4):
-                # Background palettes
-                # 0xFF47    BGP     BG Palette (R/W)
-                #    6-7            Color for 11
-                #    4-5            Color for 10
-                #    2-3            Color for 01
-                #    0-1            Color for 00
-                colour = (value >> (i * 2)) & 0x3
-                #print(colour)
-                if colour == 0:
-                    self.BG_PALETTE[i] = Pixel(255, 255, 255, 0)
-                elif colour == 1:
-                    self.BG_PALETTE[i] = Pixel(192, 192, 192, 0)
-                elif colour == 2:
-                    self.BG_PALETTE[i] = Pixel(96, 96, 96, 0)
-                elif colour == 3:
-                    self.BG_PALETTE[i] = Pixel(0, 0, 0, 0)
-
-    def rb(self, addr):
-        if addr == 0xFF40:  # LCD Control
-            value = 0x00
-            value = utils.set_bit(value, 0, self.bg_enabled)
-            value = utils.set_bit(value, 3, self.bg_map)
-            value = utils.set_bit(value, 4, self.bg_tile)
-            value = utils.set_bit(value, 7, self.lcd_display_enabled)
-            return value
-        elif addr == 0xFF42: # Scroll Y
-            return self.scy
-        elif addr == 0xFF43: # Scroll X
-            return self.scx
-        elif addr == 0xFF44: # Current line
-            return self.line
+    # FF40  LCDC    LCD Control (R/W)
+    #    7          LCD Display Enable
+    #    6          Window Tile Map (0: 9800-9BFF, 1: 9C00-9FFF)
+    #    5          Window Enable
+    #    4          BG & Window Tile Data (0: 8800-97FF signed, 1: 8000-8FFF)
+    #    3          BG Tile Map (0: 9800-9BFF, 1: 9C00-9FFF)
+    #    2          OBJ Size (0: 8x8, 1: 8x16)
+    #    1          OBJ Enable
+    #    0          BG & Window Enable
+    # FF41  STAT    LCDC Status (R/W)
+    #    6          LYC=LY Interrupt
+    #    5          Mode 2 OAM Interrupt
+    #    4          Mode 1 V-Blank Interrupt
+    #    3          Mode 0 H-Blank Interrupt
+    #    2          LYC=LY Flag (R)
+    #  1-0          Mode (R)
+    # FF45  LYC     LY Compare (R/W)
+    # FF4A  WY      Window Y Position (R/W)
+    # FF4B  WX      Window X Position + 7 (R/W)
+    def map_io(self, mmu):
+        mmu.register_io(0xFF40, 'LCDC', self.rb_lcdc, self.wb_lcdc)
+        mmu.register_io(0xFF41, 'STAT', self.rb_stat, self.wb_stat)
+        mmu.register_io(0xFF42, 'SCY', self.rb_scy, self.wb_scy)
+        mmu.register_io(0xFF43, 'SCX', self.rb_scx, self.wb_scx)
+        mmu.register_io(0xFF44, 'LY', self.rb_ly, mmu.wb_ignore)
+        mmu.register_io(0xFF45, 'LYC', self.rb_lyc, self.wb_lyc)
+        mmu.register_io(0xFF47, 'BGP', self.rb_bgp, self.wb_bgp)
+        mmu.register_io(0xFF48, 'OBP0', self.rb_obp0, self.wb_obp0)
+        mmu.register_io(0xFF49, 'OBP1', self.rb_obp1, self.wb_obp1)
+        mmu.register_io(0xFF4A, 'WY', self.rb_wy, self.wb_wy)
+        mmu.register_io(0xFF4B, 'WX', self.rb_wx, self.wb_wx)
+
+    # LCD Control. Only the state depending on the bits that changed is
+    # worked out again.
+    def rb_lcdc(self, addr):
+        return self.lcdc
+
+    def wb_lcdc(self, addr, value):
+        changed = self.lcdc ^ value
+        self.lcdc = value
+        self.bg_enabled = value & 0x01
+        self.obj_enabled = value & 0x02
+        self.window_enabled = value & 0x20
+        self.update_window()
+        if changed & 0x04: # Sprite size, the sprites of each line change
+            self.sprite_height = 16 if value & 0x04 else 8
+            self.sprites_dirty = True
+        if changed & 0x08:
+            self.bg_map_base = 0x1C00 if value & 0x08 else 0x1800
+        if changed & 0x10:
+            self.tile_index = TILE_INDEX[(value >> 4) & 1]
+        if changed & 0x40:
+            self.window_map_base = 0x1C00 if value & 0x40 else 0x1800
+        if changed & 0x80:
+            if value & 0x80:
+                self.lcd_on()
+            else:
+                self.lcd_off()
+        self.lcd_display_enabled = value >> 7
+
+    # LCD Status
+    def rb_stat(self, addr):
+        value = 0x80 | self.stat | self.mode
+        if self.line == self.lyc:
+            value |= 0x04
+        return value
+
+    def wb_stat(self, addr, value):
+        self.stat = value & 0x78
+        self.update_stat()
+
+    # Request a STAT interrupt when one of its enabled conditions starts to
+    # hold. While one holds, the others don't request another one.
+    def update_stat(self):
+        stat = self.stat
+        mode = self.mode
+        line = bool((stat & 0x40 and self.line == self.lyc) or
+                    (stat & 0x08 and mode == self.MODE_HBLANK) or
+                    (stat & 0x10 and mode == self.MODE_VBLANK) or
+                    (stat & 0x20 and mode == self.MODE_OAM))
+        if line and not self.stat_line and self.lcd_display_enabled:
+            self.cpu.interrupts.request(INT_STAT)
+        self.stat_line = line
+
+    # LY Compare
+    def rb_lyc(self, addr):
+        return self.lyc
+
+    def wb_lyc(self, addr, value):
+        self.lyc = value
+        self.update_stat()
+
+    # Window position
+    def rb_wy(self, addr):
+        return self.wy
+
+    def wb_wy(self, addr, value):
+        self.wy = value
+
+    def rb_wx(self, addr):
+        return self.wx
+
+    def wb_wx(self, addr, value):
+        self.wx = value
+        self.window_x = value - 7
+        self.window_start = max(self.window_x, 0)
+        x = np.arange(self.window_start, self.SCREEN_WIDTH) - self.window_x
+        self.window_tile_x = x >> 3
+        self.window_pixel_x = x & 7
+        self.update_window()
+
+    # The window is drawn on the lines from WY down while this holds
+    def update_window(self):
+        self.window_on = bool(self.window_enabled and self.bg_enabled and
+                              self.window_start < self.SCREEN_WIDTH)
+
+    # Scroll Y
+    def rb_scy(self, addr):
+        return self.scy
+
+    def wb_scy(self, addr, value):
+        self.scy = value
+
+    # Scroll X
+    def rb_scx(self, addr):
+        return self.scx
+
+    def wb_scx(self, addr, value):
+        self.scx = value
+        x = (self.SCREEN_X + value) & 0xFF
+        self.bg_tile_x = x >> 3
+        self.bg_pixel_x = x & 7
+
+    # Current line
+    def rb_ly(self, addr):
+        return self.line
+
+    # Background palette mapping
+    def rb_bgp(self, addr):
+        return self.bgp
+
+    def wb_bgp(self, addr, value):
+        self.bgp = value
+        self.bg_palette = PALETTE_LUT[value]
+
+    # Object palettes
+    def rb_obp0(self, addr):
+        return self.obp0
+
+    def wb_obp0(self, addr, value):
+        self.obp0 = value
+        self.obj_palettes = PALETTE_LUT[[self.obp0, self.obp1]]
+
+    def rb_obp1(self, addr):
+        return self.obp1
+
+    def wb_obp1(self, addr, value):
+        self.obp1 = value
+        self.obj_palettes = PALETTE_LUT[[self.obp0, self.obp1]]
 
     # addr is base address of VRAM
+    # Only flags the tile, it is decoded by decode_tiles() when next used
     def update_tile(self, addr, value):
         if addr > 0x97FF:
             return
-        # Work out which tile and row was updated
-        base_addr = addr & 0x1FFE
-        tile = self.get_tile_from_addr(base_addr)
-        row = self.get_row_from_addr(base_addr)
+        self.tile_dirty[(addr >> 4) & 0x1FF] = 1
+        self.tiles_dirty = True
 
-        for x in range(0, 8):
-            # Find bit index for this pixel
-            sx = 7-x
+    # OAM was written (the value is already in MMU.oam)
+    def update_oam(self, addr, value):
+        self.sprites_dirty = True
 
-            if utils.get_bit(self.cpu.MMU.vram[base_addr], sx):
-                value_a = 1
-            else:
-                value_a = 0
+    # OAM was replaced as a whole (OAM DMA)
+    def reload_oam(self):
+        self.sprites_dirty = True
 
-            if utils.get_bit(self.cpu.MMU.vram[base_addr+1], sx):
-                value_b = 2
-            else:
-                value_b = 0
-
-            # Update tile set
-            self.TILE_SET[tile][row][x] = value_a + value_b
+    # Decode the tiles written since they were last decoded
+    def decode_tiles(self):
+        dirty = np.flatnonzero(np.frombuffer(self.tile_dirty, dtype=np.uint8))
+        rows = self.vram[:0x1800].reshape(384, 8, 2)[dirty]
+        self.tile_cache[dirty] = TILE_ROW_LUT[rows[:, :, 0]] | (TILE_ROW_LUT[rows[:, :, 1]] << 1)
+        self.tile_dirty[:] = bytes(384)
+        self.tiles_dirty = False
 
     # Fetch
     # 3 clocks to fetch 8 pixels
@@ -232,65 +466,88 @@ class GPU():
     # VRAM Access is OK
     # OAM Access is BAD
     def oam_search(self):
-        pass
+        if self.sprites_dirty:
+            self.build_sprite_index()
+
+    # Work out the sprites of every line from OAM
+    def build_sprite_index(self):
+        top = self.oam['y'].astype(np.intp) - 16
+        lines = self.SCREEN_Y[:, None]
+        visible = (lines >= top) & (lines < top + self.sprite_height)
+        # Only the first 10 sprites (in OAM order) of each line are drawn
+        visible &= np.cumsum(visible, axis=1) <= SPRITES_PER_LINE
+
+        self.sprite_order = np.lexsort((np.arange(40), self.oam['x']))
+        self.sprite_lines = visible[:, self.sprite_order]
+        self.sprites_dirty = False
 
     # VRAM Access is BAD
     # OAM Access is BAD
     # 43 cycles
+    # The whole scanline is rendered at once with NumPy gathers:
+    # background map -> tile numbers -> decoded tiles -> packed RGBA
     def pixel_transfer(self):
-	    # VRAM offset for the tile map
-        # Tile map 0 or 1
-        if self.bg_map:
-            mapoffs = 0x9C00
-        else:
-            mapoffs = 0x9800
-
-	    # Which line of tiles to use in the map
-        #mapoffs += ((self.line + self.scy) & 0xFF) >> 3
-        mapoffs += (self.line // 8) * 0x20
-
-        # Which tile to start with in the map line
-        lineoffs = (self.scx >> 3)
-        #lineoffs = 0x00
-
-        # Which line of pixels to use in the tiles
-        y = (self.line + self.scy) & 7
-        #y = self.line % 8
-
-        # Where in the tileline to start
-        #x = self.scx & 7
-        x = 0
-
-        # Read tile index from the background map
-        base_addr = (mapoffs + lineoffs)
-        addr = (mapoffs + lineoffs) & 0x1FFF
-        tile = self.cpu.MMU.vram[addr]
-
-        # If the tile data set in use is #1, the
-        # indices are signed; calculate a real tile offset
-        #if self.bg_tile == 1 and tile < 128:
-        #    tile += 256
-
-        for i in range(0, 160):
-            # Re-map the tile pixel through the palette
-            colour = self.BG_PALETTE[self.TILE_SET[tile][y][x]]
-
-            # Plot the pixel to canvas
-            #print(tile, y, x, colour)
-            #print("Canvas", hex(base_addr), tile, i, self.line, x, y)
-            if self.window:
-                self.window.frame.set_pixel(i, self.line, colour)
-
-            # When this tile ends, read another
-            x += 1
-            if x == 8:
-                x = 0
-                lineoffs = (lineoffs + 1) & 0x1F
-                base_addr = (mapoffs + lineoffs)
-                addr = (mapoffs + lineoffs) & 0x1FFF
-                tile = self.cpu.MMU.vram[addr]
-                #if self.bg_tile == 1 and tile < 128:
-                #    tile += 256
+        if self.tiles_dirty:
+            self.decode_tiles()
+
+        if self.bg_enabled:
+            # Background line of this scanline, read from the background
+            # map and mapped to tile cache indexes
+            y = (self.line + self.scy) & 0xFF
+            tile = self.tile_index[self.vram[self.bg_map_base + (y >> 3) * 32 + self.bg_tile_x]]
+            colour = self.tile_cache[tile, y & 7, self.bg_pixel_x]
+
+            # The window covers the background from window_start to the
+            # right edge. Its lines are counted separately, so it carries
+            # on where it left off when it was hidden for some lines.
+            if self.window_on and self.line >= self.wy:
+                y = self.window_line
+                tile = self.tile_index[self.vram[self.window_map_base + (y >> 3) * 32 + self.window_tile_x]]
+                colour[self.window_start:] = self.tile_cache[tile, y & 7, self.window_pixel_x]
+                self.window_line += 1
+        else: # Background and window blank, sprites are still drawn
+            colour = self.BLANK_LINE
+
+        # Re-map the tile pixels through the palette
+        pixels = self.bg_palette[colour]
+        if self.obj_enabled:
+            self.draw_sprites(pixels, colour)
+        self.screen[self.line] = pixels
+
+    # Draw the sprites of the current line over the background line. All
+    # sprites of the line are laid out in one (sprites x pixels) array and
+    # each pixel takes the first opaque sprite in priority order.
+    def draw_sprites(self, pixels, bg_colour):
+        if self.sprites_dirty:
+            self.build_sprite_index()
+        numbers = self.sprite_order[self.sprite_lines[self.line]]
+        if not len(numbers):
+            return
+        sprites = self.oam[numbers]
+        flags = sprites['flags']
+
+        # Row of each sprite drawn on this line
+        row = self.line - (sprites['y'].astype(np.intp) - 16)
+        row = np.where(flags & 0x40, self.sprite_height - 1 - row, row)
+        tile = sprites['tile'].astype(np.intp)
+        if self.sprite_height == 16:
+            tile = (tile & 0xFE) + (row >> 3)
+        colour = self.tile_cache[tile, row & 7]
+        colour = np.where((flags & 0x20)[:, None] != 0, colour[:, ::-1], colour)
+
+        # Sprite pixels at screen x + 8 (sprites can be partly off screen)
+        count = len(numbers)
+        layer = np.zeros((count, 256 + 8), dtype=np.uint8)
+        layer[np.arange(count)[:, None], sprites['x'].astype(np.intp)[:, None] + np.arange(8)] = colour
+        layer = layer[:, 8:8 + self.SCREEN_WIDTH]
+
+        opaque = layer != 0
+        front = opaque.argmax(axis=0) # First opaque sprite of each pixel
+        colour = layer[front, self.SCREEN_X]
+        front_flags = flags[front]
+        shown = (colour != 0) & (((front_flags & 0x80) == 0) | (bg_colour == 0))
+        palette = (front_flags >> 4) & 1
+        pixels[shown] = self.obj_palettes[palette[shown], colour[shown]]
 
     # VRAM Access is OK
     # OAM Access is OK
@@ -305,17 +562,10 @@ class GPU():
     def vblank(self):
         pass
 
-    def is_in_mode(self, mode):
-        if self.mode == mode and self.modeclock >= self.MODE_TIMES[mode]:
-            return True
-        else:
-            return False
-
     def write_canvas(self):
         #self.write_background_tiles(26)
         #self.write_tile_map()
-        if self.window:
-            self.window.frame.sync()
+        self.video.present(self.framebuffer)
 
     def write_tile_map(self):
         init_address = 0x9800
@@ -327,16 +577,13 @@ class GPU():
                 base_addr = init_address + (0x20 * x) + y
                 addr = base_addr & 0x1FFF
                 tile_number = self.cpu.MMU.vram[addr]
-                print(hex(base_addr), hex(self.cpu.MMU.vram[addr]))
                 self.write_tile(tile_number, x_frame_begin, y_frame_begin)
 
     def write_tile(self, tile_number, x_screen, y_screen):
-        tile = self.TILE_SET[tile_number]
-        for x in range(0, 8):
-            for y in range(0, 8):
-                colour = self.BG_PALETTE[tile[y][x]]
-                if self.window:
-                    self.window.frame.set_pixel(x+x_screen, y+y_screen, colour)
+        if self.tiles_dirty:
+            self.decode_tiles()
+        tile = self.tile_cache[tile_number]
+        self.screen[y_screen:y_screen+8, x_screen:x_screen+8] = self.bg_palette[tile]
 
     def write_background_tiles(self, max_number):
         for i in range(0, max_number):
@@ -344,36 +591,50 @@ class GPU():
             y_frame_begin = ((i * 8) // 160) * 8
             self.write_tile(i, x_frame_begin, y_frame_begin)
 
-    def ppu_step(self):
-        self.modeclock += self.cpu.clock['M']
+    # The PPU only runs while the LCD is on. It starts at line 0 and each
+    # mode change is an event in the CPU scheduler (see emulator.scheduler).
+    def lcd_on(self):
+        self.line = 0
+        self.window_line = 0
+        self.mode = self.MODE_OAM
+        self.lcd_display_enabled = 1
+        self.update_stat()
+        self.cpu.scheduler.schedule('ppu', self.cpu.clock['M'] + self.MODE_TIMES[self.MODE_OAM], self.ppu_event)
+
+    def lcd_off(self):
+        self.cpu.scheduler.cancel('ppu')
+        self.line = 0
+        self.mode = self.MODE_HBLANK
+        self.stat_line = False
 
-        if self.is_in_mode(self.MODE_OAM):
-            self.modeclock = 0
+    # End of the current mode, cycle is when it was due
+    def ppu_event(self, cycle):
+        if self.mode == self.MODE_OAM:
             self.mode = self.MODE_PIXEL_TRANSFER
             self.oam_search()
-        elif self.is_in_mode(self.MODE_PIXEL_TRANSFER):
-            self.modeclock = 0
+        elif self.mode == self.MODE_PIXEL_TRANSFER:
             self.mode = self.MODE_HBLANK
             # Write a scanline to the framebuffer
             self.pixel_transfer()
-        elif self.is_in_mode(self.MODE_HBLANK):
-            self.modeclock = 0
+        elif self.mode == self.MODE_HBLANK:
             self.line += 1
-            if self.line == 143: # Enter VBlank
+            if self.line == self.SCREEN_HEIGHT: # Enter VBlank
                 self.mode = self.MODE_VBLANK
                 # Push the screen data to canvas
                 self.write_canvas()
+                self.cpu.interrupts.request(INT_VBLANK)
             else: # Go to next line
                 self.mode = self.MODE_OAM
-        elif self.is_in_mode(self.MODE_VBLANK): # 10 lines
-            self.modeclock = 0
+        else: # VBlank, 10 lines
             self.line += 1
             self.vblank()
 
             # Restart scanning modes
-            if self.line == 153:
+            if self.line == 154:
                 self.mode = self.MODE_OAM
                 self.line = 0
+                self.window_line = 0
                 self.frame_number += 1
 
-        return self.frame_number
+        self.update_stat()
+        self.cpu.scheduler.schedule('ppu', cycle + self.MODE_TIMES[self.mode], self.ppu_event)
@@ -3,77 +3,64 @@ from pyglet.window import key
 from pyglet.gl import *
 
 
-class Pixel():
-    def __init__(self, r, g, b, a):
-        self.r = r
-        self.g = g
-        self.b = b
-        self.a = a
-
-    def __str__(self):
-        return "{}, {}, {}, {}".format(self.r, self.g, self.b, self.a)
-
-    def __repr__(self):
-        return self.__str__()
-
-    def to_list(self):
-        return [self.r, self.g, self.b, self.a]
-
+# Persistent texture the emulator framebuffer is uploaded to.
+# The framebuffer (height x width packed RGBA pixels) is passed to
+# glTexSubImage2D straight from its memory, without intermediate copies.
+# GL expects the bottom row first; with top_down the rows are stored
+# top row first instead and the texture is flipped when drawn.
 class Frame():
-    data = []
-
-    def __init__(self, width, height):
-        self.image = pyglet.image.SolidColorImagePattern((255,255,255,255)).create_image(width, height)
-        self.width = self.image.width
-        self.height = self.image.height
-        self.data = self.image.get_data('RGBA', self.width * 4)
-        self.data = bytearray(self.data)
-
-    def get_position(self, x, y):
-        y = self.height - 1 - y # Convert to top
-        return (x * 4 + self.width * 4 * y)
-
-    def get_pixel(self, x, y):
-        position = self.get_position(x, y)
-        pixel = Pixel(self.data[position], self.data[position+1], self.data[position]+2, self.data[position+3])
-        return pixel
-
-    def set_pixel(self, x, y, pixel):
-        position = self.get_position(x, y)
-        self.data[position] = pixel.r
-        self.data[position+1] = pixel.g
-        self.data[position+2] = pixel.b
-        self.data[position+3] = pixel.a
+    def __init__(self, width, height, top_down=False):
+        self.width = width
+        self.height = height
+        self.top_down = top_down
+        self.texture = pyglet.image.Texture.create(width, height, min_filter=GL_NEAREST, mag_filter=GL_NEAREST)
+        if top_down:
+            self.image = self.texture.get_transform(flip_y=True)
+        else:
+            self.image = self.texture
+
+    def sync(self, framebuffer):
+        glBindTexture(self.texture.target, self.texture.id)
+        glTexSubImage2D(self.texture.target, 0, 0, 0, self.width, self.height,
+                        GL_RGBA, GL_UNSIGNED_BYTE, framebuffer.ctypes.data)
 
-    def fill(self, pixel):
-        self.data = pixel.to_list() * self.width * self.height
-
-    def fill_column(self, x, pixel):
-        for j in range(self.height):
-            self.set_pixel(x, j, pixel)
-
-    def fill_row(self, y, pixel):
-        for i in range(self.width):
-            self.set_pixel(i, y, pixel)
+    def draw(self):
+        self.image.blit(self.image.anchor_x, self.image.anchor_y)
 
-    def sync(self):
-        self.image.set_data('RGBA', self.width * 4, bytes(self.data))
 
-    def draw(self):
-        self.image.blit(0, 0)
+# Keyboard key of each joypad button (see emulator.joypad)
+KEYS = {
+    key.Z: 'a',
+    key.X: 'b',
+    key.LEFT: 'left',
+    key.RIGHT: 'right',
+    key.UP: 'up',
+    key.DOWN: 'down',
+    key.ENTER: 'start',
+    key.BACKSPACE: 'select',
+}
 
 
+# Video sink (see emulator.video) drawing frames in a pyglet window
 class Window(pyglet.window.Window):
-    def __init__(self, caption_text, show_fps=False):
+    def __init__(self, caption_text, show_fps=False, top_down=False, joypad=None):
         width = 160
-        height = 140
+        height = 144
         super(Window, self).__init__(width=width, height=height, style=pyglet.window.Window.WINDOW_STYLE_DIALOG, vsync=False)
         self.set_visible()
         self.set_caption(caption_text)
         self.show_fps = show_fps
         if self.show_fps:
             self.fps_display = pyglet.clock.ClockDisplay()
-        self.frame = Frame(width, height)
+        self.frame = Frame(width, height, top_down)
+        self.joypad = joypad # Key presses go to the emulated joypad
+
+    @property
+    def top_down(self):
+        return self.frame.top_down
+
+    def present(self, framebuffer):
+        self.frame.sync(framebuffer)
 
     def on_draw(self):
         self.clear()
@@ -82,19 +69,9 @@ class Window(pyglet.window.Window):
             self.fps_display.draw()
 
     def on_key_press(self, symbol, modifiers):
-        if symbol == key.Z:
-            print('The "A" key was pressed.')
-        if symbol == key.X:
-            print('The "B" key was pressed.')
-        elif symbol == key.LEFT:
-            print('The left arrow key was pressed.')
-        elif symbol == key.RIGHT:
-            print('The right arrow key was pressed.')
-        elif symbol == key.UP:
-            print('The up arrow key was pressed.')
-        elif symbol == key.DOWN:
-            print('The down arrow key was pressed.')
-        elif symbol == key.ENTER:
-            print('The enter key was pressed.')
-        elif symbol == key.BACKSPACE:
-            print('The select key was pressed.')
+        if self.joypad is not None and symbol in KEYS:
+            self.joypad.press(KEYS[symbol])
+
+    def on_key_release(self, symbol, modifiers):
+        if self.joypad is not None and symbol in KEYS:
+            self.joypad.release(KEYS[symbol])
@@ -0,0 +1,111 @@
+# Interrupt controller
+# FF0F  IF      Interrupt Flag (R/W)
+# FFFF  IE      Interrupt Enable (R/W)
+#    4          Joypad
+#    3          Serial
+#    2          Timer
+#    1          LCD STAT
+#    0          V-Blank
+# IME (Interrupt Master Enable) is set by EI (after the next instruction)
+# and RETI, and cleared by DI and when an interrupt is serviced.
+#
+# pending (IF & IE) and active (pending, or 0 while IME is off) are cached
+# and only recomputed when IF, IE or IME change. When an interrupt becomes
+# active it is scheduled as the 'interrupt' event at the current cycle, so
+# the CPU loop services it through its usual scheduler check and pays
+# nothing per instruction for interrupts.
+INT_VBLANK = 0x01
+INT_STAT = 0x02
+INT_TIMER = 0x04
+INT_SERIAL = 0x08
+INT_JOYPAD = 0x10
+
+# Address jumped to for each interrupt, highest priority (lowest bit) first
+VECTORS = {
+    INT_VBLANK: 0x40,
+    INT_STAT: 0x48,
+    INT_TIMER: 0x50,
+    INT_SERIAL: 0x58,
+    INT_JOYPAD: 0x60,
+}
+
+class Interrupts():
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.reset()
+
+    def reset(self):
+        self.cpu.scheduler.cancel('interrupt')
+        self.cpu.scheduler.cancel('ei')
+        self.IF = 0
+        self.IE = 0
+        self.ime = 0
+        self.pending = 0
+        self.active = 0
+
+    # IE (FFFF) is outside the I/O register range and is read and written
+    # by the MMU directly
+    def map_io(self, mmu):
+        mmu.register_io(0xFF0F, 'IF', self.rb_if, self.wb_if)
+
+    def rb_if(self, addr):
+        return self.IF | 0xE0 # Unused bits read as 1
+
+    def wb_if(self, addr, value):
+        self.IF = value & 0x1F
+        self.update()
+
+    def rb_ie(self, addr):
+        return self.IE
+
+    def wb_ie(self, addr, value):
+        self.IE = value
+        self.update()
+
+    # Raise an interrupt (one of INT_*)
+    def request(self, interrupt):
+        self.IF |= interrupt
+        self.update()
+
+    def enable(self):
+        self.cpu.scheduler.cancel('ei')
+        self.ime = 1
+        self.update()
+
+    # EI: IME is only set once the instruction after EI has run. EI takes
+    # one cycle and the next instruction at least one, so an event two
+    # cycles ahead runs right after it.
+    def enable_delayed(self):
+        self.cpu.scheduler.schedule('ei', self.cpu.clock['M'] + 2, self.enable_event)
+
+    def enable_event(self, cycle):
+        self.enable()
+
+    def disable(self):
+        self.cpu.scheduler.cancel('ei')
+        self.ime = 0
+        self.update()
+
+    def update(self):
+        self.pending = self.IF & self.IE & 0x1F
+        self.active = self.pending if self.ime else 0
+        if self.pending and self.cpu.halt_mode:
+            self.cpu.wake()
+        if self.active:
+            self.cpu.scheduler.schedule('interrupt', self.cpu.clock['M'], self.service)
+
+    # Jump to the vector of the highest priority active interrupt
+    def service(self, cycle):
+        if not self.active:
+            return
+        interrupt = self.active & -self.active
+        self.IF &= ~interrupt
+        self.ime = 0
+        self.update()
+
+        cpu = self.cpu
+        cpu.push_16b_on_stack(cpu.registers.PC)
+        cpu.registers.PC = VECTORS[interrupt]
+        cpu.clock['M'] += 5 # 5 M-time taken
+        cpu.clock['T'] += 20
@@ -0,0 +1,73 @@
+from emulator.interrupts import INT_JOYPAD
+
+# Joypad
+# FF00  P1      Joypad (R/W)
+#    5          Select action buttons (0 = selected)
+#    4          Select direction buttons (0 = selected)
+#    3          Down or Start (0 = pressed, read only)
+#    2          Up or Select (0 = pressed, read only)
+#    1          Left or B (0 = pressed, read only)
+#    0          Right or A (0 = pressed, read only)
+#
+# The low nibble reads the input lines of the selected groups, so it is
+# 0xF (nothing pressed) when no group is selected. A line going from high
+# to low requests a joypad interrupt and ends STOP.
+
+# Bit of each button in pressed: directions in the low nibble, actions in
+# the high nibble, in the order they appear on the input lines
+BUTTONS = {
+    'right': 0x01,
+    'left': 0x02,
+    'up': 0x04,
+    'down': 0x08,
+    'a': 0x10,
+    'b': 0x20,
+    'select': 0x40,
+    'start': 0x80,
+}
+
+class Joypad():
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.pressed = 0 # Buttons held down stay held across a reset
+        self.reset()
+
+    def reset(self):
+        self.select = 0x30
+
+    def map_io(self, mmu):
+        mmu.register_io(0xFF00, 'P1', self.rb, self.wb)
+
+    # Input lines of the selected groups (1 = not pressed)
+    def lines(self):
+        lines = 0x0F
+        if not self.select & 0x10:
+            lines &= ~self.pressed
+        if not self.select & 0x20:
+            lines &= ~(self.pressed >> 4)
+        return lines & 0x0F
+
+    def rb(self, addr):
+        return 0xC0 | self.select | self.lines() # Unused bits read as 1
+
+    def wb(self, addr, value):
+        lines = self.lines()
+        self.select = value & 0x30
+        self.update(lines)
+
+    def press(self, button):
+        lines = self.lines()
+        self.pressed |= BUTTONS[button]
+        self.update(lines)
+
+    def release(self, button):
+        self.pressed &= ~BUTTONS[button]
+
+    # Request the interrupt (and end STOP) if any line went low since lines
+    # was read
+    def update(self, lines):
+        if lines & ~self.lines():
+            self.cpu.interrupts.request(INT_JOYPAD)
+            if self.cpu.stop_mode:
+                self.cpu.wake_stop()
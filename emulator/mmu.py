@@ -1,13 +1,15 @@
-
-from emulator import utils
+import mmap
+from emulator.battery import BatteryRAM, SAVE_INTERVAL
+from emulator.cartridge import Header, ROM_BANK_SIZE, RAM_BANK_SIZE
 
 class MMU():
     # Flag indicating BIOS is mapped in
-    # BIOS is unmapped with the first instruction above 0x00FF
+    # BIOS is unmapped by its last instruction (a write to FF50), or with
+    # the first instruction above 0x00FF
     inbios = 1
 
     # Memory regions (initialised at reset time)
-    bios = [
+    bios = bytes([
         0x31, 0xFE, 0xFF, 0xAF, 0x21, 0xFF, 0x9F, 0x32, 0xCB, 0x7C, 0x20, 0xFB, 0x21, 0x26, 0xFF, 0x0E,
         0x11, 0x3E, 0x80, 0x32, 0xE2, 0x0C, 0x3E, 0xF3, 0xE2, 0x32, 0x3E, 0x77, 0x77, 0x3E, 0xFC, 0xE0,
         0x47, 0x11, 0x04, 0x01, 0x21, 0x10, 0x80, 0x1A, 0xCD, 0x95, 0x00, 0xCD, 0x96, 0x00, 0x13, 0x7B,
@@ -24,66 +26,326 @@ class MMU():
         0xDD, 0xDC, 0x99, 0x9F, 0xBB, 0xB9, 0x33, 0x3E, 0x3c, 0x42, 0xB9, 0xA5, 0xB9, 0xA5, 0x42, 0x3C,
         0x21, 0x04, 0x01, 0x11, 0xA8, 0x00, 0x1A, 0x13, 0xBE, 0x20, 0xFE, 0x23, 0x7D, 0xFE, 0x34, 0x20,
         0xF5, 0x06, 0x19, 0x78, 0x86, 0x23, 0x05, 0x20, 0xFB, 0x86, 0x20, 0xFE, 0x3E, 0x01, 0xE0, 0x50
-    ]
-    rom  = [] # Rom 32KB
-    wram = [] # Working RAM 8KB
-    vram = [] # Video RAM 8KB
-    eram = [] # External RAM 8KB
-    oam  = [] # OAM (Object Attribute Memory) RAM 8KB
-    zram = [] # Zero Page RAM 8KB
+    ])
+    rom  = b'' # Cartridge ROM (banked)
+    wram = b'' # Working RAM 8KB
+    vram = b'' # Video RAM 8KB
+    eram = b'' # External RAM (banked)
+    oam  = b'' # OAM (Object Attribute Memory) RAM 160B
+    zram = b'' # Zero Page RAM 128B
 
     def __init__(self, cpu):
         self.cpu = cpu
-        self.rom = utils.zerolistmaker(32768)
-        self.wram = utils.zerolistmaker(8192)
-        self.vram = utils.zerolistmaker(8192)
-        self.eram = utils.zerolistmaker(8192)
-        self.oam = utils.zerolistmaker(160)
-        self.zram = utils.zerolistmaker(128)
+        # Blank (writable) ROM until a cartridge is loaded
+        self.rom = bytearray(32768)
+        self.wram = bytearray(8192)
+        self.vram = bytearray(8192)
+        self.oam = bytearray(160)
+        self.zram = bytearray(128)
+
+        # Page tables: one read and one write handler per 256 byte page,
+        # indexed by addr >> 8. Rebuilt only when the memory map changes
+        # (BIOS unmapped, ROM loaded, bank switched).
+        self.read_table = [None] * 256
+        self.write_table = [None] * 256
+
+        # Pages holding translated code (page -> unwatched write handler).
+        # Writes to them are reported through on_code_write(start, end).
+        self.code_pages = {}
+        self.on_code_write = None
+        # Bumped whenever code can change under a running translated block:
+        # a bank switch or BIOS unmap, or translated code being invalidated
+        self.code_epoch = 0
+
+        self.battery = None # Battery backed external RAM, if the cartridge has it
+        self.oam_locked = False # OAM DMA in progress
+
+        # I/O registers (FF00-FF7F): reader, writer and name of each one
+        self.io = bytearray(128)
+        self.io_names = [None] * 128
+        self.io_read = [self.rb_io_byte] * 128
+        self.io_write = [self.wb_io_byte] * 128
+        self.register_io(0xFF50, 'BOOT', self.rb_io_byte, self.wb_boot)
+        self.insert_cartridge()
+        self.build_page_table()
+
+    # Build the read/write handler tables for the current memory map.
+    # Handlers capture the backing buffers directly, so this has to be
+    # called again whenever a region is replaced (e.g. a new ROM is loaded).
+    def build_page_table(self):
+        code_pages = self.code_pages
+        self.code_pages = {}
+
+        vram = self.vram
+        wram = self.wram
+
+        def read_vram(addr):
+            return vram[addr & 0x1FFF]
+        def read_wram(addr):
+            return wram[addr & 0x1FFF]
+
+        def write_wram(addr, val):
+            wram[addr & 0x1FFF] = val
+
+        read_table = self.read_table
+        write_table = self.write_table
+        self.build_rom_pages()
+        for page in range(0x80, 0xA0): # Graphics: VRAM (8KB)
+            read_table[page] = read_vram
+            write_table[page] = self.wb_vram
+        self.build_eram_pages()
+        for page in range(0xC0, 0xFE): # Working RAM (8KB) + shadow
+            read_table[page] = read_wram
+            write_table[page] = write_wram
+        self.lock_oam(self.oam_locked) # Graphics: object attribute memory
+        read_table[0xFF] = self.rb_io # I/O, Zero-page RAM (HRAM)
+        write_table[0xFF] = self.wb_io
+
+        for page in code_pages:
+            self.watch_code_page(page)
+
+    def build_rom_pages(self):
+        read_table = self.read_table
+        write_table = self.write_table
+        for page in range(0x00, 0x40): # ROM0 (16KB)
+            read_table[page] = self.read_rom0
+        for page in range(0x40, 0x80): # ROM1 (16KB, banked)
+            read_table[page] = self.read_rom1
+        for page in range(0x00, 0x80): # Writes go to the bank controller
+            write_table[page] = self.mbc.wb
+        if self.inbios: # BIOS (256B) overlays the first ROM page
+            read_table[0x00] = self.rb_bios
+            for page in range(0x01, 0x10):
+                read_table[page] = self.rb_rom_inbios
+
+    def build_eram_pages(self):
+        for page in range(0xA0, 0xC0): # External RAM (8KB, banked)
+            self.read_table[page] = self.read_eram
+            self.write_table[page] = self.write_eram
+            if page in self.code_pages:
+                del self.code_pages[page]
+                self.watch_code_page(page)
+
+    # OAM can't be used by the CPU during OAM DMA
+    def lock_oam(self, locked):
+        self.oam_locked = locked
+        if locked:
+            self.read_table[0xFE] = self.rb_unmapped
+            self.write_table[0xFE] = self.wb_ignore
+        else:
+            self.read_table[0xFE] = self.rb_oam
+            self.write_table[0xFE] = self.wb_oam
+
+    # The length bytes at addr as mapped now, for OAM DMA. Memory regions
+    # are sliced directly; only other addresses (and the BIOS overlay) go
+    # through rb(). ROM past the end of the file reads as 0xFF.
+    def dma_source(self, addr, length):
+        if addr < 0x0100 and self.inbios:
+            return bytes(self.rb(addr + i) for i in range(length))
+        if addr < 0x8000:
+            if addr < 0x4000:
+                start = self.rom_bank0 * ROM_BANK_SIZE + addr
+            else:
+                start = self.rom_bank1 * ROM_BANK_SIZE + addr - 0x4000
+            data = self.rom[start:start + length]
+            if len(data) < length:
+                data = bytes(data) + b'\xff' * (length - len(data))
+            return data
+        if addr < 0xA000:
+            start = addr & 0x1FFF
+            return self.vram[start:start + length]
+        if 0xC000 <= addr < 0xFE00:
+            start = addr & 0x1FFF
+            if start + length <= len(self.wram):
+                return self.wram[start:start + length]
+        if 0xA000 <= addr < 0xC000 and self.eram_bank is not None:
+            start = self.eram_bank * RAM_BANK_SIZE + (addr & 0x1FFF)
+            return self.eram[start:start + length]
+        return bytes(self.rb(addr + i) for i in range(length))
+
+    # Parse the header of the ROM in self.rom and set up the memory bank
+    # controller and external RAM it asks for. Battery backed RAM is kept
+    # in save_path when given.
+    def insert_cartridge(self, save_path=None, save_interval=SAVE_INTERVAL):
+        self.header = Header(self.rom)
+        size = max(RAM_BANK_SIZE, self.header.ram_size)
+        if self.header.battery and self.header.ram_size and save_path:
+            self.battery = BatteryRAM(save_path, size, save_interval)
+            self.eram = self.battery.data
+        else:
+            self.eram = bytearray(size)
+        self.mbc = self.header.mbc(self, self.header)
+        self.mbc.reset()
+
+    # Map ROM banks at 0000-3FFF and 4000-7FFF. Called by the bank
+    # controller; each bank is read through a view of the ROM starting at
+    # the right offset, so nothing is copied.
+    def map_rom(self, bank0, bank1):
+        self.rom_bank0 = bank0
+        self.rom_bank1 = bank1
+        self.code_epoch += 1
+        self.rom_views = []
+        self.read_rom0 = self.rom_reader(bank0 * ROM_BANK_SIZE)
+        self.read_rom1 = self.rom_reader(bank1 * ROM_BANK_SIZE - 0x4000)
+        self.build_rom_pages()
+
+    # Read handler for addresses that are offset bytes before their
+    # position in the ROM
+    def rom_reader(self, offset):
+        rom = self.rom
+        if offset == 0:
+            return rom.__getitem__
+        if offset < 0: # Bank 0 mapped at 4000-7FFF
+            def read_rom(addr):
+                return rom[addr + offset]
+            return read_rom
+        view = memoryview(rom)[offset:]
+        self.rom_views.append(view)
+        return view.__getitem__
+
+    # Map an external RAM bank at A000-BFFF, None when RAM is disabled
+    def map_eram(self, bank):
+        if bank is None:
+            self.map_eram_handlers(self.rb_unmapped, self.wb_ignore)
+            return
+        eram = self.eram
+        offset = bank * RAM_BANK_SIZE - 0xA000
+        def read_eram(addr):
+            return eram[addr + offset]
+        def write_eram(addr, val):
+            eram[addr + offset] = val
+        if self.battery is not None: # Mark the page for the next flush
+            dirty = self.battery.dirty
+            shift = self.battery.page_shift
+            def write_eram(addr, val):
+                index = addr + offset
+                eram[index] = val
+                dirty[index >> shift] = 1
+        self.map_eram_handlers(read_eram, write_eram, bank)
+
+    # Map other hardware at A000-BFFF (e.g. MBC3 clock registers)
+    def map_eram_handlers(self, read, write, bank=None):
+        self.eram_bank = bank
+        self.code_epoch += 1
+        self.read_eram = read
+        self.write_eram = write
+        self.build_eram_pages()
+
+    # Report writes to a page holding translated code
+    def watch_code_page(self, page):
+        if page in self.code_pages:
+            return
+        write = self.write_table[page]
+        on_code_write = self.on_code_write
+        def write_code_page(addr, val):
+            write(addr, val)
+            on_code_write(addr, addr + 1)
+        self.code_pages[page] = write
+        self.write_table[page] = write_code_page
+
+    def unwatch_code_page(self, page):
+        write = self.code_pages.pop(page, None)
+        if write is not None:
+            self.write_table[page] = write
+
+    # Identifies the memory mapped at addr, so code translated from one
+    # mapping is never run for another (e.g. BIOS vs cartridge ROM)
+    def code_bank(self, addr):
+        if addr < 0x4000:
+            if addr < 0x0100 and self.inbios:
+                return -1
+            return self.rom_bank0
+        if addr < 0x8000:
+            return self.rom_bank1
+        if 0xA000 <= addr < 0xC000:
+            return self.eram_bank
+        return 0
+
+    # Unmap the BIOS and switch the first ROM page back to the cartridge
+    def unmap_bios(self):
+        self.inbios = 0
+        self.code_epoch += 1
+        self.build_rom_pages()
+
+    def rb_bios(self, addr):
+        return self.bios[addr]
+
+    # BIOS is unmapped with the first instruction above 0x00FF
+    def rb_rom_inbios(self, addr):
+        if self.cpu.registers.PC == 0x0100:
+            self.unmap_bios()
+        return self.rom[addr]
+
+    def rb_oam(self, addr):
+        # OAM is 160 bytes, remaining bytes read as 0
+        if addr < 0xFEA0:
+            return self.oam[addr & 0xFF]
+        else:
+            return 0
+
+    def rb_io(self, addr):
+        if addr < 0xFF80: # I/O registers
+            return self.io_read[addr & 0x7F](addr)
+        if addr == 0xFFFF: # Interrupt enable
+            return self.cpu.interrupts.rb_ie(addr)
+        return self.zram[addr & 0x7F] # Zero-page (HRAM)
+
+    def rb_unmapped(self, addr):
+        return 0xFF
+
+    def wb_ignore(self, addr, val):
+        pass
+
+    def wb_vram(self, addr, val):
+        # Write to GPU
+        self.vram[addr & 0x1FFF] = val
+        self.cpu.GPU.update_tile(addr, val)
+
+    def wb_oam(self, addr, val):
+        # OAM is 160 bytes, writes to the remaining bytes are ignored
+        if addr < 0xFEA0:
+            self.oam[addr & 0xFF] = val
+            self.cpu.GPU.update_oam(addr, val)
+
+    def wb_io(self, addr, val):
+        if addr < 0xFF80: # I/O registers
+            self.io_write[addr & 0x7F](addr, val)
+        elif addr == 0xFFFF: # Interrupt enable
+            self.cpu.interrupts.wb_ie(addr, val)
+        else: # Zero-page (HRAM)
+            self.zram[addr & 0x7F] = val
+
+    # Registers FF00-FF7F. Each component registers the handlers of its
+    # registers with register_io(); the others are kept as plain bytes.
+    def register_io(self, addr, name, read, write):
+        self.io_names[addr & 0x7F] = name
+        self.io_read[addr & 0x7F] = read
+        self.io_write[addr & 0x7F] = write
+
+    def rb_io_byte(self, addr):
+        return self.io[addr & 0x7F]
+
+    def wb_io_byte(self, addr, val):
+        self.io[addr & 0x7F] = val
+
+    # Writing to FF50 unmaps the BIOS
+    def wb_boot(self, addr, val):
+        self.io[0x50] = val
+        if val and self.inbios:
+            self.unmap_bios()
+
+    # Name -> address of the registered I/O registers
+    def io_registers(self):
+        return {name: 0xFF00 + index for index, name in enumerate(self.io_names) if name is not None}
+
+    # Current value of every I/O register (FF00-FF7F), e.g. for save
+    # states or debugging
+    def io_snapshot(self):
+        return bytes(read(0xFF00 + index) for index, read in enumerate(self.io_read))
 
     # Read 8-bit byte from a given address
     def rb(self, addr):
-        addr_mask = addr & 0xF000
-        if addr_mask == 0x0000: # BIOS (256B)/ROM0
-            if self.inbios:
-                if addr < 0x0100:
-                    return self.bios[addr]
-                elif(self.cpu.registers['PC'] == 0x0100):
-                    self.inbios = 0
-            return self.rom[addr]
-        elif addr_mask in [0x1000, 0x2000, 0x3000]: # ROM0 (16KB)
-            return self.rom[addr]
-        elif addr_mask in [0x4000, 0x5000, 0x6000, 0x7000]: # ROM1 (unbanked) (16KB)
-            return self.rom[addr]
-        elif addr_mask in [0x8000, 0x9000]: # Graphics: VRAM (8KB)
-            return self.vram[addr & 0x1FFF]
-        elif addr_mask in [0xA000, 0xB000]: # External RAM (8KB)
-            return self.eram[addr & 0x1FFF]
-        elif addr_mask in [0xC000, 0xD000]: # Working RAM (8KB)
-            return self.wram[addr & 0x1FFF]
-        elif addr_mask in [0xE000]: # Working RAM shadow
-            return self.wram[addr & 0x1FFF]
-        elif addr_mask in [0xF000]: # Working RAM shadow, OAM RAM, I/O, Zero-page RAM (HRAM)
-            addr_mask = addr & 0x0F00
-
-            if addr_mask in [0x000, 0x100, 0x200, 0x300, 0x400, 0x500, 0x600, 0x700, 0x800, 0x900, 0xA00, 0xB00, 0xC00, 0xD00]: # Working RAM
-                return self.wram[addr & 0x1FFF]
-            elif addr_mask in [0xE00]: # Graphics: object attribute memory
-                # OAM is 160 bytes, remaining bytes read as 0
-                if addr < 0xFEA0:
-                    return self.oam[addr & 0xFF]
-                else:
-                    return 0
-            elif addr_mask in [0xF00]: # Zero-page (HRAM)
-                if addr >= 0xFF80:
-                    return self.zram[addr & 0x7F]
-                else:
-                    addr_mask = addr & 0x00F0
-                    if addr_mask in [0x40, 0x50, 0x60, 0x70]:
-                        return self.cpu.GPU.rb(addr)
-                    # I/O control handling
-			        # Currently unhandled
-                    return 0
+        return self.read_table[addr >> 8](addr)
 
     # Read 16-bit word from a given address
     def rw(self, addr):
@@ -91,63 +353,55 @@ class MMU():
 
     # Write 8-bit byte to a given address
     def wb(self, addr, val):
-        addr_mask = addr & 0xF000
-        if addr_mask == 0x0000: # BIOS (256B)/ROM0
-            if self.inbios and addr < 0x0100:
-                return
-            # fall through
-        elif addr_mask in [0x1000, 0x2000, 0x3000]: # ROM0 (16k)
-            return
-        elif addr_mask in [0x4000, 0x5000, 0x6000, 0x7000]:   # ROM1 (unbanked) (16k)
-            return
-        elif addr_mask in [0x8000, 0x9000]: # Graphics: vram (8k)
-            # Write to GPU
-            if addr >= 0x9904 and addr <= 0x992F:
-                print("ENTRAAA!!!", hex(addr), hex(val))
-            self.vram[addr & 0x1FFF] = val
-            self.cpu.GPU.update_tile(addr, val)
-            return
-        elif addr_mask in [0xA000, 0xB000]: # External RAM (8k) Writable
-            self.eram[addr & 0x1FFF] = val
-        elif addr_mask in [0xC000, 0xD000]: # Working RAM (8k)
-            self.wram[addr & 0x1FFF] = val
-        elif addr_mask in [0xE000]: # Working RAM shadow
-            self.wram[addr & 0x1FFF] = val
-        elif addr_mask in [0xF000]: # Working RAM shadow, OAM RAM, I/O, Zero-page RAM (HRAM)
-            addr_mask = addr & 0x0F00
-            if addr_mask in [0x000, 0x100, 0x200, 0x300, 0x400, 0x500, 0x600, 0x700, 0x800, 0x900, 0xA00, 0xB00, 0xC00, 0xD00]: # Working RAM Shadow
-                self.wram[addr & 0x1FFF] = val
-            elif addr_mask in [0xE00]: # Graphics: object attribute memory
-                # OAM is 160 bytes, remaining bytes read as 0
-                if addr < 0xFEA0:
-                    # Write to GPU OAM
-                    pass
-                # Update GPU OAM
-            elif addr_mask in [0xF00]: # Zero-page (HRAM)
-                if addr > 0xFF80:
-                    self.zram[addr & 0x7F] = val
-                else:
-                    addr_mask = addr & 0x00F0
-                    if addr_mask in [0x40, 0x50, 0x60, 0x70]:
-                        self.cpu.GPU.wb(addr, val)
+        self.write_table[addr >> 8](addr, val)
 
     # Write 16-bit word to a given address
     def ww(self, addr, val):
         self.wb(addr, val & 255)
         self.wb(addr+1, val >> 8)
 
-    def load(self, filename):
+    # The cartridge is mapped read-only rather than read into memory, so
+    # every emulator process running the same ROM shares the same pages
+    # of the OS page cache and loading does not scale with the ROM size.
+    # Battery backed RAM is only saved when save_path is given, otherwise
+    # it is kept in memory like any other cartridge RAM.
+    def load(self, filename, save_path=None, save_interval=SAVE_INTERVAL):
+        self.close()
         with open(filename, "rb") as file:
-            byte_data = file.read()
-            int_data = list(byte_data)
-            self.rom = int_data
+            try:
+                self.rom = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: # Empty files can't be mapped
+                self.rom = file.read()
+        self.insert_cartridge(save_path, save_interval)
+        self.build_page_table()
 
-    def reset(self):
-        for i in range(0, 8192):
-            self.wram[i] = 0
-            self.eram[i] = 0
+    # Release the cartridge mapping and flush its save
+    def close(self):
+        rom = self.rom
+        views = self.rom_views
+        battery = self.battery
+        if not isinstance(rom, mmap.mmap) and battery is None:
+            return
+        self.rom = bytearray(32768)
+        self.battery = None
+        self.insert_cartridge()
+        self.build_page_table()
+        for view in views: # The mapping can't be closed while viewed
+            view.release()
+        if isinstance(rom, mmap.mmap):
+            rom.close()
+        if battery is not None:
+            battery.close()
 
-        for i in range(0, 127):
-            self.zram[i] = 0
+    def reset(self):
+        self.wram[:] = bytes(len(self.wram))
+        self.io[:] = bytes(len(self.io))
+        if self.battery is None: # Saves survive a reset
+            self.eram[:] = bytes(len(self.eram))
+        self.zram[:] = bytes(len(self.zram))
+        if self.code_pages:
+            self.on_code_write(0x8000, 0x10000)
 
         self.inbios = 0
+        self.mbc.reset()
+        self.build_page_table()
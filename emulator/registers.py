@@ -0,0 +1,85 @@
+# Z80 (LR35902) register file
+# Each CPU owns one instance. Registers are plain slot attributes so the
+# opcode handlers can access them without a dict lookup, and the 16-bit
+# pairs (AF, BC, DE, HL) are exposed as properties.
+#
+# Item access (registers['A']) is kept as a compatibility view for code
+# that addresses registers by name.
+class Registers():
+    __slots__ = (
+        'A', 'B', 'C', 'D', 'E', 'H', 'L', # 8-bit registers
+        'F',                               # Flags register
+        'PC', 'SP',                        # 16-bit registers
+        'M', 'T',                          # Clock for last instr
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.A = 0
+        self.B = 0
+        self.C = 0
+        self.D = 0
+        self.E = 0
+        self.H = 0
+        self.L = 0
+        self.F = 0
+        self.PC = 0
+        self.SP = 0
+        self.M = 0
+        self.T = 0
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in self.__slots__
+
+    def keys(self):
+        return self.__slots__
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def __repr__(self):
+        return 'Registers({})'.format(', '.join('{}={:#x}'.format(name, value) for name, value in self.items()))
+
+    @property
+    def AF(self):
+        return (self.A << 8) | self.F
+
+    @AF.setter
+    def AF(self, value):
+        self.A = (value >> 8) & 0xFF
+        self.F = value & 0xF0 # Low nibble of F always reads 0
+
+    @property
+    def BC(self):
+        return (self.B << 8) | self.C
+
+    @BC.setter
+    def BC(self, value):
+        self.B = (value >> 8) & 0xFF
+        self.C = value & 0xFF
+
+    @property
+    def DE(self):
+        return (self.D << 8) | self.E
+
+    @DE.setter
+    def DE(self, value):
+        self.D = (value >> 8) & 0xFF
+        self.E = value & 0xFF
+
+    @property
+    def HL(self):
+        return (self.H << 8) | self.L
+
+    @HL.setter
+    def HL(self, value):
+        self.H = (value >> 8) & 0xFF
+        self.L = value & 0xFF
@@ -0,0 +1,67 @@
+import heapq
+
+# Event scheduler
+# Components (PPU mode changes, timer overflow, interrupts, DMA) schedule
+# named events at absolute M-cycle timestamps instead of being polled after
+# every instruction. The CPU only compares its clock with next_event and
+# calls run_due() once it is reached.
+#
+# Each name has at most one pending event: scheduling a name again
+# replaces its previous event. Replaced and cancelled events stay in the
+# queue and are skipped when they reach the top, so next_event can be
+# early (never late).
+NEVER = 1 << 62
+
+class Scheduler():
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.queue = []       # Heap of [cycle, sequence, name, callback]
+        self.events = {}      # name -> pending queue entry
+        self.sequence = 0
+        self.next_event = NEVER
+
+    # Call callback(cycle) once the clock reaches cycle
+    def schedule(self, name, cycle, callback):
+        entry = self.events.get(name)
+        if entry is not None:
+            entry[3] = None
+        self.sequence += 1
+        entry = [cycle, self.sequence, name, callback]
+        self.events[name] = entry
+        heapq.heappush(self.queue, entry)
+        if cycle < self.next_event:
+            self.next_event = cycle
+
+    def cancel(self, name):
+        entry = self.events.pop(name, None)
+        if entry is not None:
+            entry[3] = None
+
+    # Timestamp of the pending event with that name, or None
+    def pending(self, name):
+        entry = self.events.get(name)
+        if entry is None:
+            return None
+        return entry[0]
+
+    # Run the events due at now, in timestamp order. Events scheduled by
+    # the callbacks are run too if they are already due.
+    def run_due(self, now):
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            cycle, sequence, name, callback = heapq.heappop(queue)
+            if callback is None:
+                continue
+            del self.events[name]
+            callback(cycle)
+        self.next_event = queue[0][0] if queue else NEVER
+
+    # Move every event offset cycles earlier (the clock was moved back)
+    def rebase(self, offset):
+        for entry in self.queue:
+            entry[0] -= offset
+        if self.next_event != NEVER:
+            self.next_event -= offset
@@ -0,0 +1,52 @@
+from emulator.interrupts import INT_SERIAL
+
+# Serial port (link cable)
+# FF01  SB      Serial transfer data (R/W)
+# FF02  SC      Serial transfer control (R/W)
+#    7          Transfer start (reads 1 while the transfer is in progress)
+#    0          Clock select (0: external clock, 1: internal clock)
+#
+# Nothing is ever plugged into the port. A transfer on the internal clock
+# shifts SB out (kept in output, as test ROMs print through the port) and
+# shifts in 0xFF, and is finished by the 'serial' event 8 bits at 8192 Hz
+# later. A transfer on the external clock waits for a clock that never
+# comes.
+TRANSFER_CYCLES = 1024 # M-cycles
+
+class Serial():
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.output = bytearray() # Bytes sent so far
+        self.reset()
+
+    def reset(self):
+        self.cpu.scheduler.cancel('serial')
+        self.sb = 0
+        self.sc = 0
+
+    def map_io(self, mmu):
+        mmu.register_io(0xFF01, 'SB', self.rb_sb, self.wb_sb)
+        mmu.register_io(0xFF02, 'SC', self.rb_sc, self.wb_sc)
+
+    def rb_sb(self, addr):
+        return self.sb
+
+    def wb_sb(self, addr, value):
+        self.sb = value
+
+    def rb_sc(self, addr):
+        return self.sc | 0x7E # Unused bits read as 1
+
+    def wb_sc(self, addr, value):
+        self.sc = value & 0x81
+        if self.sc == 0x81:
+            self.output.append(self.sb)
+            self.cpu.scheduler.schedule('serial', self.cpu.clock['M'] + TRANSFER_CYCLES, self.finish)
+        else:
+            self.cpu.scheduler.cancel('serial')
+
+    def finish(self, cycle):
+        self.sb = 0xFF
+        self.sc &= 0x7F
+        self.cpu.interrupts.request(INT_SERIAL)
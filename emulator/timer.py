@@ -0,0 +1,101 @@
+from emulator.interrupts import INT_TIMER
+
+# Timer
+# FF04  DIV     Divider (R/W, writing resets it)
+#               Incremented at 16384 Hz (every 64 M-cycles)
+# FF05  TIMA    Timer counter (R/W)
+#               Incremented at the frequency selected by TAC. When it
+#               overflows it is reloaded with TMA and a timer interrupt is
+#               requested.
+# FF06  TMA     Timer modulo (R/W)
+# FF07  TAC     Timer control (R/W)
+#    2          Timer enable
+#  1-0          Clock select (00: 4096 Hz, 01: 262144 Hz, 10: 65536 Hz, 11: 16384 Hz)
+#
+# Nothing is counted per instruction. DIV and TIMA are worked out from the
+# CPU clock when they are read or when the timer registers are written,
+# and the next TIMA overflow is scheduled as the 'timer' event.
+
+# M-cycles per TIMA increment for each TAC clock select
+TIMA_PERIODS = (256, 4, 16, 64)
+
+class Timer():
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.reset()
+
+    def reset(self):
+        self.cpu.scheduler.cancel('timer')
+        self.div_base = self.cpu.clock['M'] # clock['M'] when DIV was last reset
+        self.synced = self.div_base         # clock['M'] TIMA is up to date with
+        self.tima = 0
+        self.tma = 0
+        self.tac = 0
+
+    def map_io(self, mmu):
+        mmu.register_io(0xFF04, 'DIV', self.rb_div, self.wb_div)
+        mmu.register_io(0xFF05, 'TIMA', self.rb_tima, self.wb_tima)
+        mmu.register_io(0xFF06, 'TMA', self.rb_tma, self.wb_tma)
+        mmu.register_io(0xFF07, 'TAC', self.rb_tac, self.wb_tac)
+
+    # Bring TIMA up to now. TIMA ticks every period cycles counted from the
+    # last DIV reset, as both come from the same internal counter.
+    def sync(self, now):
+        if self.tac & 0x04:
+            period = TIMA_PERIODS[self.tac & 0x03]
+            ticks = (now - self.div_base) // period - (self.synced - self.div_base) // period
+            if ticks:
+                tima = self.tima + ticks
+                if tima > 0xFF: # Overflow: reload from TMA
+                    tima = self.tma + (tima - 0x100) % (0x100 - self.tma)
+                    self.cpu.interrupts.request(INT_TIMER)
+                self.tima = tima
+        self.synced = now
+
+    # Schedule the next TIMA overflow
+    def schedule(self):
+        if not self.tac & 0x04:
+            self.cpu.scheduler.cancel('timer')
+            return
+        period = TIMA_PERIODS[self.tac & 0x03]
+        next_tick = self.div_base + ((self.synced - self.div_base) // period + 1) * period
+        overflow = next_tick + (0xFF - self.tima) * period
+        self.cpu.scheduler.schedule('timer', overflow, self.overflow)
+
+    def overflow(self, cycle):
+        self.sync(cycle)
+        self.schedule()
+
+    def rb_div(self, addr):
+        return ((self.cpu.clock['M'] - self.div_base) >> 6) & 0xFF
+
+    def wb_div(self, addr, value):
+        now = self.cpu.clock['M']
+        self.sync(now)
+        self.div_base = now
+        self.schedule()
+
+    def rb_tima(self, addr):
+        self.sync(self.cpu.clock['M'])
+        return self.tima
+
+    def wb_tima(self, addr, value):
+        self.sync(self.cpu.clock['M'])
+        self.tima = value
+        self.schedule()
+
+    def rb_tma(self, addr):
+        return self.tma
+
+    def wb_tma(self, addr, value):
+        self.sync(self.cpu.clock['M'])
+        self.tma = value
+
+    def rb_tac(self, addr):
+        return self.tac | 0xF8 # Unused bits read as 1
+
+    def wb_tac(self, addr, value):
+        self.sync(self.cpu.clock['M'])
+        self.tac = value & 0x07
+        self.schedule()
@@ -0,0 +1,72 @@
+import struct
+
+# Execution trace
+# The trace level is chosen when the CPU is built. With TRACE_OFF (the
+# default) the CPU runs its normal dispatch loop and pays nothing for
+# tracing; any other level switches the CPU to a traced dispatch loop that
+# records into a TraceBuffer.
+TRACE_OFF = 0
+TRACE_BLOCKS = 1       # One record per translated block run
+TRACE_INSTRUCTIONS = 2 # One record per instruction (no block translation)
+
+# Trace record, taken before the traced code runs:
+#   PC, opcode (0xCBxx for CB prefixed), A, F, B, C, D, E, H, L, SP, M-cycle
+RECORD = struct.Struct('<HH8BHQ')
+
+class TraceBuffer():
+    # Ring buffer of binary trace records. Once full, each new record
+    # overwrites the oldest one.
+    def __init__(self, size=65536):
+        self.size = size
+        self.buffer = bytearray(RECORD.size * size)
+        self.position = 0 # Index of the next record to write
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # Values are masked to their field sizes, so a register the CPU left
+    # out of range is recorded as the hardware would hold it instead of
+    # aborting the run
+    def record(self, pc, op, registers, cycle):
+        RECORD.pack_into(self.buffer, self.position * RECORD.size,
+                         pc & 0xFFFF, op & 0xFFFF,
+                         registers.A & 0xFF, registers.F & 0xFF, registers.B & 0xFF, registers.C & 0xFF,
+                         registers.D & 0xFF, registers.E & 0xFF, registers.H & 0xFF, registers.L & 0xFF,
+                         registers.SP & 0xFFFF, cycle & 0xFFFFFFFFFFFFFFFF)
+        self.position += 1
+        if self.position == self.size:
+            self.position = 0
+        if self.count < self.size:
+            self.count += 1
+
+    def clear(self):
+        self.position = 0
+        self.count = 0
+
+    # Raw records, oldest first
+    def to_bytes(self):
+        end = self.position * RECORD.size
+        if self.count < self.size:
+            return bytes(self.buffer[:end])
+        return bytes(self.buffer[end:] + self.buffer[:end])
+
+    # Decoded records, oldest first
+    def records(self):
+        return list(RECORD.iter_unpack(self.to_bytes()))
+
+    # Write the raw records to a file (path or binary file object)
+    def dump(self, file):
+        if isinstance(file, str):
+            with open(file, 'wb') as f:
+                f.write(self.to_bytes())
+        else:
+            file.write(self.to_bytes())
+
+    # Records as text lines, for reading dumps
+    def format(self):
+        lines = []
+        for pc, op, a, f, b, c, d, e, h, l, sp, cycle in self.records():
+            lines.append('{:>10} PC={:04x} OP={:<6x} A={:02x} F={:02x} B={:02x} C={:02x} D={:02x} E={:02x} H={:02x} L={:02x} SP={:04x}'.format(
+                cycle, pc, op, a, f, b, c, d, e, h, l, sp))
+        return '\n'.join(lines)
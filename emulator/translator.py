@@ -0,0 +1,381 @@
+# Basic block translator
+# Straight-line runs of code, up to and including the next instruction that
+# can change the flow of execution, are decoded once and compiled into a
+# single Python function. The function calls the opcode handlers of the
+# interpreter back to back, so fetching and decoding (one MMU read and one
+# dict lookup per instruction) is paid only once per block.
+#
+# Blocks also end before a breakpoint, so the CPU can stop on it.
+#
+# Blocks are cached by PC and by the bank mapped at that address. Blocks
+# translated from RAM are invalidated when the memory they were decoded
+# from is written. Both bank switches and invalidations bump
+# MMU.code_epoch, which a block checks after each store: if it changed,
+# the block leaves, so the instructions after a bank switch run from the
+# new bank and code overwriting its own next instructions runs the new
+# ones. Blocks decoded from ROM are never invalidated: code changing
+# MMU.rom directly, rather than through load_rom(), has to call flush().
+
+from emulator import alu
+
+# Length in bytes of each (non CB prefixed) opcode
+INSTRUCTION_LENGTH = [1] * 256
+for op in [0x06, 0x0E, 0x16, 0x1E, 0x26, 0x2E, 0x36, 0x3E, # LD r,n
+           0x10,                                           # STOP
+           0x18, 0x20, 0x28, 0x30, 0x38,                   # JR
+           0xC6, 0xCE, 0xD6, 0xDE, 0xE6, 0xEE, 0xF6, 0xFE, # ALU A,n
+           0xE0, 0xF0,                                     # LDH
+           0xE8, 0xF8,                                     # ADD SP,n / LD HL,SP+n
+           0xCB]:                                          # CB prefix
+    INSTRUCTION_LENGTH[op] = 2
+for op in [0x01, 0x11, 0x21, 0x31,                         # LD rr,nn
+           0x08,                                           # LD (nn),SP
+           0xC2, 0xC3, 0xCA, 0xD2, 0xDA,                   # JP
+           0xC4, 0xCC, 0xCD, 0xD4, 0xDC,                   # CALL
+           0xEA, 0xFA]:                                    # LD (nn),A / LD A,(nn)
+    INSTRUCTION_LENGTH[op] = 3
+
+# Opcodes that end a block: jumps, calls, returns, restarts and
+# instructions that change the CPU or interrupt state
+BLOCK_END_OPS = frozenset([
+    0x18, 0x20, 0x28, 0x30, 0x38,                          # JR
+    0xC2, 0xC3, 0xCA, 0xD2, 0xDA, 0xE9,                    # JP
+    0xC4, 0xCC, 0xCD, 0xD4, 0xDC,                          # CALL
+    0xC0, 0xC8, 0xC9, 0xD0, 0xD8, 0xD9,                    # RET / RETI
+    0xC7, 0xCF, 0xD7, 0xDF, 0xE7, 0xEF, 0xF7, 0xFF,        # RST
+    0x10, 0x76,                                            # STOP / HALT
+    0xF3, 0xFB,                                            # DI / EI
+])
+
+# Opcodes that can write memory (see MMU.code_epoch)
+STORE_OPS = frozenset(
+    [0x02, 0x12, 0x22, 0x32, 0x08, 0xE0, 0xE2, 0xEA] +      # LD (rr),A / LD (nn),SP / LDH / LD (C),A / LD (nn),A
+    [0x34, 0x35, 0x36] +                                    # INC/DEC (HL) / LD (HL),n
+    [0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x77] +            # LD (HL),r
+    [0xC5, 0xD5, 0xE5, 0xF5] +                              # PUSH
+    [(0xCB << 8) + op for op in range(0x06, 0x40, 8)] +     # Rotates and shifts (HL)
+    [(0xCB << 8) + op for op in range(0x86, 0x100, 8)]      # RES/SET b,(HL)
+)
+
+# Idle loops
+# A block that branches back to its own start and only reads memory and
+# registers (no memory writes, stack or interrupt changes) is a candidate
+# idle loop. If one iteration ends with the registers it started with and
+# no event ran meanwhile, every following iteration will do the same until
+# an event changes memory, so the CPU skips whole iterations up to the next
+# event (see Z80.idle_loop).
+IDLE_MAX_INSTRUCTIONS = 8
+IDLE_SAFE_OPS = frozenset(
+    [0x00] +                                                # NOP
+    [0x06, 0x0E, 0x16, 0x1E, 0x26, 0x2E, 0x3E] +            # LD r,n
+    list(range(0x40, 0x70)) + list(range(0x78, 0x80)) +     # LD r,r / LD r,(HL)
+    [0x0A, 0x1A, 0x2A, 0x3A, 0xF0, 0xF2, 0xFA] +            # LD A,(rr) / LDH A,(n) / LD A,(C) / LD A,(nn)
+    list(range(0x80, 0xC0)) +                               # ALU A,r / ALU A,(HL)
+    [0xC6, 0xCE, 0xD6, 0xDE, 0xE6, 0xEE, 0xF6, 0xFE] +      # ALU A,n
+    [0x04, 0x05, 0x0C, 0x0D, 0x14, 0x15, 0x1C, 0x1D,        # INC/DEC r
+     0x24, 0x25, 0x2C, 0x2D, 0x3C, 0x3D] +
+    [0x03, 0x13, 0x23, 0x33, 0x0B, 0x1B, 0x2B, 0x3B] +      # INC/DEC rr
+    [(0xCB << 8) + op for op in range(0x40, 0x80)]          # BIT b,r / BIT b,(HL)
+)
+IDLE_BRANCH_OPS = frozenset([0x18, 0x20, 0x28, 0x30, 0x38,  # JR
+                             0xC2, 0xC3, 0xCA, 0xD2, 0xDA]) # JP
+
+# Memory read indirectly by an instruction: register pair holding the
+# address, or 'C' for 0xFF00+C
+IDLE_INDIRECT_READS = {0x0A: 'BC', 0x1A: 'DE', 0x2A: 'HL', 0x3A: 'HL', 0xF2: 'C'}
+for op in list(range(0x46, 0x80, 8)) + list(range(0x86, 0xC0, 8)):
+    IDLE_INDIRECT_READS[op] = 'HL'
+for op in range(0x46, 0x80, 8):
+    IDLE_INDIRECT_READS[(0xCB << 8) + op] = 'HL'
+
+# Registers that change without a scheduled event (DIV, TIMA). Loops
+# reading them are never idle.
+IDLE_UNSAFE_READS = (0xFF04, 0xFF05)
+
+# Blocks never run across these addresses, as the memory on either side
+# can be remapped independently (BIOS overlay, ROM bank, VRAM, RAM bank)
+BLOCK_BOUNDARIES = (0x0100, 0x4000, 0x8000, 0xA000, 0xC000)
+
+# Straight-line code
+# The simplest loads, increments, decrements and relative jumps are
+# compiled into the block itself instead of calling their handler. In
+# blocks decoded from ROM their operands are read at translate time and
+# emitted as constants; RAM can be rewritten while the block runs (code
+# patching the operand of the next instruction), so there only the
+# instructions without operands are inlined.
+#
+# inline_code() returns the statements and the M-cycles taken, or None to
+# call the handler. The statements see registers, rb/wb and io_read/
+# io_write (MMU) and the INC, DEC and SBC tables (emulator.alu). When the
+# M-cycles are None the statements set registers.M, registers.T and
+# registers.PC themselves (jumps), otherwise they leave PC alone.
+REGISTERS = ('B', 'C', 'D', 'E', 'H', 'L', None, 'A') # Operand encoding, None is (HL)
+PAIRS = (('B', 'C'), ('D', 'E'), ('H', 'L'), None)     # None is SP
+
+def inline_code(op, pc, next_pc, rb, rom):
+    if op == 0x00: # NOP
+        return [], 1
+    if 0x40 <= op < 0x80 and op != 0x76: # LD r,r / LD r,(HL) / LD (HL),r
+        dst = REGISTERS[(op >> 3) & 7]
+        src = REGISTERS[op & 7]
+        if dst is None:
+            return ['wb((registers.H << 8) | registers.L, registers.{})'.format(src)], 2
+        if src is None:
+            return ['registers.{} = rb((registers.H << 8) | registers.L)'.format(dst)], 2
+        return ['registers.{} = registers.{}'.format(dst, src)], 1
+    if op & 0xC6 == 0x04 and REGISTERS[(op >> 3) & 7] is not None: # INC r / DEC r
+        register = REGISTERS[(op >> 3) & 7]
+        return ['result = {}[registers.{}]'.format('DEC' if op & 0x01 else 'INC', register),
+                'registers.{} = result & 0xFF'.format(register),
+                'registers.F = (registers.F & 0x10) | (result >> 8)'], 1
+    if op & 0xC7 == 0x03: # INC rr / DEC rr
+        pair = PAIRS[(op >> 4) & 3]
+        sign = '-' if op & 0x08 else '+'
+        if pair is None:
+            return ['registers.SP = (registers.SP {} 1) & 0xFFFF'.format(sign)], 2
+        return ['value = (((registers.{} << 8) | registers.{}) {} 1) & 0xFFFF'.format(pair[0], pair[1], sign),
+                'registers.{} = value >> 8'.format(pair[0]),
+                'registers.{} = value & 0xFF'.format(pair[1])], 2
+    if op in (0x22, 0x2A, 0x32, 0x3A): # LD (HL+),A / LD A,(HL+) / LD (HL-),A / LD A,(HL-)
+        return ['addr = (registers.H << 8) | registers.L',
+                'registers.A = rb(addr)' if op & 0x08 else 'wb(addr, registers.A)',
+                'addr = (addr {} 1) & 0xFFFF'.format('-' if op & 0x10 else '+'),
+                'registers.H = addr >> 8',
+                'registers.L = addr & 0xFF'], 2
+    if op in (0x02, 0x12): # LD (BC),A / LD (DE),A
+        return ['wb((registers.{} << 8) | registers.{}, registers.A)'.format(*PAIRS[op >> 4])], 2
+    if op in (0x0A, 0x1A): # LD A,(BC) / LD A,(DE)
+        return ['registers.A = rb((registers.{} << 8) | registers.{})'.format(*PAIRS[op >> 4])], 2
+
+    if not rom or INSTRUCTION_LENGTH[op] == 1:
+        return None
+    n = rb(pc + 1)
+    if op & 0xC7 == 0x06 and REGISTERS[(op >> 3) & 7] is not None: # LD r,n
+        return ['registers.{} = {:#04x}'.format(REGISTERS[(op >> 3) & 7], n)], 2
+    if op & 0xCF == 0x01: # LD rr,nn
+        pair = PAIRS[(op >> 4) & 3]
+        high = rb(pc + 2)
+        if pair is None:
+            return ['registers.SP = {:#06x}'.format((high << 8) | n)], 3
+        return ['registers.{} = {:#04x}'.format(pair[0], high),
+                'registers.{} = {:#04x}'.format(pair[1], n)], 3
+    if op == 0xE0: # LDH (n),A, I/O registers straight to their handler
+        if n < 0x80:
+            return ['io_write[{:#04x}]({:#06x}, registers.A)'.format(n, 0xFF00 + n)], 2
+        return ['wb({:#06x}, registers.A)'.format(0xFF00 + n)], 2
+    if op == 0xF0: # LDH A,(n)
+        if n < 0x80:
+            return ['registers.A = io_read[{:#04x}]({:#06x})'.format(n, 0xFF00 + n)], 2
+        return ['registers.A = rb({:#06x})'.format(0xFF00 + n)], 2
+    if op == 0xEA: # LD (nn),A
+        return ['wb({:#06x}, registers.A)'.format((rb(pc + 2) << 8) | n)], 4
+    if op == 0xFA: # LD A,(nn)
+        return ['registers.A = rb({:#06x})'.format((rb(pc + 2) << 8) | n)], 4
+    if op == 0xFE: # CP n
+        return ['registers.F = SBC[(registers.A << 8) | {:#04x}] >> 8'.format(n)], 2
+    if op in (0x18, 0x20, 0x28): # JR n / JR NZ,n / JR Z,n
+        target = (next_pc + n - (n & 0x80) * 2) & 0xFFFF
+        if op == 0x18:
+            return ['registers.PC = {:#06x}'.format(target), 'registers.M = 3', 'registers.T = 12'], None
+        taken = ['registers.PC = {:#06x}'.format(target), 'registers.M = 3', 'registers.T = 12']
+        not_taken = ['registers.PC = {:#06x}'.format(next_pc), 'registers.M = 2', 'registers.T = 8']
+        if op == 0x28:
+            taken, not_taken = not_taken, taken
+        return (['if registers.F & 0x80:'] + ['    ' + line for line in not_taken] +
+                ['else:'] + ['    ' + line for line in taken]), None
+    return None
+
+class BlockTranslator():
+    MAX_BLOCK_INSTRUCTIONS = 64
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.blocks = {}      # (pc, bank) -> compiled block
+        self.ram_blocks = {}  # page -> list of blocks decoded from that RAM page
+        cpu.MMU.on_code_write = self.invalidate
+
+    # Return the compiled block starting at pc, translating it if needed.
+    # Returns None when no instruction at pc can be translated.
+    def lookup(self, pc):
+        key = (pc, self.cpu.MMU.code_bank(pc))
+        block = self.blocks.get(key)
+        if block is None:
+            block = self.translate(pc)
+            if block is None:
+                return None
+            block.key = key
+            self.blocks[key] = block
+            if pc >= 0x8000:
+                for page in range(pc >> 8, ((block.end - 1) >> 8) + 1):
+                    self.ram_blocks.setdefault(page, []).append(block)
+                    self.cpu.MMU.watch_code_page(page)
+        return block
+
+    # Decode the instructions starting at pc
+    def decode(self, pc):
+        MAP = self.cpu.MAP
+        CB_MAP = self.cpu.CB_MAP
+        rb = self.cpu.MMU.rb
+        breakpoints = self.cpu.breakpoints
+        if 0xFE00 <= pc < 0xFF80: # OAM and I/O registers are never translated
+            return []
+
+        instructions = []
+        while len(instructions) < self.MAX_BLOCK_INSTRUCTIONS:
+            op = rb(pc)
+            if op == 0xCB:
+                cb_op = rb((pc + 1) & 0xFFFF)
+                handler = CB_MAP.get(cb_op)
+                op = (0xCB << 8) + cb_op
+            else:
+                handler = MAP.get(op)
+            if handler is None: # Unknown opcode, leave it to the interpreter
+                break
+            length = INSTRUCTION_LENGTH[op >> 8 if op > 0xFF else op]
+            instructions.append((pc, op, handler))
+            next_pc = pc + length
+            if op in BLOCK_END_OPS or next_pc > 0xFFFF:
+                break
+            if any(pc < boundary <= next_pc for boundary in BLOCK_BOUNDARIES):
+                break
+            if 0xFE00 <= next_pc < 0xFF80 or next_pc in breakpoints:
+                break
+            pc = next_pc
+        return instructions
+
+    # Compile the block starting at pc into a Python function
+    def translate(self, pc):
+        instructions = self.decode(pc)
+        if not instructions:
+            return None
+
+        idle_reads = None
+        if self.cpu.idle_skip:
+            idle_reads = self.idle_reads(instructions)
+
+        mmu = self.cpu.MMU
+        namespace = {'mmu': mmu, 'rb': mmu.rb, 'wb': mmu.wb,
+                     'io_read': mmu.io_read, 'io_write': mmu.io_write, 'INC': alu.INC, 'DEC': alu.DEC}
+        last = len(instructions) - 1
+        stores = [i for i, (op_pc, op, handler) in enumerate(instructions)
+                  if i != last and op in STORE_OPS and not self.io_store(op_pc, op)]
+        lines = ['def block(cpu, registers, clock, scheduler):']
+        if stores:
+            lines.append('    epoch = mmu.code_epoch')
+        if idle_reads is not None:
+            lines.append('    next_event = scheduler.next_event')
+            lines.append("    start = clock['M']")
+            lines.append('    entry = (registers.A, registers.F, registers.B, registers.C, registers.D, registers.E, registers.H, registers.L, registers.SP)')
+        for i, (op_pc, op, handler) in enumerate(instructions):
+            next_pc = op_pc + INSTRUCTION_LENGTH[op >> 8 if op > 0xFF else op]
+            lines.append('    # {:#06x}: {:#x} {}'.format(op_pc, op, handler.__name__))
+            code = None
+            if op <= 0xFF: # Operands only from ROM, and from the same bank
+                rom = pc < 0x8000 and not any(op_pc < boundary < next_pc for boundary in BLOCK_BOUNDARIES)
+                code = inline_code(op, op_pc, next_pc, mmu.rb, rom)
+            if code is None:
+                namespace['h{}'.format(i)] = handler
+                lines.append('    registers.PC = {:#06x}'.format(op_pc + (2 if op > 0xFF else 1)))
+                lines.append('    h{}(cpu)'.format(i))
+                if i == last:
+                    lines.append('    registers.PC &= 0xFFFF')
+                lines.append("    clock['T'] += registers.T")
+                lines.append("    clock['M'] += registers.M")
+                lines.append("    if clock['M'] >= scheduler.next_event:")
+            else:
+                statements, cycles = code
+                if op == 0xFE:
+                    namespace['SBC'] = alu.SBC
+                lines.extend('    ' + statement for statement in statements)
+                if cycles is None:
+                    lines.append("    clock['T'] += registers.T")
+                    lines.append("    clock['M'] += registers.M")
+                    lines.append("    if clock['M'] >= scheduler.next_event:")
+                else:
+                    if i == last: # Leave the registers as the handler would
+                        lines.append('    registers.PC = {:#06x}'.format(next_pc))
+                        lines.append('    registers.M = {}'.format(cycles))
+                        lines.append('    registers.T = {}'.format(cycles * 4))
+                    lines.append("    clock['T'] += {}".format(cycles * 4))
+                    lines.append("    clock['M'] += {}".format(cycles))
+                    lines.append("    if clock['M'] >= scheduler.next_event:")
+                    if i != last: # PC is only kept up to date for the events
+                        lines.append('        registers.PC = {:#06x}'.format(next_pc))
+            lines.append("        scheduler.run_due(clock['M'])")
+            if i != last: # Leave the block if an event (interrupt) changed PC
+                lines.append('        if registers.PC != {:#06x}:'.format(next_pc))
+                lines.append('            return')
+            if i in stores: # or the store switched a bank or rewrote code
+                lines.append('    if mmu.code_epoch != epoch:')
+                lines.append('        registers.PC = {:#06x}'.format(next_pc))
+                lines.append('        return')
+        last_pc, last_op, last_handler = instructions[-1]
+        lines.append('    cpu.current_op = {:#x}'.format(last_op))
+        lines.append("    cpu.current_op_name = '{}'".format(last_handler.__name__))
+        if idle_reads is not None:
+            lines.append('    if registers.PC == {:#06x}:'.format(pc))
+            lines.append('        cpu.idle_loop(block, entry, start, next_event)')
+        source = '\n'.join(lines) + '\n'
+
+        code = compile(source, '<block {:#06x}>'.format(pc), 'exec')
+        exec(code, namespace)
+        block = namespace['block']
+        block.start = pc
+        block.end = last_pc + INSTRUCTION_LENGTH[last_op >> 8 if last_op > 0xFF else last_op]
+        block.instructions = [(op_pc, op) for op_pc, op, handler in instructions]
+        block.source = source
+        block.idle_reads = idle_reads
+        return block
+
+    # True for LDH (n),A from ROM to an I/O register other than BOOT, which
+    # can't change the code mapped anywhere
+    def io_store(self, op_pc, op):
+        if op != 0xE0 or op_pc >= 0x8000 or op_pc + 1 in BLOCK_BOUNDARIES:
+            return False
+        n = self.cpu.MMU.rb(op_pc + 1)
+        return n < 0x80 and n != 0x50
+
+    # If the instructions can form an idle loop, return the indirect reads
+    # to check before skipping (see IDLE_INDIRECT_READS). Otherwise None.
+    def idle_reads(self, instructions):
+        if len(instructions) > IDLE_MAX_INSTRUCTIONS or instructions[-1][1] not in IDLE_BRANCH_OPS:
+            return None
+        rb = self.cpu.MMU.rb
+        reads = []
+        for op_pc, op, handler in instructions[:-1]:
+            if op not in IDLE_SAFE_OPS:
+                return None
+            if op == 0xF0 and 0xFF00 + rb(op_pc + 1) in IDLE_UNSAFE_READS:
+                return None
+            if op == 0xFA and (rb(op_pc + 2) << 8) + rb(op_pc + 1) in IDLE_UNSAFE_READS:
+                return None
+            if op in IDLE_INDIRECT_READS:
+                reads.append(IDLE_INDIRECT_READS[op])
+        return tuple(reads)
+
+    # Drop the blocks decoded from RAM that overlap [start, end)
+    def invalidate(self, start, end):
+        stale = set()
+        for page in range(start >> 8, ((end - 1) >> 8) + 1):
+            for block in self.ram_blocks.get(page, ()):
+                if block.start < end and start < block.end:
+                    stale.add(block)
+        if stale: # Running blocks leave after the store (see translate)
+            self.cpu.MMU.code_epoch += 1
+        for block in stale:
+            self.blocks.pop(block.key, None)
+            for block_page in range(block.start >> 8, ((block.end - 1) >> 8) + 1):
+                page_blocks = self.ram_blocks.get(block_page)
+                if page_blocks is not None and block in page_blocks:
+                    page_blocks.remove(block)
+                    if not page_blocks:
+                        del self.ram_blocks[block_page]
+                        self.cpu.MMU.unwatch_code_page(block_page)
+
+    # Drop every translated block
+    def flush(self):
+        for page in list(self.ram_blocks):
+            self.cpu.MMU.unwatch_code_page(page)
+        self.ram_blocks = {}
+        self.blocks = {}
+        self.cpu.MMU.code_epoch += 1
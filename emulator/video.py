@@ -0,0 +1,38 @@
+import numpy as np
+
+# Video sinks
+# The GPU renders into its own framebuffer (height x width packed RGBA
+# pixels, R in the lowest byte) and hands it to a video sink at every
+# VBlank. A sink implements:
+#
+#   top_down            True if it wants the rows stored top row first,
+#                       False for bottom row first (GL order)
+#   present(framebuffer) Called with the completed frame. The framebuffer
+#                       keeps being rendered into afterwards, so a sink
+#                       that holds on to it must copy it.
+#
+# emulator.graphics.Window is the pyglet sink. This module must not import
+# pyglet, so headless machines never load it.
+class VideoSink():
+    top_down = True
+
+    def present(self, framebuffer):
+        pass
+
+# Keeps the last completed frame in memory, for tests and batch jobs
+class HeadlessFramebuffer(VideoSink):
+    top_down = True
+
+    def __init__(self, width=160, height=144):
+        self.width = width
+        self.height = height
+        self.frame = np.zeros((height, width), dtype='<u4')
+        self.frame_count = 0
+
+    def present(self, framebuffer):
+        self.frame[:] = framebuffer
+        self.frame_count += 1
+
+    # Last frame as a (height, width, 4) array of R, G, B, A bytes
+    def rgba(self):
+        return self.frame.view(np.uint8).reshape(self.height, self.width, 4)
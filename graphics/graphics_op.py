@@ -12,7 +12,8 @@ label = pyglet.text.Label('Gameboy',
                           x=window.width//2, y=window.height//2,
                           anchor_x='center', anchor_y='center')
 
-breakpoints = [0x0C, 0x0F]
+for breakpoint in [0x0C, 0x0F]:
+    cpu.add_breakpoint(breakpoint)
 
 @window.event
 def on_draw():
@@ -23,9 +24,8 @@ def on_draw():
 def on_key_press(symbol, modifiers):
     if symbol == pyglet.window.key.Z:
         try:
-            cpu.dispatcher()
-            while cpu.registers["PC"] not in breakpoints:
-                cpu.dispatcher()
+            while cpu.run_cycles(cpu.FRAME_CYCLES) != cpu.STOP_BREAKPOINT:
+                pass
             label.text = f'Op: {str(hex(cpu.current_op))} {cpu.current_op_name} PC: {hex(cpu.registers["PC"])}'
         except:
             label.text = f'Error. Op: {str(hex(cpu.current_op))} {cpu.current_op_name} PC: {hex(cpu.registers["PC"])}'
@@ -0,0 +1,138 @@
+import unittest
+from emulator import alu
+from emulator.cpu import Z80
+
+class TestALUTables(unittest.TestCase):
+
+    def test_adc_table(self):
+        self.assertEqual(alu.ADC[(0x3A << 8) | 0xC6], 0xB000) # Z, H, C
+        self.assertEqual(alu.ADC[(0x0F << 8) | 0x01], 0x2010) # H
+        self.assertEqual(alu.ADC[(1 << 16) | (0xE1 << 8) | 0x0F], 0x20F1) # H with carry in
+        self.assertEqual(alu.ADC[(1 << 16) | (0xE1 << 8) | 0x1E], 0xB000) # Z, H, C with carry in
+
+    def test_sbc_table(self):
+        self.assertEqual(alu.SBC[(0x3E << 8) | 0x3E], 0xC000) # Z, N
+        self.assertEqual(alu.SBC[(0x3E << 8) | 0x0F], 0x602F) # N, H
+        self.assertEqual(alu.SBC[(0x3E << 8) | 0x40], 0x50FE) # N, C
+        self.assertEqual(alu.SBC[(1 << 16) | (0x3B << 8) | 0x2A], 0x4010) # N with carry in
+        self.assertEqual(alu.SBC[(1 << 16) | (0x3B << 8) | 0x4F], 0x70EB) # N, H, C with carry in
+
+    def test_logic_flags_tables(self):
+        self.assertEqual(alu.AND_FLAGS[0x00], 0xA0)
+        self.assertEqual(alu.AND_FLAGS[0x1A], 0x20)
+        self.assertEqual(alu.OR_FLAGS[0x00], 0x80)
+        self.assertEqual(alu.XOR_FLAGS[0xFF], 0x00)
+
+    def test_inc_dec_tables(self):
+        self.assertEqual(alu.INC[0xFF], 0xA000)
+        self.assertEqual(alu.INC[0x50], 0x0051)
+        self.assertEqual(alu.DEC[0x01], 0xC000)
+        self.assertEqual(alu.DEC[0x00], 0x60FF)
+
+class TestALUOps(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.cpu.registers['F'] = 0x00
+
+    def test_add_ab(self):
+        self.cpu.registers['A'] = 0x3A
+        self.cpu.registers['B'] = 0xC6
+
+        self.cpu.add_ab()
+
+        self.assertEqual(self.cpu.registers['A'], 0x00)
+        self.assertEqual(self.cpu.registers['F'], 0xB0)
+
+    def test_sbc_ab(self):
+        self.cpu.registers['A'] = 0x3B
+        self.cpu.registers['B'] = 0x4F
+        self.cpu.registers['F'] = 0x10
+
+        self.cpu.sbc_ab()
+
+        self.assertEqual(self.cpu.registers['A'], 0xEB)
+        self.assertEqual(self.cpu.registers['F'], 0x70)
+
+    def test_cpb(self):
+        self.cpu.registers['A'] = 0x3C
+        self.cpu.registers['B'] = 0x40
+
+        self.cpu.cpb()
+
+        self.assertEqual(self.cpu.registers['A'], 0x3C)
+        self.assertEqual(self.cpu.registers['F'], 0x50)
+
+    def test_dec_keeps_carry(self):
+        self.cpu.registers['B'] = 0x01
+        self.cpu.registers['F'] = 0x10
+
+        self.cpu.decb()
+
+        self.assertEqual(self.cpu.registers['B'], 0x00)
+        self.assertEqual(self.cpu.registers['F'], 0xD0)
+
+class TestALUImmediateOps(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.cpu.registers['F'] = 0x00
+        self.cpu.registers['PC'] = 0xC123 # Operand read from WRAM
+
+    def run_immediate(self, op, a, n):
+        self.cpu.registers['A'] = a
+        self.cpu.MMU.wb(0xC123, n)
+
+        op()
+
+        self.assertEqual(self.cpu.registers['PC'], 0xC124)
+        self.assertEqual(self.cpu.registers['M'], 2)
+        self.assertEqual(self.cpu.registers['T'], 8)
+
+    def test_add_an(self):
+        self.run_immediate(self.cpu.add_an, 0x3A, 0xC6)
+
+        self.assertEqual(self.cpu.registers['A'], 0x00)
+        self.assertEqual(self.cpu.registers['F'], 0xB0)
+
+    def test_adc_an(self):
+        self.cpu.registers['F'] = 0x10
+
+        self.run_immediate(self.cpu.adc_an, 0xE1, 0x0F)
+
+        self.assertEqual(self.cpu.registers['A'], 0xF1)
+        self.assertEqual(self.cpu.registers['F'], 0x20)
+
+    def test_sub_an(self):
+        self.run_immediate(self.cpu.sub_an, 0x3E, 0x3E)
+
+        self.assertEqual(self.cpu.registers['A'], 0x00)
+        self.assertEqual(self.cpu.registers['F'], 0xC0)
+
+    def test_sbc_an(self):
+        self.cpu.registers['F'] = 0x10
+
+        self.run_immediate(self.cpu.sbc_an, 0x3B, 0x4F)
+
+        self.assertEqual(self.cpu.registers['A'], 0xEB)
+        self.assertEqual(self.cpu.registers['F'], 0x70)
+
+    def test_and_an(self):
+        self.run_immediate(self.cpu.and_an, 0x5A, 0x3F)
+
+        self.assertEqual(self.cpu.registers['A'], 0x1A)
+        self.assertEqual(self.cpu.registers['F'], 0x20)
+
+    def test_or_an(self):
+        self.run_immediate(self.cpu.or_an, 0x5A, 0x0F)
+
+        self.assertEqual(self.cpu.registers['A'], 0x5F)
+        self.assertEqual(self.cpu.registers['F'], 0x00)
+
+    def test_xor_an(self):
+        self.run_immediate(self.cpu.xor_an, 0xFF, 0xFF)
+
+        self.assertEqual(self.cpu.registers['A'], 0x00)
+        self.assertEqual(self.cpu.registers['F'], 0x80)
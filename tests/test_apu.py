@@ -0,0 +1,36 @@
+import unittest
+from emulator.cpu import Z80
+
+class TestAPU(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def test_read_masks(self):
+        self.mmu.wb(0xFF26, 0x80) # Sound on
+        self.mmu.wb(0xFF11, 0x81)
+        self.mmu.wb(0xFF12, 0xF3)
+        self.mmu.wb(0xFF13, 0x12)
+
+        self.assertEqual(self.mmu.rb(0xFF11), 0xBF) # Length is write only
+        self.assertEqual(self.mmu.rb(0xFF12), 0xF3)
+        self.assertEqual(self.mmu.rb(0xFF13), 0xFF)
+        self.assertEqual(self.mmu.rb(0xFF15), 0xFF) # Unused
+        self.assertEqual(self.mmu.rb(0xFF26), 0xF0)
+
+    def test_power_off(self):
+        self.mmu.wb(0xFF26, 0x80)
+        self.mmu.wb(0xFF24, 0x77)
+        self.mmu.wb(0xFF30, 0x12)
+
+        self.mmu.wb(0xFF26, 0x00)
+        self.mmu.wb(0xFF25, 0xF3) # Ignored while off
+        self.mmu.wb(0xFF31, 0x34) # Wave RAM still works
+
+        self.assertEqual(self.mmu.rb(0xFF24), 0x00)
+        self.assertEqual(self.mmu.rb(0xFF25), 0x00)
+        self.assertEqual(self.mmu.rb(0xFF26), 0x70)
+        self.assertEqual(self.mmu.rb(0xFF30), 0x12)
+        self.assertEqual(self.mmu.rb(0xFF31), 0x34)
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import time
+import unittest
+from emulator.cpu import Z80
+
+class TestBattery(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.rom_path = os.path.join(self.directory.name, 'game.gb')
+        self.save_path = os.path.join(self.directory.name, 'game.sav')
+
+        rom = bytearray(4 * 0x4000)
+        rom[0x147] = 0x03 # MBC1+RAM+BATTERY
+        rom[0x149] = 0x03 # 32KB RAM
+        with open(self.rom_path, 'wb') as file:
+            file.write(rom)
+
+    def load(self, save_interval=0):
+        cpu = Z80(headless=True)
+        cpu.load_rom(self.rom_path, save_path=self.save_path, save_interval=save_interval)
+        self.addCleanup(cpu.MMU.close)
+        cpu.MMU.wb(0x0000, 0x0A) # Enable RAM
+        return cpu
+
+    def test_save_file_created(self):
+        cpu = self.load()
+
+        self.assertEqual(cpu.MMU.battery.path, self.save_path)
+        self.assertEqual(os.path.getsize(self.save_path), 0x8000)
+
+    def test_no_save_path_keeps_ram_in_memory(self):
+        cpu = Z80(headless=True)
+        cpu.load_rom(self.rom_path)
+        self.addCleanup(cpu.MMU.close)
+        cpu.MMU.wb(0x0000, 0x0A) # Enable RAM
+
+        cpu.MMU.wb(0xA000, 0x42)
+
+        self.assertIsNone(cpu.MMU.battery)
+        self.assertIsInstance(cpu.MMU.eram, bytearray)
+        self.assertEqual(cpu.MMU.rb(0xA000), 0x42)
+        self.assertEqual(os.listdir(self.directory.name), ['game.gb'])
+
+    def test_no_battery_no_save(self):
+        rom = bytearray(0x8000)
+        rom[0x147] = 0x02 # MBC1+RAM
+        rom[0x149] = 0x02
+        with open(self.rom_path, 'wb') as file:
+            file.write(rom)
+
+        cpu = self.load()
+
+        self.assertIsNone(cpu.MMU.battery)
+        self.assertFalse(os.path.exists(self.save_path))
+
+    def test_write_marks_page_dirty(self):
+        cpu = self.load()
+        battery = cpu.MMU.battery
+
+        cpu.MMU.wb(0xA010, 0x42)
+        self.assertEqual(battery.dirty[0], 1)
+
+        battery.flush()
+        self.assertEqual(battery.dirty[0], 0)
+
+    def test_save_persists(self):
+        cpu = self.load()
+        cpu.MMU.wb(0x6000, 0x01)
+        cpu.MMU.wb(0x4000, 0x03) # RAM bank 3
+        cpu.MMU.wb(0xBFFF, 0x99)
+        cpu.MMU.close()
+
+        with open(self.save_path, 'rb') as file:
+            self.assertEqual(file.read()[0x7FFF], 0x99)
+        cpu = self.load()
+        cpu.MMU.wb(0x6000, 0x01)
+        cpu.MMU.wb(0x4000, 0x03)
+        self.assertEqual(cpu.MMU.rb(0xBFFF), 0x99)
+
+    def test_reset_keeps_save(self):
+        cpu = self.load()
+        cpu.MMU.wb(0xA000, 0x77)
+
+        cpu.MMU.reset()
+
+        self.assertEqual(cpu.MMU.eram[0], 0x77)
+
+    def test_background_flush(self):
+        cpu = self.load(save_interval=0.01)
+        battery = cpu.MMU.battery
+
+        cpu.MMU.wb(0xA000, 0x55)
+        deadline = time.monotonic() + 5
+        while battery.dirty[0] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(battery.dirty[0], 0)
+        self.assertTrue(battery.thread.is_alive())
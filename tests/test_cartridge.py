@@ -0,0 +1,181 @@
+import os
+import tempfile
+import unittest
+from emulator.cpu import Z80
+from emulator.cartridge import Header, ROMOnly, MBC1, MBC3, MBC5, RTC_CYCLES_PER_SECOND
+
+class TestCartridge(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+        self.mmu.inbios = 0
+
+    def tearDown(self):
+        self.mmu.close()
+        super().tearDown()
+
+    # Load a ROM of the given type where every bank starts with its number
+    # (code maps ROM offsets to bytes to place there)
+    def load(self, cartridge_type, banks, ram_size=0, code=None):
+        rom = bytearray(banks * 0x4000)
+        for bank in range(banks):
+            rom[bank * 0x4000] = bank & 0xFF
+            rom[bank * 0x4000 + 1] = bank >> 8
+        for offset, data in (code or {}).items():
+            rom[offset:offset + len(data)] = data
+        rom[0x134:0x138] = b'TEST'
+        rom[0x147] = cartridge_type
+        rom[0x149] = ram_size
+        fd, path = tempfile.mkstemp(suffix='.gb')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(rom)
+        self.addCleanup(os.remove, path)
+        self.cpu.load_rom(path)
+
+    def bank_at(self, addr):
+        return self.mmu.rb(addr) + (self.mmu.rb(addr + 1) << 8)
+
+    def test_header(self):
+        self.load(0x13, 4, ram_size=0x03)
+
+        self.assertEqual(self.mmu.header.title, 'TEST')
+        self.assertIsInstance(self.mmu.mbc, MBC3)
+        self.assertTrue(self.mmu.header.battery)
+        self.assertEqual(len(self.mmu.eram), 0x8000)
+
+    def test_unsupported_type(self):
+        rom = bytearray(0x8000)
+        rom[0x147] = 0xFC # Pocket camera
+
+        with self.assertWarns(UserWarning):
+            header = Header(rom)
+
+        self.assertIs(header.mbc, ROMOnly)
+        self.assertFalse(header.battery)
+
+    def test_unsupported_type_is_mapped_as_rom_only(self):
+        with self.assertWarns(UserWarning):
+            self.load(0x05, 4) # MBC2
+
+        self.assertIsInstance(self.mmu.mbc, ROMOnly)
+        self.assertEqual(self.bank_at(0x4000), 1)
+
+    def test_rom_only(self):
+        self.load(0x00, 2)
+
+        self.assertEqual(self.bank_at(0x4000), 1)
+        self.mmu.wb(0x2000, 0x00)
+        self.assertEqual(self.bank_at(0x4000), 1)
+
+    def test_mbc1_rom_banks(self):
+        self.load(0x01, 128)
+        self.assertIsInstance(self.mmu.mbc, MBC1)
+
+        self.mmu.wb(0x2000, 0x05)
+        self.assertEqual(self.bank_at(0x4000), 5)
+        self.mmu.wb(0x2000, 0x00) # Bank 0 selects bank 1
+        self.assertEqual(self.bank_at(0x4000), 1)
+        self.mmu.wb(0x4000, 0x02) # Upper bits
+        self.assertEqual(self.bank_at(0x4000), 0x41)
+        self.assertEqual(self.bank_at(0x0000), 0)
+        self.mmu.wb(0x6000, 0x01) # Upper bits apply to 0000-3FFF too
+        self.assertEqual(self.bank_at(0x0000), 0x40)
+
+    def test_mbc1_ram(self):
+        self.load(0x03, 4, ram_size=0x03)
+
+        self.assertEqual(self.mmu.rb(0xA000), 0xFF) # Disabled
+        self.mmu.wb(0xA000, 0x12)
+        self.mmu.wb(0x0000, 0x0A)
+        self.mmu.wb(0xA000, 0x12)
+        self.mmu.wb(0x6000, 0x01)
+        self.mmu.wb(0x4000, 0x02)
+        self.mmu.wb(0xA000, 0x34)
+
+        self.assertEqual(self.mmu.eram[0x0000], 0x12)
+        self.assertEqual(self.mmu.eram[0x4000], 0x34)
+        self.assertEqual(self.mmu.rb(0xA000), 0x34)
+        self.mmu.wb(0x0000, 0x00)
+        self.assertEqual(self.mmu.rb(0xA000), 0xFF)
+
+    def test_mbc3(self):
+        self.load(0x10, 128, ram_size=0x03)
+
+        self.mmu.wb(0x2000, 0x7F)
+        self.assertEqual(self.bank_at(0x4000), 0x7F)
+        self.mmu.wb(0x0000, 0x0A)
+        self.mmu.wb(0x4000, 0x03)
+        self.mmu.wb(0xA000, 0x56)
+        self.assertEqual(self.mmu.eram[0x6000], 0x56)
+
+        self.cpu.clock['M'] += RTC_CYCLES_PER_SECOND * 3725 # 1h 2m 5s
+        self.mmu.wb(0x6000, 0x00)
+        self.mmu.wb(0x6000, 0x01)
+        rtc = []
+        for register in range(0x08, 0x0D):
+            self.mmu.wb(0x4000, register)
+            rtc.append(self.mmu.rb(0xA000))
+        self.assertEqual(rtc, [5, 2, 1, 0, 0])
+
+    def test_mbc5(self):
+        self.load(0x19, 258)
+        self.assertIsInstance(self.mmu.mbc, MBC5)
+
+        self.mmu.wb(0x2000, 0x00) # Bank 0 can be mapped at 4000
+        self.assertEqual(self.bank_at(0x4000), 0)
+        self.mmu.wb(0x2000, 0x01)
+        self.mmu.wb(0x3000, 0x01)
+        self.assertEqual(self.bank_at(0x4000), 0x101)
+
+    def test_bank_switch_does_not_copy(self):
+        self.load(0x01, 8)
+
+        self.mmu.wb(0x2000, 0x03)
+
+        self.assertIs(self.mmu.rom_views[0].obj, self.mmu.rom)
+
+    def test_translated_code_is_per_bank(self):
+        self.load(0x01, 4)
+        self.mmu.wb(0x2000, 0x02)
+        block = self.cpu.translator.lookup(0x4000)
+
+        self.mmu.wb(0x2000, 0x03)
+        other = self.cpu.translator.lookup(0x4000)
+
+        self.assertIsNot(other, block)
+        self.assertEqual(self.mmu.code_bank(0x4000), 3)
+        self.mmu.wb(0x2000, 0x02)
+        self.assertIs(self.cpu.translator.lookup(0x4000), block)
+
+    def test_bank_switch_inside_block(self):
+        self.load(0x01, 4, code={
+            0x8002: bytes([0x3E, 0x03,             # LD A,3
+                           0xEA, 0x00, 0x20,       # LD (2000),A
+                           0x06, 0x22, 0x76]),     # LD B,0x22 / HALT
+            0xC007: bytes([0x0E, 0x33, 0x76]),     # LD C,0x33 / HALT
+        })
+        self.mmu.wb(0x2000, 0x02)
+        self.cpu.registers.PC = 0x4002
+
+        self.cpu.run_cycles(20)
+
+        self.assertEqual(self.cpu.registers.B, 0x00)
+        self.assertEqual(self.cpu.registers.C, 0x33)
+        self.assertEqual(self.mmu.code_bank(0x4000), 3)
+
+    def test_indirect_bank_switch_inside_block(self):
+        self.load(0x01, 4, code={
+            0x8002: bytes([0x21, 0x00, 0x20,       # LD HL,2000
+                           0x36, 0x03,             # LD (HL),3
+                           0x06, 0x22, 0x76]),     # LD B,0x22 / HALT
+            0xC007: bytes([0x0E, 0x33, 0x76]),     # LD C,0x33 / HALT
+        })
+        self.mmu.wb(0x2000, 0x02)
+        self.cpu.registers.PC = 0x4002
+
+        self.cpu.run_cycles(20)
+
+        self.assertEqual(self.cpu.registers.B, 0x00)
+        self.assertEqual(self.cpu.registers.C, 0x33)
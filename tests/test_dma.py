@@ -0,0 +1,68 @@
+import unittest
+from emulator.cpu import Z80
+
+class TestDMA(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def test_copy_from_wram(self):
+        for i in range(0xA0):
+            self.mmu.wb(0xC100 + i, i)
+
+        self.mmu.wb(0xFF46, 0xC1)
+
+        self.assertEqual(bytes(self.mmu.oam), bytes(range(0xA0)))
+        self.assertEqual(len(self.mmu.oam), 0xA0)
+        self.assertEqual(self.mmu.rb(0xFF46), 0xC1)
+        self.assertTrue(self.cpu.GPU.sprites_dirty)
+        self.assertEqual(self.cpu.GPU.oam[1].tolist(), (4, 5, 6, 7))
+
+    def test_copy_from_rom(self):
+        self.mmu.inbios = 0
+        self.mmu.build_page_table()
+        self.mmu.rom[0x4200:0x42A0] = bytes(range(0x50, 0xF0))
+
+        self.mmu.wb(0xFF46, 0x42)
+
+        self.assertEqual(bytes(self.mmu.oam), bytes(self.mmu.rom[0x4200:0x42A0]))
+
+    def test_copy_from_bios(self):
+        self.mmu.rom[0x0000:0x00A0] = bytes(0xA0)
+
+        self.mmu.wb(0xFF46, 0x00)
+
+        self.assertEqual(bytes(self.mmu.oam), self.mmu.bios[0x00:0xA0])
+
+    def test_copy_past_end_of_rom(self):
+        self.mmu.rom = bytearray(0x4080)
+        self.mmu.insert_cartridge()
+        self.mmu.build_page_table()
+
+        self.mmu.wb(0xFF46, 0x40)
+
+        self.assertEqual(len(self.mmu.oam), 0xA0)
+        self.assertEqual(bytes(self.mmu.oam), bytes(0x80) + b'\xff' * 0x20)
+
+    def test_oam_locked_during_transfer(self):
+        self.mmu.wb(0xC000, 0x12)
+        self.mmu.wb(0xFF46, 0xC0)
+
+        self.assertEqual(self.mmu.rb(0xFE00), 0xFF)
+        self.mmu.wb(0xFE00, 0x34) # Ignored
+        self.assertEqual(self.cpu.scheduler.pending('dma'), 160)
+
+        self.cpu.clock['M'] = 160
+        self.cpu.scheduler.run_due(160)
+        self.assertFalse(self.cpu.dma.active)
+        self.assertEqual(self.mmu.rb(0xFE00), 0x12)
+
+    def test_reset_ends_transfer(self):
+        self.mmu.wb(0xFF46, 0xC0)
+
+        self.cpu.reset()
+
+        self.assertIsNone(self.cpu.scheduler.pending('dma'))
+        self.assertEqual(self.mmu.rb(0xFE00), 0x00)
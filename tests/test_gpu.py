@@ -0,0 +1,436 @@
+import unittest
+from emulator.cpu import Z80
+
+WHITE = 0x00FFFFFF
+LIGHT_GRAY = 0x00C0C0C0
+DARK_GRAY = 0x00606060
+BLACK = 0x00000000
+
+class TestGPU(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.gpu = self.cpu.GPU
+        self.cpu.MMU.wb(0xFF47, 0xE4) # 11 10 01 00
+
+    def write_tile_row(self, addr, low, high):
+        self.cpu.MMU.wb(addr, low)
+        self.cpu.MMU.wb(addr + 1, high)
+
+    def test_background_line(self):
+        self.cpu.MMU.wb(0xFF40, 0x91) # LCD on, BG tiles at 0x8000, map at 0x9800
+        self.write_tile_row(0x8010, 0xF0, 0xFF) # Tile 1, row 0: 3333 2222
+        self.cpu.MMU.wb(0x9801, 1)              # Second tile of the map
+
+        self.gpu.line = 0
+        self.gpu.pixel_transfer()
+
+        line = self.gpu.screen[0].tolist()
+        self.assertEqual(line[0:8], [WHITE] * 8)
+        self.assertEqual(line[8:12], [BLACK] * 4)
+        self.assertEqual(line[12:16], [DARK_GRAY] * 4)
+        self.assertEqual(line[16:], [WHITE] * 144)
+
+    def test_background_scroll(self):
+        self.cpu.MMU.wb(0xFF40, 0x91)
+        self.write_tile_row(0x8012, 0x80, 0x80) # Tile 1, row 1: 3000 0000
+        self.cpu.MMU.wb(0x9800 + 32 * 31, 1)    # Last row of the map
+        self.cpu.MMU.wb(0xFF42, 0xF9)           # SCY: line 0 shows map line 249
+        self.cpu.MMU.wb(0xFF43, 0xFE)           # SCX: wraps around the map
+
+        self.gpu.line = 0
+        self.gpu.pixel_transfer()
+
+        line = self.gpu.screen[0].tolist()
+        self.assertEqual(line[0:2], [WHITE] * 2)
+        self.assertEqual(line[2], BLACK)
+        self.assertEqual(line[3:], [WHITE] * 157)
+
+    def test_signed_tile_data(self):
+        self.cpu.MMU.wb(0xFF40, 0x81)           # BG tiles at 0x8800 (signed)
+        self.write_tile_row(0x9000, 0xFF, 0xFF) # Tile 0 is at 0x9000
+        self.write_tile_row(0x8800, 0xFF, 0x00) # Tile -128 is at 0x8800
+        self.cpu.MMU.wb(0x9800, 0x00)
+        self.cpu.MMU.wb(0x9801, 0x80)
+        for i in range(2, 32):
+            self.cpu.MMU.wb(0x9800 + i, 0x01)
+
+        self.gpu.line = 0
+        self.gpu.pixel_transfer()
+
+        line = self.gpu.screen[0].tolist()
+        self.assertEqual(line[0:8], [BLACK] * 8)
+        self.assertEqual(line[8:16], [LIGHT_GRAY] * 8)
+        self.assertEqual(line[16:], [WHITE] * 144)
+
+    def test_palette(self):
+        self.cpu.MMU.wb(0xFF47, 0x1B) # 00 01 10 11
+
+        self.assertEqual(self.cpu.MMU.rb(0xFF47), 0x1B)
+        self.assertEqual(self.gpu.bg_palette.tolist(), [BLACK, DARK_GRAY, LIGHT_GRAY, WHITE])
+
+    def test_framebuffer_rgba(self):
+        self.cpu.MMU.wb(0xFF40, 0x91)
+        self.write_tile_row(0x8010, 0x80, 0x00) # Tile 1, row 0: 1000 0000
+        self.cpu.MMU.wb(0x9800, 1)
+
+        self.gpu.line = 0
+        self.gpu.pixel_transfer()
+
+        rgba = self.gpu.screen.view('u1').reshape(144, 160, 4)
+        self.assertEqual(rgba[0, 0].tolist(), [192, 192, 192, 0])
+        self.assertEqual(rgba[0, 1].tolist(), [255, 255, 255, 0])
+
+    def test_tile_cache(self):
+        self.write_tile_row(0x8012, 0x5A, 0x3C) # Tile 1, row 1
+
+        self.assertEqual(self.gpu.tile_dirty[1], 1)
+        self.gpu.decode_tiles()
+
+        self.assertEqual(self.gpu.tile_cache[1, 1].tolist(), [0, 1, 2, 3, 3, 2, 1, 0])
+        self.assertEqual(self.gpu.tile_cache[1, 0].tolist(), [0] * 8)
+        self.assertFalse(any(self.gpu.tile_dirty))
+
+    def test_only_dirty_tiles_decoded(self):
+        self.gpu.decode_tiles()
+        self.gpu.tile_cache[2, 0, 0] = 3 # Stale on purpose, tile 2 isn't written
+        self.write_tile_row(0x8010, 0xFF, 0x00)
+
+        self.gpu.decode_tiles()
+
+        self.assertEqual(self.gpu.tile_cache[1, 0].tolist(), [1] * 8)
+        self.assertEqual(self.gpu.tile_cache[2, 0, 0], 3)
+
+    def test_gl_row_order(self):
+        self.gpu.top_down = False
+        self.gpu.reset()
+        self.cpu.MMU.wb(0xFF47, 0xE4)
+        self.cpu.MMU.wb(0xFF40, 0x91)
+        self.write_tile_row(0x8010, 0xFF, 0xFF)
+        self.cpu.MMU.wb(0x9800, 1)
+
+        self.gpu.line = 0
+        self.gpu.pixel_transfer()
+
+        self.assertEqual(self.gpu.framebuffer[143, 0], BLACK) # Bottom row first
+        self.assertEqual(self.gpu.framebuffer[0, 0], WHITE)
+        self.assertEqual(self.gpu.screen[0, 0], BLACK)
+
+    def test_ppu_timing(self):
+        self.cpu.MMU.wb(0xFF40, 0x91) # LCD on at cycle 0
+        scheduler = self.cpu.scheduler
+
+        scheduler.run_due(113)
+        self.assertEqual((self.gpu.line, self.gpu.mode), (0, self.gpu.MODE_HBLANK))
+        scheduler.run_due(114)
+        self.assertEqual((self.gpu.line, self.gpu.mode), (1, self.gpu.MODE_OAM))
+        scheduler.run_due(144 * 114)
+        self.assertEqual((self.gpu.line, self.gpu.mode), (144, self.gpu.MODE_VBLANK))
+        self.assertEqual(self.cpu.video.frame_count, 1)
+        scheduler.run_due(17555)
+        self.assertEqual((self.gpu.line, self.gpu.frame_number), (153, 0))
+        scheduler.run_due(17556)
+        self.assertEqual((self.gpu.line, self.gpu.mode, self.gpu.frame_number), (0, self.gpu.MODE_OAM, 1))
+
+    def test_lcd_off_stops_ppu(self):
+        self.cpu.MMU.wb(0xFF40, 0x91)
+        self.cpu.scheduler.run_due(1000)
+
+        self.cpu.MMU.wb(0xFF40, 0x11)
+        self.cpu.scheduler.run_due(100000)
+
+        self.assertEqual(self.gpu.line, 0)
+        self.assertEqual(self.gpu.frame_number, 0)
+
+class TestSprites(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.gpu = self.cpu.GPU
+        self.mmu = self.cpu.MMU
+        self.mmu.wb(0xFF47, 0xE4) # 11 10 01 00
+        self.mmu.wb(0xFF48, 0xE4)
+        self.mmu.wb(0xFF49, 0x1B) # 00 01 10 11
+        self.mmu.wb(0xFF40, 0x93) # LCD, sprites and BG on, BG tiles at 0x8000
+
+    def write_sprite(self, number, y, x, tile, flags=0):
+        for i, value in enumerate((y, x, tile, flags)):
+            self.mmu.wb(0xFE00 + number * 4 + i, value)
+
+    def write_tile_row(self, tile, row, low, high):
+        self.mmu.wb(0x8000 + tile * 16 + row * 2, low)
+        self.mmu.wb(0x8000 + tile * 16 + row * 2 + 1, high)
+
+    def render(self, line):
+        self.gpu.line = line
+        self.gpu.oam_search()
+        self.gpu.pixel_transfer()
+        return self.gpu.screen[line].tolist()
+
+    def test_oam_structured_view(self):
+        self.write_sprite(3, 0x20, 0x30, 0x05, 0x80)
+
+        self.assertEqual(self.mmu.rb(0xFE0C), 0x20)
+        self.assertEqual(self.gpu.oam[3].tolist(), (0x20, 0x30, 0x05, 0x80))
+        self.assertTrue(self.gpu.sprites_dirty)
+
+    def test_sprite_line(self):
+        self.write_tile_row(1, 2, 0xF0, 0xFF) # 3333 2222
+        self.write_sprite(0, 16, 8 + 10, 1)   # At (10, 0)
+
+        line = self.render(2)
+
+        self.assertEqual(line[0:10], [WHITE] * 10)
+        self.assertEqual(line[10:14], [BLACK] * 4)
+        self.assertEqual(line[14:18], [DARK_GRAY] * 4)
+        self.assertEqual(line[18:], [WHITE] * 142)
+        self.assertEqual(self.render(8), [WHITE] * 160)
+
+    def test_sprite_transparent_and_clipped(self):
+        self.write_tile_row(1, 0, 0x0F, 0x00) # 0000 1111
+        self.write_sprite(0, 16, 4, 1)        # At x = -4
+
+        line = self.render(0)
+
+        self.assertEqual(line[0:4], [LIGHT_GRAY] * 4)
+        self.assertEqual(line[4:], [WHITE] * 156)
+
+    def test_sprite_priority(self):
+        self.write_tile_row(1, 0, 0xFF, 0x00) # Colour 1
+        self.write_tile_row(2, 0, 0x00, 0xFF) # Colour 2
+        self.write_sprite(0, 16, 12, 1)       # Higher X, drawn behind
+        self.write_sprite(1, 16, 10, 2)
+        self.write_sprite(2, 16, 30, 2)       # Same X: lower number in front
+        self.write_sprite(3, 16, 30, 1)
+
+        line = self.render(0)
+
+        self.assertEqual(line[2:10], [DARK_GRAY] * 8)
+        self.assertEqual(line[10:12], [LIGHT_GRAY] * 2)
+        self.assertEqual(line[22:30], [DARK_GRAY] * 8)
+
+    def test_ten_sprites_per_line(self):
+        self.write_tile_row(1, 0, 0xFF, 0xFF)
+        for number in range(12):
+            self.write_sprite(number, 16, 8 + number * 8, 1)
+
+        line = self.render(0)
+
+        self.assertEqual(line[:80], [BLACK] * 80)
+        self.assertEqual(line[80:], [WHITE] * 80)
+
+    def test_sprite_behind_background(self):
+        self.write_tile_row(1, 0, 0xFF, 0xFF)
+        self.write_tile_row(2, 0, 0xF0, 0x00) # Background: 1111 0000
+        self.mmu.wb(0x9800, 2)
+        self.write_sprite(0, 16, 8, 1, 0x80)
+
+        line = self.render(0)
+
+        self.assertEqual(line[0:4], [LIGHT_GRAY] * 4)
+        self.assertEqual(line[4:8], [BLACK] * 4)
+
+    def test_sprite_flip_and_palette(self):
+        self.write_tile_row(1, 7, 0x80, 0x80) # Colour 3, bottom left pixel
+        self.write_sprite(0, 16, 8, 1, 0x70)  # Y flip, X flip, OBP1
+
+        line = self.render(0)
+
+        self.assertEqual(line[7], WHITE) # 3 through OBP1
+        self.assertEqual(line[0:7], [WHITE] * 7)
+        self.mmu.wb(0xFF49, 0xE4)
+        self.assertEqual(self.render(0)[7], BLACK)
+
+    def test_tall_sprites(self):
+        self.write_tile_row(4, 0, 0xFF, 0x00)
+        self.write_tile_row(5, 1, 0x00, 0xFF)
+        self.write_sprite(0, 16, 8, 5) # Bit 0 ignored: tiles 4 and 5
+
+        self.assertEqual(self.render(9)[0], WHITE) # 8x8
+        self.mmu.wb(0xFF40, 0x97)
+        self.assertTrue(self.gpu.sprites_dirty)
+        self.assertEqual(self.render(0)[0], LIGHT_GRAY)
+        self.assertEqual(self.render(9)[0], DARK_GRAY)
+
+    def test_sprites_disabled(self):
+        self.write_tile_row(1, 0, 0xFF, 0xFF)
+        self.write_sprite(0, 16, 8, 1)
+        self.mmu.wb(0xFF40, 0x91)
+
+        self.assertEqual(self.render(0), [WHITE] * 160)
+
+    def test_index_rebuilt_only_when_dirty(self):
+        self.write_sprite(0, 16, 8, 1)
+        self.gpu.oam_search()
+        order = self.gpu.sprite_order
+
+        self.gpu.oam_search()
+        self.assertIs(self.gpu.sprite_order, order)
+        self.write_sprite(1, 16, 8, 1)
+        self.gpu.oam_search()
+        self.assertIsNot(self.gpu.sprite_order, order)
+
+class TestLCDRegisters(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.gpu = self.cpu.GPU
+        self.mmu = self.cpu.MMU
+        self.mmu.wb(0xFF47, 0xE4)
+
+    def test_lcdc_read_back(self):
+        self.mmu.wb(0xFF40, 0xF7)
+
+        self.assertEqual(self.mmu.rb(0xFF40), 0xF7)
+        self.assertEqual(self.gpu.bg_map_base, 0x1800)
+        self.assertEqual(self.gpu.window_map_base, 0x1C00)
+        self.assertEqual(self.gpu.sprite_height, 16)
+        self.assertTrue(self.gpu.window_enabled)
+
+    def test_tile_index_cached(self):
+        self.mmu.wb(0xFF40, 0x81)
+        self.assertEqual(self.gpu.tile_index[[0x00, 0x7F, 0x80, 0xFF]].tolist(), [256, 383, 128, 255])
+
+        self.mmu.wb(0xFF40, 0x91)
+        self.assertEqual(self.gpu.tile_index[[0x00, 0xFF]].tolist(), [0, 255])
+
+    def test_background_disabled(self):
+        self.mmu.wb(0xFF40, 0x90)
+        self.mmu.wb(0x8000, 0xFF)
+        self.mmu.wb(0x8001, 0xFF)
+
+        self.gpu.line = 0
+        self.gpu.pixel_transfer()
+
+        self.assertEqual(self.gpu.screen[0].tolist(), [WHITE] * 160)
+
+    def test_stat_mode_and_coincidence(self):
+        self.mmu.wb(0xFF45, 0x00)
+        self.mmu.wb(0xFF40, 0x91)
+
+        self.assertEqual(self.mmu.rb(0xFF41), 0x86) # OAM search, LY=LYC
+        self.cpu.scheduler.run_due(20)
+        self.assertEqual(self.mmu.rb(0xFF41), 0x87) # Pixel transfer
+        self.cpu.scheduler.run_due(114)
+        self.assertEqual(self.mmu.rb(0xFF41), 0x82) # Line 1
+        self.mmu.wb(0xFF40, 0x11)
+        self.assertEqual(self.mmu.rb(0xFF41) & 0x03, 0x00)
+
+    def test_stat_lyc_interrupt(self):
+        self.mmu.wb(0xFF45, 0x02)
+        self.mmu.wb(0xFF41, 0x40)
+        self.mmu.wb(0xFF40, 0x91)
+
+        self.cpu.scheduler.run_due(114)
+        self.assertEqual(self.cpu.interrupts.IF & 0x02, 0)
+        self.cpu.scheduler.run_due(228)
+        self.assertEqual(self.cpu.interrupts.IF & 0x02, 0x02)
+
+    def test_stat_hblank_interrupt_once_per_line(self):
+        self.mmu.wb(0xFF41, 0x08)
+        self.mmu.wb(0xFF40, 0x91)
+
+        self.cpu.scheduler.run_due(63)
+        self.assertEqual(self.cpu.interrupts.IF & 0x02, 0x02)
+        self.mmu.wb(0xFF0F, 0x00)
+        self.mmu.wb(0xFF41, 0x48) # Another condition while the line is high
+        self.mmu.wb(0xFF45, 0x00)
+        self.assertEqual(self.cpu.interrupts.IF & 0x02, 0)
+        self.cpu.scheduler.run_due(114 + 63)
+        self.assertEqual(self.cpu.interrupts.IF & 0x02, 0x02)
+
+    def test_window_position(self):
+        self.mmu.wb(0xFF4A, 0x40)
+        self.mmu.wb(0xFF4B, 0x07)
+
+        self.assertEqual((self.mmu.rb(0xFF4A), self.mmu.rb(0xFF4B)), (0x40, 0x07))
+        self.assertEqual(self.gpu.window_x, 0)
+
+    def test_scroll_x_cached(self):
+        self.mmu.wb(0xFF43, 0xFC)
+
+        self.assertEqual(self.gpu.bg_tile_x[:2].tolist(), [31, 31])
+        self.assertEqual(self.gpu.bg_tile_x[4], 0)
+        self.assertEqual(self.gpu.bg_pixel_x[:5].tolist(), [4, 5, 6, 7, 0])
+
+class TestWindow(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.gpu = self.cpu.GPU
+        self.mmu = self.cpu.MMU
+        self.mmu.wb(0xFF47, 0xE4)
+        for row in range(8): # Tile 1: black, tile 2: row number as colour 1 or 2
+            self.mmu.wb(0x8010 + row * 2, 0xFF)
+            self.mmu.wb(0x8011 + row * 2, 0xFF)
+            self.mmu.wb(0x8020 + row * 2, 0xFF if row & 1 else 0x00)
+            self.mmu.wb(0x8021 + row * 2, 0x00 if row & 1 else 0xFF)
+        for i in range(32 * 32): # Window map at 0x9C00
+            self.mmu.wb(0x9C00 + i, 1)
+        self.mmu.wb(0xFF40, 0xF1) # Window on, map at 0x9C00, tiles at 0x8000
+
+    def render(self, line):
+        self.gpu.line = line
+        self.gpu.pixel_transfer()
+        return self.gpu.screen[line].tolist()
+
+    def test_window_position(self):
+        self.mmu.wb(0xFF4A, 2)
+        self.mmu.wb(0xFF4B, 7 + 100)
+
+        self.assertEqual(self.render(1), [WHITE] * 160)
+        line = self.render(2)
+        self.assertEqual(line[:100], [WHITE] * 100)
+        self.assertEqual(line[100:], [BLACK] * 60)
+        self.assertEqual(self.gpu.window_line, 1)
+
+    def test_window_left_edge(self):
+        self.mmu.wb(0xFF4B, 3) # Starts 4 pixels off screen
+        self.mmu.wb(0x9C00, 2)
+
+        line = self.render(0)
+
+        self.assertEqual(line[:4], [DARK_GRAY] * 4) # Last 4 pixels of tile 2
+        self.assertEqual(line[4:], [BLACK] * 156)
+
+    def test_window_off_screen(self):
+        self.mmu.wb(0xFF4B, 167)
+
+        self.assertFalse(self.gpu.window_on)
+        self.assertEqual(self.render(0), [WHITE] * 160)
+        self.assertEqual(self.gpu.window_line, 0)
+
+    def test_window_needs_background(self):
+        self.mmu.wb(0xFF4B, 7)
+        self.mmu.wb(0xFF40, 0xF0)
+
+        self.assertFalse(self.gpu.window_on)
+        self.assertEqual(self.render(0), [WHITE] * 160)
+
+    def test_window_line_counter(self):
+        self.mmu.wb(0xFF4B, 7)
+        for i in range(32):
+            self.mmu.wb(0x9C00 + i, 2)
+
+        self.render(0)                # Window row 0
+        self.mmu.wb(0xFF40, 0xD1)     # Hidden for lines 1-4
+        for line in range(1, 5):
+            self.render(line)
+        self.mmu.wb(0xFF40, 0xF1)
+        line = self.render(5)         # Window row 1, not 5
+
+        self.assertEqual(line, [LIGHT_GRAY] * 160)
+        self.assertEqual(self.gpu.window_line, 2)
+
+    def test_window_line_reset_each_frame(self):
+        self.mmu.wb(0xFF4B, 7)
+        self.gpu.window_line = 50
+        self.mmu.wb(0xFF40, 0x71) # LCD off
+
+        self.mmu.wb(0xFF40, 0xF1) # On again, starts a new frame
+
+        self.assertEqual(self.gpu.window_line, 0)
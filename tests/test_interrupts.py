@@ -0,0 +1,98 @@
+import unittest
+from emulator.cpu import Z80
+from emulator.interrupts import INT_VBLANK, INT_TIMER
+
+class TestInterrupts(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.cpu.registers.SP = 0xFFFE
+
+    def write_code(self, addr, code):
+        for i, byte in enumerate(code):
+            self.cpu.MMU.wb(addr + i, byte)
+        self.cpu.registers.PC = addr
+
+    def test_registers(self):
+        self.cpu.MMU.wb(0xFFFF, 0x1F)
+        self.cpu.MMU.wb(0xFF0F, 0x05)
+
+        self.assertEqual(self.cpu.MMU.rb(0xFFFF), 0x1F)
+        self.assertEqual(self.cpu.MMU.rb(0xFF0F), 0xE5)
+        self.assertEqual(self.cpu.interrupts.pending, 0x05)
+        self.assertEqual(self.cpu.interrupts.active, 0) # IME off
+
+    def test_vblank_interrupt(self):
+        self.write_code(0xC000, [0xFB,        # EI
+                                 0x18, 0xFE]) # JR -2
+        self.cpu.MMU.wb(0xFFFF, INT_VBLANK)
+        self.cpu.MMU.wb(0xFF40, 0x91)
+        self.cpu.add_breakpoint(0x0040)
+
+        reason = self.cpu.run_cycles(100000)
+
+        self.assertEqual(reason, Z80.STOP_BREAKPOINT)
+        self.assertEqual(self.cpu.GPU.line, 144)
+        self.assertEqual(self.cpu.registers.SP, 0xFFFC)
+        self.assertEqual(self.cpu.MMU.rw(0xFFFC), 0xC001)
+        self.assertEqual(self.cpu.interrupts.ime, 0)
+        self.assertEqual(self.cpu.interrupts.IF & INT_VBLANK, 0)
+
+    def test_priority(self):
+        self.write_code(0xC000, [0x00])
+        self.cpu.MMU.wb(0xFFFF, 0x1F)
+        self.cpu.interrupts.enable()
+        self.cpu.interrupts.request(INT_TIMER)
+        self.cpu.interrupts.request(INT_VBLANK)
+
+        self.cpu.dispatcher()
+
+        self.assertEqual(self.cpu.registers.PC, 0x0040)
+        self.assertEqual(self.cpu.interrupts.IF, INT_TIMER)
+
+    def test_ei_delay(self):
+        self.write_code(0xC000, [0xFB,  # EI
+                                 0x00,  # NOP
+                                 0x00]) # NOP
+        self.cpu.MMU.wb(0xFFFF, INT_TIMER)
+        self.cpu.interrupts.request(INT_TIMER)
+
+        self.cpu.dispatcher() # EI
+        self.assertEqual(self.cpu.registers.PC, 0xC001)
+        self.cpu.dispatcher() # NOP, then the interrupt
+        self.assertEqual(self.cpu.registers.PC, 0x0050)
+        self.assertEqual(self.cpu.MMU.rw(self.cpu.registers.SP), 0xC002)
+
+    def test_di_cancels_ei(self):
+        self.write_code(0xC000, [0xFB,  # EI
+                                 0xF3,  # DI
+                                 0x00]) # NOP
+        self.cpu.MMU.wb(0xFFFF, INT_TIMER)
+        self.cpu.interrupts.request(INT_TIMER)
+
+        self.cpu.run_cycles(10)
+
+        self.assertEqual(self.cpu.interrupts.ime, 0)
+        self.assertNotEqual(self.cpu.registers.PC, 0x0050)
+
+    def test_reti(self):
+        self.write_code(0xC000, [0xD9]) # RETI
+        self.cpu.push_16b_on_stack(0x1234)
+
+        self.cpu.dispatcher()
+
+        self.assertEqual(self.cpu.registers.PC, 0x1234)
+        self.assertEqual(self.cpu.interrupts.ime, 1)
+
+    def test_interrupt_inside_block(self):
+        self.write_code(0xC000, [0x00] * 16 + [0x18, 0xEE]) # 16 NOPs, JR -18
+        self.cpu.MMU.wb(0xFFFF, INT_TIMER)
+        self.cpu.interrupts.enable()
+        self.cpu.scheduler.schedule('test', 5, lambda cycle: self.cpu.interrupts.request(INT_TIMER))
+        self.cpu.add_breakpoint(0x0050)
+
+        self.cpu.run_cycles(100)
+
+        self.assertEqual(self.cpu.registers.PC, 0x0050)
+        self.assertEqual(self.cpu.MMU.rw(self.cpu.registers.SP), 0xC005)
@@ -0,0 +1,70 @@
+import unittest
+from emulator.cpu import Z80
+
+class TestIO(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def test_registered_registers(self):
+        registers = self.mmu.io_registers()
+
+        self.assertEqual(registers['P1'], 0xFF00)
+        self.assertEqual(registers['SC'], 0xFF02)
+        self.assertEqual(registers['DIV'], 0xFF04)
+        self.assertEqual(registers['IF'], 0xFF0F)
+        self.assertEqual(registers['NR52'], 0xFF26)
+        self.assertEqual(registers['LCDC'], 0xFF40)
+        self.assertEqual(registers['DMA'], 0xFF46)
+        self.assertEqual(registers['BOOT'], 0xFF50)
+        self.assertEqual(self.mmu.io_read[0x05], self.cpu.timer.rb_tima)
+
+    def test_plain_register(self):
+        self.mmu.wb(0xFF03, 0x5A) # Unused, no handler
+
+        self.assertEqual(self.mmu.rb(0xFF03), 0x5A)
+        self.assertEqual(self.mmu.io[0x03], 0x5A)
+
+    def test_register_io(self):
+        written = []
+        self.mmu.register_io(0xFF00, 'P1', lambda addr: 0xCF, lambda addr, val: written.append(val))
+
+        self.mmu.wb(0xFF00, 0x20)
+
+        self.assertEqual(self.mmu.rb(0xFF00), 0xCF)
+        self.assertEqual(written, [0x20])
+        self.assertEqual(self.mmu.io_registers()['P1'], 0xFF00)
+
+    def test_hram_and_ie(self):
+        self.mmu.wb(0xFF80, 0x11)
+        self.mmu.wb(0xFFFF, 0x05)
+
+        self.assertEqual(self.mmu.rb(0xFF80), 0x11)
+        self.assertEqual(self.mmu.rb(0xFFFF), 0x05)
+        self.assertEqual(self.cpu.interrupts.IE, 0x05)
+
+    def test_snapshot(self):
+        self.mmu.wb(0xFF40, 0x91)
+        self.mmu.wb(0xFF47, 0xE4)
+        self.mmu.wb(0xFF0F, 0x01)
+
+        snapshot = self.mmu.io_snapshot()
+
+        self.assertEqual(len(snapshot), 128)
+        self.assertEqual(snapshot[0x40], 0x91)
+        self.assertEqual(snapshot[0x47], 0xE4)
+        self.assertEqual(snapshot[0x0F], 0xE1)
+        self.assertEqual(snapshot[0x00], 0xFF) # Nothing selected or pressed
+        self.assertEqual(snapshot[0x02], 0x7E)
+        self.assertEqual(snapshot[0x26], 0x70)
+
+    def test_boot_register_unmaps_bios(self):
+        self.mmu.rom[0x0000] = 0x12
+        self.assertEqual(self.mmu.rb(0x0000), self.mmu.bios[0])
+
+        self.mmu.wb(0xFF50, 0x01)
+
+        self.assertEqual(self.mmu.inbios, 0)
+        self.assertEqual(self.mmu.rb(0x0000), 0x12)
@@ -0,0 +1,43 @@
+import unittest
+from emulator.cpu import Z80
+from emulator.interrupts import INT_JOYPAD
+
+class TestJoypad(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def test_nothing_pressed(self):
+        self.assertEqual(self.mmu.rb(0xFF00), 0xFF)
+        self.mmu.wb(0xFF00, 0x00)
+        self.assertEqual(self.mmu.rb(0xFF00), 0xCF)
+        self.mmu.wb(0xFF00, 0x20) # Directions
+        self.assertEqual(self.mmu.rb(0xFF00), 0xEF)
+
+    def test_selected_group(self):
+        self.cpu.joypad.press('down')
+        self.cpu.joypad.press('a')
+
+        self.mmu.wb(0xFF00, 0x20) # Directions
+        self.assertEqual(self.mmu.rb(0xFF00), 0xE7)
+        self.mmu.wb(0xFF00, 0x10) # Actions
+        self.assertEqual(self.mmu.rb(0xFF00), 0xDE)
+        self.mmu.wb(0xFF00, 0x30)
+        self.assertEqual(self.mmu.rb(0xFF00), 0xFF)
+
+        self.cpu.joypad.release('down')
+        self.mmu.wb(0xFF00, 0x20)
+        self.assertEqual(self.mmu.rb(0xFF00), 0xEF)
+
+    def test_interrupt(self):
+        self.cpu.joypad.press('start') # Not selected
+        self.assertFalse(self.cpu.interrupts.IF & INT_JOYPAD)
+
+        self.mmu.wb(0xFF00, 0x10) # Selecting it pulls the line low
+        self.assertTrue(self.cpu.interrupts.IF & INT_JOYPAD)
+
+        self.mmu.wb(0xFF0F, 0x00)
+        self.cpu.joypad.press('select')
+        self.assertTrue(self.cpu.interrupts.IF & INT_JOYPAD)
@@ -0,0 +1,58 @@
+import mmap
+import unittest
+from emulator.cpu import Z80
+
+class TestLoadROM(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+
+    def tearDown(self):
+        self.cpu.MMU.close()
+        super().tearDown()
+
+    def test_memory_regions_are_bytearrays(self):
+        self.assertIsInstance(self.cpu.MMU.wram, bytearray)
+        self.assertIsInstance(self.cpu.MMU.vram, bytearray)
+        self.assertIsInstance(self.cpu.MMU.eram, bytearray)
+        self.assertIsInstance(self.cpu.MMU.oam, bytearray)
+        self.assertIsInstance(self.cpu.MMU.zram, bytearray)
+        self.assertEqual(len(self.cpu.MMU.oam), 160)
+        self.assertEqual(len(self.cpu.MMU.zram), 128)
+
+    def test_load_rom(self):
+        self.cpu.load_rom("roms/tetris.gb")
+
+        with open("roms/tetris.gb", "rb") as file:
+            data = file.read()
+        self.assertEqual(len(self.cpu.MMU.rom), len(data))
+        self.assertEqual(self.cpu.MMU.rom[0x134:0x13A], b'TETRIS')
+        self.cpu.MMU.inbios = 0
+        self.cpu.MMU.build_page_table()
+        self.assertEqual(self.cpu.MMU.rb(0x0100), data[0x0100])
+        self.assertEqual(self.cpu.MMU.rb(0x7FFF), data[0x7FFF])
+
+    def test_rom_is_read_only(self):
+        self.cpu.load_rom("roms/tetris.gb")
+        self.cpu.MMU.inbios = 0
+        self.cpu.MMU.build_page_table()
+        value = self.cpu.MMU.rb(0x0150)
+
+        self.cpu.MMU.wb(0x0150, (value + 1) & 0xFF)
+
+        self.assertEqual(self.cpu.MMU.rb(0x0150), value)
+
+    def test_rom_is_memory_mapped(self):
+        self.cpu.load_rom("roms/tetris.gb")
+        other = Z80(headless=True)
+        other.load_rom("roms/tetris.gb")
+        self.addCleanup(other.MMU.close)
+
+        self.assertIsInstance(self.cpu.MMU.rom, mmap.mmap)
+        self.assertEqual(self.cpu.MMU.rom[:], other.MMU.rom[:])
+
+        self.cpu.MMU.close()
+
+        self.assertEqual(len(self.cpu.MMU.rom), 32768)
+        self.assertEqual(other.MMU.rom[0x134:0x13A], b'TETRIS')
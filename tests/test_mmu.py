@@ -0,0 +1,59 @@
+import unittest
+from emulator.cpu import Z80
+
+class TestPageTable(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def test_bios_overlay(self):
+        self.mmu.rom[0x0000] = 0x12
+        self.mmu.rom[0x0100] = 0x34
+
+        self.assertEqual(self.mmu.rb(0x0000), self.mmu.bios[0])
+        self.assertEqual(self.mmu.rb(0x0100), 0x34)
+        self.mmu.unmap_bios()
+        self.assertEqual(self.mmu.rb(0x0000), 0x12)
+
+    def test_rom_read_only(self):
+        self.mmu.unmap_bios()
+        self.mmu.rom[0x7FFF] = 0x56
+
+        self.mmu.wb(0x7FFF, 0x00)
+
+        self.assertEqual(self.mmu.rb(0x7FFF), 0x56)
+
+    def test_vram(self):
+        self.mmu.wb(0x8010, 0xAB)
+
+        self.assertEqual(self.mmu.rb(0x8010), 0xAB)
+        self.assertEqual(self.mmu.vram[0x0010], 0xAB)
+
+    def test_eram(self):
+        self.mmu.wb(0xBFFF, 0xCD)
+
+        self.assertEqual(self.mmu.rb(0xBFFF), 0xCD)
+        self.assertEqual(self.mmu.eram[0x1FFF], 0xCD)
+
+    def test_wram_shadow(self):
+        self.mmu.wb(0xC123, 0x11)
+        self.mmu.wb(0xE124, 0x22) # Shadow of 0xC124
+
+        self.assertEqual(self.mmu.rb(0xE123), 0x11)
+        self.assertEqual(self.mmu.rb(0xC124), 0x22)
+
+    def test_io_and_hram_page(self):
+        self.mmu.wb(0xFF47, 0xE4)
+        self.mmu.wb(0xFF80, 0x77)
+
+        self.assertEqual(self.mmu.rb(0xFF47), 0xE4)
+        self.assertEqual(self.mmu.rb(0xFF80), 0x77)
+        self.assertEqual(self.mmu.zram[0], 0x77)
+
+    def test_word_access(self):
+        self.mmu.ww(0xC000, 0x1234)
+
+        self.assertEqual(self.mmu.rb(0xC000), 0x34)
+        self.assertEqual(self.mmu.rw(0xC000), 0x1234)
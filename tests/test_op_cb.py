@@ -0,0 +1,99 @@
+import unittest
+from emulator.cpu import Z80
+
+class TestCB(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.cpu = Z80()
+        self.cpu.registers['PC'] = 0x100 # PC is initialized to 0x100 on power up.
+        self.cpu.registers['F'] = 0x00
+
+    def assert_register_op(self, register, value, flags):
+        self.assertEqual(self.cpu.registers[register], value)
+        self.assertEqual(self.cpu.registers['F'], flags)
+        self.assertEqual(self.cpu.registers['PC'], 0x100)
+        self.assertEqual(self.cpu.registers['M'], 2)
+        self.assertEqual(self.cpu.registers['T'], 8)
+
+    def test_setbit3b(self):
+        self.cpu.registers['B'] = 0x00
+
+        self.cpu.setbit3b()
+
+        self.assert_register_op('B', 0x08, 0x00)
+
+    def test_resbit7a(self):
+        self.cpu.registers['A'] = 0xFF
+
+        self.cpu.resbit7a()
+
+        self.assert_register_op('A', 0x7F, 0x00)
+
+    def test_setbit0hl(self):
+        self.cpu.registers['H'] = 0xC0
+        self.cpu.registers['L'] = 0x10
+        self.cpu.MMU.wb(0xC010, 0x80)
+
+        self.cpu.setbit0hl()
+
+        self.assertEqual(self.cpu.MMU.rb(0xC010), 0x81)
+        self.assertEqual(self.cpu.registers['M'], 4)
+        self.assertEqual(self.cpu.registers['T'], 16)
+
+    def test_swapc(self):
+        self.cpu.registers['C'] = 0x12
+
+        self.cpu.swapc()
+
+        self.assert_register_op('C', 0x21, 0x00)
+
+    def test_swapc_result_zero(self):
+        self.cpu.registers['C'] = 0x00
+
+        self.cpu.swapc()
+
+        self.assert_register_op('C', 0x00, 0x80)
+
+    def test_rrcnd(self):
+        self.cpu.registers['D'] = 0x01
+
+        self.cpu.rrcnd()
+
+        self.assert_register_op('D', 0x80, 0x10)
+
+    def test_rrne(self):
+        self.cpu.registers['E'] = 0x01
+        self.cpu.registers['F'] = 0x10
+
+        self.cpu.rrne()
+
+        self.assert_register_op('E', 0x80, 0x10)
+
+    def test_slah(self):
+        self.cpu.registers['H'] = 0x80
+
+        self.cpu.slah()
+
+        self.assert_register_op('H', 0x00, 0x90)
+
+    def test_sral(self):
+        self.cpu.registers['L'] = 0x81
+
+        self.cpu.sral()
+
+        self.assert_register_op('L', 0xC0, 0x10)
+
+    def test_srla(self):
+        self.cpu.registers['A'] = 0x81
+
+        self.cpu.srla()
+
+        self.assert_register_op('A', 0x40, 0x10)
+
+    def test_cb_map(self):
+        self.assertEqual(len(self.cpu.CB_MAP), 256)
+        self.assertEqual(self.cpu.CB_MAP[0x0F].__name__, 'rrcna')
+        self.assertEqual(self.cpu.CB_MAP[0x27].__name__, 'slaa')
+        self.assertEqual(self.cpu.CB_MAP[0x3F].__name__, 'srla')
@@ -0,0 +1,69 @@
+import unittest
+from emulator.cpu import Z80
+
+class TestDEC16(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.cpu = Z80()
+        self.cpu.registers['PC'] = 0x100 # PC is initialized to 0x100 on power up.
+        self.cpu.registers['F'] = 0b01010000
+
+    def dec_16(self, method, register_high, register_low):
+        self.cpu.registers[register_high] = 0x12
+        self.cpu.registers[register_low] = 0x34
+
+        method()
+
+        self.assertEqual(self.cpu.registers[register_high], 0x12)
+        self.assertEqual(self.cpu.registers[register_low], 0x33)
+        self.assertEqual(self.cpu.registers['PC'], 0x100)
+        self.assertEqual(self.cpu.registers['F'], 0b01010000) # Flags not affected
+        self.assertEqual(self.cpu.registers['M'], 2)
+        self.assertEqual(self.cpu.registers['T'], 8)
+
+    def dec_16_borrow(self, method, register_high, register_low):
+        self.cpu.registers[register_high] = 0x01
+        self.cpu.registers[register_low] = 0x00
+
+        method()
+
+        self.assertEqual(self.cpu.registers[register_high], 0x00)
+        self.assertEqual(self.cpu.registers[register_low], 0xFF)
+
+    def dec_16_wraps(self, method, register_high, register_low):
+        self.cpu.registers[register_high] = 0x00
+        self.cpu.registers[register_low] = 0x00
+
+        method()
+
+        self.assertEqual(self.cpu.registers[register_high], 0xFF)
+        self.assertEqual(self.cpu.registers[register_low], 0xFF)
+
+    def test_decbc(self):
+        self.dec_16(self.cpu.decbc, 'B', 'C')
+
+    def test_decbc_borrow(self):
+        self.dec_16_borrow(self.cpu.decbc, 'B', 'C')
+
+    def test_decbc_wraps(self):
+        self.dec_16_wraps(self.cpu.decbc, 'B', 'C')
+
+    def test_decde(self):
+        self.dec_16(self.cpu.decde, 'D', 'E')
+
+    def test_decde_borrow(self):
+        self.dec_16_borrow(self.cpu.decde, 'D', 'E')
+
+    def test_decde_wraps(self):
+        self.dec_16_wraps(self.cpu.decde, 'D', 'E')
+
+    def test_dechl(self):
+        self.dec_16(self.cpu.dechl, 'H', 'L')
+
+    def test_dechl_borrow(self):
+        self.dec_16_borrow(self.cpu.dechl, 'H', 'L')
+
+    def test_dechl_wraps(self):
+        self.dec_16_wraps(self.cpu.dechl, 'H', 'L')
@@ -66,6 +66,15 @@ class TestLD(unittest.TestCase):
         self.assertEqual(self.cpu.registers['A'], 78)
         self.assertEqual(self.cpu.MMU.rb(addr), self.cpu.registers['A'])
 
+    def test_ldhlminusa_wraps(self):
+        self.cpu.registers['H'] = 0x00
+        self.cpu.registers['L'] = 0x00
+
+        self.cpu.ldhlminusa()
+
+        self.assertEqual(self.cpu.registers['H'], 0xFF)
+        self.assertEqual(self.cpu.registers['L'], 0xFF)
+
     def test_ldbd8(self):
 
         self.cpu.ldbd8()
@@ -88,7 +97,7 @@ class TestLD(unittest.TestCase):
 
         self.cpu.lddd8()
 
-        self.assertEqual(self.cpu.registers['C'], 253)
+        self.assertEqual(self.cpu.registers['D'], 253)
         self.assertEqual(self.cpu.registers['PC'], 0x101)
         self.assertEqual(self.cpu.registers['M'], 2)
         self.assertEqual(self.cpu.registers['T'], 8)
@@ -0,0 +1,44 @@
+import unittest
+from emulator.cpu import Z80
+from emulator.registers import Registers
+
+class TestRegisters(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.registers = Registers()
+
+    def test_item_access(self):
+        self.registers['A'] = 0x12
+        self.registers.B = 0x34
+
+        self.assertEqual(self.registers.A, 0x12)
+        self.assertEqual(self.registers['B'], 0x34)
+        self.assertIn('PC', self.registers)
+
+    def test_16b_pairs(self):
+        self.registers.HL = 0x9FFF
+        self.registers.BC = 0x1234
+        self.registers.DE = 0xABCD
+        self.registers.AF = 0x01B3
+
+        self.assertEqual((self.registers.H, self.registers.L), (0x9F, 0xFF))
+        self.assertEqual((self.registers.B, self.registers.C), (0x12, 0x34))
+        self.assertEqual((self.registers.D, self.registers.E), (0xAB, 0xCD))
+        self.assertEqual((self.registers.A, self.registers.F), (0x01, 0xB0))
+        self.assertEqual(self.registers.HL, 0x9FFF)
+        self.assertEqual(self.registers.AF, 0x01B0)
+
+    def test_unknown_register(self):
+        with self.assertRaises(AttributeError):
+            self.registers['X'] = 1
+
+    def test_registers_are_per_cpu(self):
+        cpu1 = Z80(headless=True)
+        cpu2 = Z80(headless=True)
+
+        cpu1.registers['A'] = 0x42
+        cpu1.clock['M'] = 10
+
+        self.assertEqual(cpu2.registers['A'], 0)
+        self.assertEqual(cpu2.clock['M'], 0)
@@ -0,0 +1,184 @@
+import unittest
+from emulator.cpu import Z80
+from emulator.trace import TRACE_INSTRUCTIONS
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+
+    def test_run_cycles(self):
+        reason = self.cpu.run_cycles(1000)
+
+        self.assertEqual(reason, Z80.STOP_CYCLES)
+        self.assertGreaterEqual(self.cpu.clock['M'], 1000)
+
+    def test_run_cycles_matches_interpreter(self):
+        interpreter = Z80(headless=True)
+
+        self.cpu.run_cycles(1000)
+        while interpreter.clock['M'] < self.cpu.clock['M']:
+            interpreter.dispatcher()
+
+        self.assertEqual(self.cpu.registers.items(), interpreter.registers.items())
+        self.assertEqual(self.cpu.clock, interpreter.clock)
+
+    def test_breakpoint_inside_block(self):
+        self.cpu.run_cycles(10) # Translate the first BIOS block
+        self.cpu.reset()
+
+        self.cpu.add_breakpoint(0x0007) # LD (HL-),A
+        reason = self.cpu.run_cycles(1000)
+
+        self.assertEqual(reason, Z80.STOP_BREAKPOINT)
+        self.assertEqual(self.cpu.registers.PC, 0x0007)
+        self.assertEqual(self.cpu.registers.HL, 0x9FFF)
+
+    def test_resume_from_breakpoint(self):
+        self.cpu.add_breakpoint(0x0007)
+        self.cpu.run_cycles(1000)
+
+        reason = self.cpu.run_cycles(1000)
+
+        self.assertEqual(reason, Z80.STOP_BREAKPOINT)
+        self.assertEqual(self.cpu.registers.PC, 0x0007)
+        self.assertEqual(self.cpu.registers.HL, 0x9FFE)
+
+    def test_run_frame(self):
+        self.cpu.MMU.wb(0xFF40, 0x91) # LCD on
+        frame_number = self.cpu.GPU.frame_number
+
+        reason = self.cpu.run_frame()
+
+        self.assertEqual(reason, Z80.STOP_FRAME)
+        self.assertEqual(self.cpu.GPU.frame_number, frame_number + 1)
+
+    def test_run_frame_lcd_off(self):
+        reason = self.cpu.run_frame()
+
+        self.assertEqual(reason, Z80.STOP_CYCLES)
+        self.assertEqual(self.cpu.GPU.frame_number, 0)
+
+    def write_halt_loop(self, cpu, addr):
+        cpu.MMU.wb(addr, 0x76)     # HALT
+        cpu.MMU.wb(addr + 1, 0x18) # JR -3
+        cpu.MMU.wb(addr + 2, 0xFD)
+        cpu.registers.PC = addr
+
+    def test_halt_until_interrupt(self):
+        cpu = Z80(headless=True, trace_level=TRACE_INSTRUCTIONS)
+        cpu.MMU.wb(0xFF40, 0x91) # LCD on
+        cpu.MMU.wb(0xFFFF, 0x01) # VBlank enabled, IME off: wake without servicing
+        self.write_halt_loop(cpu, 0xC000)
+        cpu.add_breakpoint(0xC001)
+
+        cpu.run_cycles(100000)
+
+        self.assertEqual(cpu.registers.PC, 0xC001)
+        self.assertEqual(cpu.clock['M'], 144 * 114) # VBlank
+        self.assertEqual(cpu.halt_mode, 0)
+        self.assertLess(len(cpu.trace), 1000) # Executed once per PPU event at most
+
+    def test_halt_limited_to_run(self):
+        cpu = Z80(headless=True, trace_level=TRACE_INSTRUCTIONS)
+        self.write_halt_loop(cpu, 0xC000)
+
+        cpu.run_cycles(100000) # LCD off, nothing scheduled
+
+        self.assertEqual(cpu.clock['M'], 100000)
+        self.assertEqual(len(cpu.trace), 1)
+
+    def test_halt_single_step(self):
+        self.write_halt_loop(self.cpu, 0xC000)
+        self.cpu.MMU.wb(0xFF40, 0x91)
+
+        self.cpu.dispatcher()
+
+        self.assertEqual(self.cpu.clock['M'], 1)
+
+    def test_halt_single_step_after_breakpoint(self):
+        self.cpu.MMU.wb(0xC000, 0x00) # NOP
+        self.cpu.MMU.wb(0xC001, 0x00) # NOP
+        self.cpu.MMU.wb(0xC002, 0x76) # HALT
+        self.cpu.registers.PC = 0xC000
+        self.cpu.add_breakpoint(0xC001)
+        self.assertEqual(self.cpu.run_cycles(100000), Z80.STOP_BREAKPOINT)
+        self.assertEqual(self.cpu.run_end, 0)
+
+        self.cpu.dispatcher() # NOP
+        self.cpu.dispatcher() # HALT, nothing to skip to outside a run
+
+        self.assertEqual(self.cpu.clock['M'], 3)
+
+    def test_stop_until_button(self):
+        self.cpu.MMU.wb(0xC000, 0x10) # STOP
+        self.cpu.MMU.wb(0xC001, 0x00)
+        self.cpu.MMU.wb(0xC002, 0x00) # NOP
+        self.cpu.MMU.wb(0xFF00, 0x20) # Directions
+        self.cpu.MMU.wb(0xFF40, 0x91) # LCD on, VBlank doesn't end STOP
+        self.cpu.MMU.wb(0xFFFF, 0x01)
+        self.cpu.registers.PC = 0xC000
+
+        self.cpu.run_cycles(Z80.FRAME_CYCLES * 2)
+
+        self.assertEqual(self.cpu.stop_mode, 1)
+        self.assertEqual(self.cpu.registers.PC, 0xC000)
+        self.assertGreater(self.cpu.stats['halt_cycles'], Z80.FRAME_CYCLES)
+
+        self.cpu.joypad.press('left')
+
+        self.assertEqual(self.cpu.stop_mode, 0)
+        self.assertEqual(self.cpu.registers.PC, 0xC002)
+        self.cpu.dispatcher()
+        self.assertEqual(self.cpu.registers.PC, 0xC003)
+
+    def test_stop_button_held(self):
+        self.cpu.MMU.wb(0xC000, 0x10) # STOP
+        self.cpu.MMU.wb(0xC001, 0x00)
+        self.cpu.MMU.wb(0xFF00, 0x10) # Actions
+        self.cpu.joypad.press('start')
+        self.cpu.registers.PC = 0xC000
+
+        self.cpu.dispatcher()
+
+        self.assertEqual(self.cpu.stop_mode, 0)
+        self.assertEqual(self.cpu.registers.PC, 0xC002)
+
+    def run_ly_wait_loop(self, idle_skip):
+        cpu = Z80(headless=True, idle_skip=idle_skip)
+        for i, byte in enumerate([0xF0, 0x44,   # LDH A,(0xFF44)
+                                  0xFE, 0x90,   # CP 0x90
+                                  0x20, 0xFA]): # JR NZ,-6
+            cpu.MMU.wb(0xC000 + i, byte)
+        cpu.registers.PC = 0xC000
+        cpu.MMU.wb(0xFF40, 0x91)
+        cpu.add_breakpoint(0xC006)
+
+        reason = cpu.run_cycles(100000)
+
+        self.assertEqual(reason, Z80.STOP_BREAKPOINT)
+        self.assertEqual(cpu.GPU.line, 0x90)
+        return cpu
+
+    def test_idle_loop_skip(self):
+        skipped = self.run_ly_wait_loop(True)
+        executed = self.run_ly_wait_loop(False)
+
+        self.assertEqual(skipped.clock, executed.clock)
+        self.assertEqual(skipped.registers.items(), executed.registers.items())
+        self.assertGreater(skipped.stats['idle_skips'], 0)
+        self.assertGreater(skipped.stats['idle_cycles'], 8000)
+        self.assertEqual(executed.stats['idle_skips'], 0)
+
+    def test_div_loop_not_skipped(self):
+        self.cpu.MMU.wb(0xC000, 0xF0) # LDH A,(0xFF04)
+        self.cpu.MMU.wb(0xC001, 0x04)
+        self.cpu.MMU.wb(0xC002, 0x18) # JR -4
+        self.cpu.MMU.wb(0xC003, 0xFC)
+        self.cpu.registers.PC = 0xC000
+        self.cpu.MMU.wb(0xFF40, 0x91)
+
+        self.cpu.run_cycles(10000)
+
+        self.assertEqual(self.cpu.stats['idle_skips'], 0)
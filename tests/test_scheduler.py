@@ -0,0 +1,65 @@
+import unittest
+from emulator.scheduler import Scheduler, NEVER
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.scheduler = Scheduler()
+        self.fired = []
+
+    def callback(self, name):
+        return lambda cycle: self.fired.append((name, cycle))
+
+    def test_events_in_order(self):
+        self.scheduler.schedule('b', 20, self.callback('b'))
+        self.scheduler.schedule('a', 10, self.callback('a'))
+        self.assertEqual(self.scheduler.next_event, 10)
+
+        self.scheduler.run_due(15)
+        self.assertEqual(self.fired, [('a', 10)])
+        self.assertEqual(self.scheduler.next_event, 20)
+
+        self.scheduler.run_due(25)
+        self.assertEqual(self.fired, [('a', 10), ('b', 20)])
+        self.assertEqual(self.scheduler.next_event, NEVER)
+
+    def test_reschedule_replaces_event(self):
+        self.scheduler.schedule('a', 10, self.callback('a'))
+        self.scheduler.schedule('a', 30, self.callback('a'))
+
+        self.scheduler.run_due(20)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.scheduler.pending('a'), 30)
+
+        self.scheduler.run_due(30)
+        self.assertEqual(self.fired, [('a', 30)])
+        self.assertIsNone(self.scheduler.pending('a'))
+
+    def test_cancel(self):
+        self.scheduler.schedule('a', 10, self.callback('a'))
+        self.scheduler.cancel('a')
+
+        self.scheduler.run_due(100)
+
+        self.assertEqual(self.fired, [])
+
+    def test_callback_schedules_due_event(self):
+        def periodic(cycle):
+            self.fired.append(('p', cycle))
+            self.scheduler.schedule('p', cycle + 10, periodic)
+        self.scheduler.schedule('p', 10, periodic)
+
+        self.scheduler.run_due(35)
+
+        self.assertEqual(self.fired, [('p', 10), ('p', 20), ('p', 30)])
+        self.assertEqual(self.scheduler.next_event, 40)
+
+    def test_rebase(self):
+        self.scheduler.schedule('a', 110, self.callback('a'))
+
+        self.scheduler.rebase(100)
+
+        self.assertEqual(self.scheduler.next_event, 10)
+        self.scheduler.run_due(10)
+        self.assertEqual(self.fired, [('a', 10)])
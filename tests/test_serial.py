@@ -0,0 +1,40 @@
+import unittest
+from emulator.cpu import Z80
+from emulator.interrupts import INT_SERIAL
+from emulator.serial import TRANSFER_CYCLES
+
+class TestSerial(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def advance(self, cycles):
+        self.cpu.clock['M'] += cycles
+        self.cpu.scheduler.run_due(self.cpu.clock['M'])
+
+    def test_reset_values(self):
+        self.assertEqual(self.mmu.rb(0xFF01), 0x00)
+        self.assertEqual(self.mmu.rb(0xFF02), 0x7E)
+
+    def test_internal_clock_transfer(self):
+        self.mmu.wb(0xFF01, 0x41)
+        self.mmu.wb(0xFF02, 0x81)
+        self.assertEqual(self.mmu.rb(0xFF02), 0xFF)
+
+        self.advance(TRANSFER_CYCLES - 1)
+        self.assertEqual(self.mmu.rb(0xFF01), 0x41)
+        self.advance(1)
+
+        self.assertEqual(self.mmu.rb(0xFF01), 0xFF) # Nothing connected
+        self.assertEqual(self.mmu.rb(0xFF02), 0x7F)
+        self.assertTrue(self.cpu.interrupts.IF & INT_SERIAL)
+        self.assertEqual(self.cpu.serial.output, b'A')
+
+    def test_external_clock_never_finishes(self):
+        self.mmu.wb(0xFF02, 0x80)
+        self.advance(TRANSFER_CYCLES * 10)
+
+        self.assertEqual(self.mmu.rb(0xFF02), 0xFE)
+        self.assertFalse(self.cpu.interrupts.IF & INT_SERIAL)
@@ -0,0 +1,70 @@
+import unittest
+from emulator.cpu import Z80
+from emulator.interrupts import INT_TIMER
+
+class TestTimer(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+        self.mmu = self.cpu.MMU
+
+    def advance(self, cycles):
+        self.cpu.clock['M'] += cycles
+        self.cpu.scheduler.run_due(self.cpu.clock['M'])
+
+    def test_div(self):
+        self.advance(64 * 3 + 10)
+        self.assertEqual(self.mmu.rb(0xFF04), 3)
+
+        self.mmu.wb(0xFF04, 0x55) # Any write resets DIV
+        self.assertEqual(self.mmu.rb(0xFF04), 0)
+        self.advance(64 * 256)
+        self.assertEqual(self.mmu.rb(0xFF04), 0)
+
+    def test_tima_disabled(self):
+        self.mmu.wb(0xFF07, 0x01)
+        self.advance(1000)
+
+        self.assertEqual(self.mmu.rb(0xFF05), 0)
+        self.assertEqual(self.mmu.rb(0xFF07), 0xF9)
+        self.assertIsNone(self.cpu.scheduler.pending('timer'))
+
+    def test_tima(self):
+        self.mmu.wb(0xFF07, 0x05) # Enabled, every 4 M-cycles
+        self.advance(4 * 10 + 2)
+
+        self.assertEqual(self.mmu.rb(0xFF05), 10)
+
+    def test_tima_overflow(self):
+        self.mmu.wb(0xFF06, 0xF0)
+        self.mmu.wb(0xFF05, 0xFE)
+        self.mmu.wb(0xFF07, 0x06) # Enabled, every 16 M-cycles
+
+        self.assertEqual(self.cpu.scheduler.pending('timer'), 32)
+        self.advance(31)
+        self.assertEqual(self.cpu.interrupts.IF & INT_TIMER, 0)
+        self.advance(1)
+        self.assertEqual(self.cpu.interrupts.IF & INT_TIMER, INT_TIMER)
+        self.assertEqual(self.mmu.rb(0xFF05), 0xF0)
+        self.assertEqual(self.cpu.scheduler.pending('timer'), 32 + 16 * 16)
+
+    def test_overflow_read_before_event(self):
+        self.mmu.wb(0xFF05, 0xFF)
+        self.mmu.wb(0xFF07, 0x05)
+        self.cpu.clock['M'] += 6 # Overflow due at 4, event not run yet
+
+        self.assertEqual(self.mmu.rb(0xFF05), 0x00)
+        self.assertEqual(self.cpu.interrupts.IF & INT_TIMER, INT_TIMER)
+
+    def test_timer_interrupt_wakes_halt(self):
+        self.mmu.wb(0xC000, 0x76) # HALT
+        self.cpu.registers.PC = 0xC000
+        self.mmu.wb(0xFFFF, INT_TIMER)
+        self.mmu.wb(0xFF07, 0x04) # Enabled, every 256 M-cycles, overflow at 65536
+        self.cpu.add_breakpoint(0xC001)
+
+        self.cpu.run_cycles(100000)
+
+        self.assertEqual(self.cpu.registers.PC, 0xC001)
+        self.assertEqual(self.cpu.clock['M'], 65536)
@@ -0,0 +1,65 @@
+import io
+import unittest
+from emulator.cpu import Z80
+from emulator.trace import TraceBuffer, RECORD, TRACE_BLOCKS, TRACE_INSTRUCTIONS
+
+class TestTrace(unittest.TestCase):
+
+    def test_trace_off(self):
+        cpu = Z80(headless=True)
+        cpu.run_cycles(100)
+
+        self.assertIsNone(cpu.trace)
+        self.assertNotIn('dispatcher', vars(cpu))
+
+    def test_trace_instructions(self):
+        cpu = Z80(headless=True, trace_level=TRACE_INSTRUCTIONS)
+        cpu.dispatcher() # LD SP,0xFFFE
+        cpu.dispatcher() # XOR A
+        cpu.dispatcher() # LD HL,0x9FFF
+        cpu.dispatcher() # LD (HL-),A
+
+        records = cpu.trace.records()
+        self.assertEqual([(r[0], r[1]) for r in records], [(0x00, 0x31), (0x03, 0xAF), (0x04, 0x21), (0x07, 0x32)])
+        self.assertEqual(records[3][8:11], (0x9F, 0xFF, 0xFFFE)) # H, L, SP
+        self.assertEqual(records[1][11], 3) # M-cycle
+
+    def test_trace_cb_opcode(self):
+        cpu = Z80(headless=True, trace_level=TRACE_INSTRUCTIONS)
+        cpu.run_cycles(10)
+
+        self.assertEqual(cpu.trace.records()[4][:2], (0x08, 0xCB7C)) # BIT 7,H
+
+    def test_trace_blocks(self):
+        cpu = Z80(headless=True, trace_level=TRACE_BLOCKS)
+        cpu.run_cycles(30)
+
+        self.assertEqual([r[0] for r in cpu.trace.records()[:3]], [0x00, 0x07, 0x07])
+
+    def test_out_of_range_registers(self):
+        cpu = Z80(headless=True, trace_level=TRACE_INSTRUCTIONS)
+        cpu.registers.H = -1    # Left out of range by the CPU
+        cpu.registers.SP = 0x10000
+
+        cpu.trace.record(0x0100, 0x00, cpu.registers, 0)
+
+        record = cpu.trace.records()[0]
+        self.assertEqual(record[8], 0xFF)
+        self.assertEqual(record[10], 0x0000)
+
+    def test_ring_buffer(self):
+        cpu = Z80(headless=True)
+        trace = TraceBuffer(4)
+        for pc in range(0, 6):
+            trace.record(pc, 0, cpu.registers, pc)
+
+        self.assertEqual(len(trace), 4)
+        self.assertEqual([r[0] for r in trace.records()], [2, 3, 4, 5])
+
+    def test_dump(self):
+        cpu = Z80(headless=True, trace_level=TRACE_INSTRUCTIONS)
+        cpu.run_cycles(100)
+
+        f = io.BytesIO()
+        cpu.trace.dump(f)
+        self.assertEqual(len(f.getvalue()), len(cpu.trace) * RECORD.size)
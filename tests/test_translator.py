@@ -0,0 +1,109 @@
+import random
+import unittest
+from emulator.cpu import Z80
+from emulator.translator import INSTRUCTION_LENGTH, inline_code
+
+class TestTranslator(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = Z80(headless=True)
+
+    def test_block_matches_interpreter(self):
+        interpreter = Z80(headless=True)
+
+        block = self.cpu.translator.lookup(0x0000)
+        self.cpu.execute_block()
+        for i in range(len(block.instructions)):
+            interpreter.dispatcher()
+
+        self.assertEqual(block.start, 0x0000)
+        self.assertEqual(block.instructions[-1][1], 0x20) # JR NZ,n ends the block
+        self.assertEqual(self.cpu.registers.items(), interpreter.registers.items())
+        self.assertEqual(self.cpu.clock, interpreter.clock)
+
+    def test_block_is_cached(self):
+        block = self.cpu.translator.lookup(0x0000)
+
+        self.assertIs(self.cpu.translator.lookup(0x0000), block)
+
+    def test_ram_block_invalidated_on_write(self):
+        self.cpu.MMU.wb(0xC000, 0x3C) # INC A
+        self.cpu.MMU.wb(0xC001, 0x18) # JR -3
+        self.cpu.MMU.wb(0xC002, 0xFD)
+        block = self.cpu.translator.lookup(0xC000)
+        self.assertEqual(len(block.instructions), 2)
+
+        self.cpu.MMU.wb(0xC001, 0x3C) # INC A
+        self.cpu.MMU.wb(0xC002, 0xC9) # RET
+        new_block = self.cpu.translator.lookup(0xC000)
+
+        self.assertIsNot(new_block, block)
+        self.assertEqual([op for pc, op in new_block.instructions], [0x3C, 0x3C, 0xC9])
+
+    def test_write_outside_code_keeps_block(self):
+        self.cpu.MMU.wb(0xC000, 0xC9) # RET
+        block = self.cpu.translator.lookup(0xC000)
+
+        self.cpu.MMU.wb(0xC080, 0x00)
+
+        self.assertIs(self.cpu.translator.lookup(0xC000), block)
+
+    def test_block_leaves_after_rewriting_its_code(self):
+        code = bytes([0x21, 0x06, 0xC0, # LD HL,C006
+                      0x36, 0x0C,       # LD (HL),0x0C (INC C)
+                      0x00,             # NOP
+                      0x00,             # NOP, rewritten to INC C
+                      0x76])            # HALT
+        for i, byte in enumerate(code):
+            self.cpu.MMU.wb(0xC000 + i, byte)
+        self.cpu.registers.C = 0
+        self.cpu.registers.PC = 0xC000
+        self.cpu.add_breakpoint(0xC007)
+
+        self.cpu.run_cycles(20)
+
+        self.assertEqual(self.cpu.registers.PC, 0xC007)
+        self.assertEqual(self.cpu.registers.C, 1)
+
+    # Inlined instructions have to do exactly what their handler does
+    def test_inline_code_matches_handlers(self):
+        rng = random.Random(1)
+        interpreter = Z80(headless=True)
+        for cpu in (self.cpu, interpreter):
+            cpu.MMU.inbios = 0
+            cpu.MMU.build_page_table()
+        checked = 0
+        for op in range(0x100):
+            length = INSTRUCTION_LENGTH[op]
+            operands = [rng.randrange(0x100) for i in range(length - 1)]
+            if op in (0x01, 0x11, 0x21, 0xEA, 0xFA): # Keep addresses in WRAM
+                operands[-1] = rng.randrange(0xC0, 0xE0)
+            if op in (0xE0, 0xF0): # SCX or HRAM
+                operands[0] = rng.choice((0x43, rng.randrange(0x80, 0xFF)))
+            if inline_code(op, 0x0200, 0x0200 + length, lambda addr: operands[addr - 0x0201], True) is None:
+                continue
+            checked += 1
+            for i in range(8):
+                for cpu in (self.cpu, interpreter):
+                    cpu.MMU.rom[0x0200:0x0200 + length] = bytes([op] + operands)
+                    cpu.translator.flush()
+                    state = random.Random(op * 8 + i) # Same state for both
+                    for register in 'ABDH':
+                        setattr(cpu.registers, register, state.randrange(0xC0, 0xE0))
+                    for register in 'CELF':
+                        setattr(cpu.registers, register, state.randrange(0x100))
+                    cpu.registers.F &= 0xF0
+                    cpu.registers.SP = state.randrange(0x10000)
+                    cpu.registers.PC = 0x0200
+                    cpu.clock['M'] = cpu.clock['T'] = 0
+                    cpu.MMU.wram[:] = bytes(state.getrandbits(8) for _ in range(0x2000))
+                self.cpu.add_breakpoint(0x0200 + length) # A block of one instruction
+                self.cpu.execute_block()
+                self.cpu.remove_breakpoint(0x0200 + length)
+                interpreter.dispatcher()
+
+                self.assertEqual(self.cpu.registers.items(), interpreter.registers.items(), hex(op))
+                self.assertEqual(self.cpu.clock, interpreter.clock, hex(op))
+                self.assertEqual(self.cpu.MMU.wram, interpreter.MMU.wram, hex(op))
+        self.assertGreater(checked, 100)
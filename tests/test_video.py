@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import unittest
+from emulator.cpu import Z80
+from emulator.video import HeadlessFramebuffer, VideoSink
+
+class TestVideo(unittest.TestCase):
+
+    def test_headless_does_not_import_pyglet(self):
+        code = 'import sys; from emulator.cpu import Z80; Z80(headless=True).run_cycles(1000); print("pyglet" in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', code])
+
+        self.assertEqual(output.strip(), b'False')
+
+    def test_headless_framebuffer(self):
+        cpu = Z80(headless=True)
+        self.assertIsInstance(cpu.video, HeadlessFramebuffer)
+
+        cpu.GPU.screen[0, 0] = 0x00112233
+        cpu.GPU.write_canvas()
+        cpu.GPU.screen[0, 0] = 0
+
+        self.assertEqual(cpu.video.frame_count, 1)
+        self.assertEqual(cpu.video.frame[0, 0], 0x00112233)
+        self.assertEqual(cpu.video.rgba()[0, 0].tolist(), [0x33, 0x22, 0x11, 0x00])
+
+    def test_custom_sink(self):
+        class BottomUpSink(VideoSink):
+            top_down = False
+            def present(self, framebuffer):
+                self.last_row = framebuffer[-1].copy()
+
+        sink = BottomUpSink()
+        cpu = Z80(video=sink)
+        cpu.GPU.screen[0, 0] = 0x00112233
+        cpu.GPU.write_canvas()
+
+        self.assertIs(cpu.GPU.video, sink)
+        self.assertEqual(sink.last_row[0], 0x00112233)